@@ -0,0 +1,532 @@
+"""
+In-process stand-in for the parts of the Discord REST API and gateway the
+semester commands use.
+
+:class:`FakeDiscord` serves REST requests from an aiohttp web server on a
+local port, keeps the guild state in memory and, after every successful
+mutation, feeds the matching gateway event straight into the bot's
+``ConnectionState`` parsers, so the bot's cache (and everything listening
+to it) evolves exactly as it would against Discord.
+
+Latency, per-route rate-limit buckets (with ``X-RateLimit-*`` headers) and
+429 responses are emulated, as are the 50-channels-per-category and
+50-options-per-onboarding-prompt limits. Gateway member chunking
+(``guild.chunk()``) is answered from the same member list.
+"""
+
+import json
+import time
+import asyncio
+import itertools
+from collections import Counter
+from datetime import datetime, timezone
+
+import discord
+from aiohttp import web
+
+from discord_ta_bot.utils.scheduler import route_key
+
+_API = "/api/v10"
+_ADMINISTRATOR = str(discord.Permissions.all().value)
+# Discord allows at most 50 channels per category.
+_CATEGORY_LIMIT = 50
+
+
+def _json(data, status: int = 200, headers: dict | None = None) -> web.Response:
+    # discord.py only decodes bodies whose content type is exactly
+    # "application/json", without the charset aiohttp's json_response adds.
+    return web.Response(
+        body=json.dumps(data).encode(),
+        status=status,
+        headers={"Content-Type": "application/json", **(headers or {})},
+    )
+
+
+class _Bucket:
+    def __init__(self, limit: int, window: float):
+        self.limit = limit
+        self.window = window
+        self.remaining = limit
+        self.reset_at = 0.0
+
+    def hit(self, now: float) -> float | None:
+        """Consume a request; return seconds to wait if it is rate limited."""
+        if now >= self.reset_at:
+            self.remaining = self.limit
+            self.reset_at = now + self.window
+        if self.remaining == 0:
+            return self.reset_at - now
+        self.remaining -= 1
+        return None
+
+
+class FakeDiscord:
+    """
+    Fake Discord REST API backed by one in-memory guild.
+
+    Parameters
+    ----------
+    groups : int
+        Number of ``<year>_group_<n>`` roles (and channels) that already
+        exist, e.g. to benchmark ``end_semester``.
+    members : int
+        Number of student members. When ``groups`` is set they are spread
+        evenly over the group roles; all hold ``students``.
+    latency : float
+        Seconds every request takes before it is answered.
+    limit, window : int, float
+        Each ``(route, major id)`` bucket allows ``limit`` requests per
+        ``window`` seconds.
+    global_limit : int
+        Requests per second across all routes.
+    """
+
+    def __init__(
+        self,
+        groups: int = 0,
+        members: int = 10,
+        latency: float = 0.02,
+        limit: int = 10,
+        window: float = 1.0,
+        global_limit: int = 50,
+    ):
+        self.latency = latency
+        self.limit = limit
+        self.window = window
+        self.global_bucket = _Bucket(global_limit, 1.0)
+        self.buckets: dict[tuple[str, int | None], _Bucket] = {}
+        self.calls: Counter = Counter()
+        self.rate_limited = 0
+        self.state = None
+        self._ids = itertools.count(1_000_000)
+        self._runner: web.AppRunner | None = None
+        self.port: int | None = None
+
+        self.app_id = self._id()
+        self.bot_id = self._id()
+        self.guild_id = self._id()
+        self.year = datetime.now(timezone.utc).year
+        self.roles: dict[int, dict] = {}
+        self.channels: dict[int, dict] = {}
+        self.members: dict[int, dict] = {}
+        self.prompts: list[dict] = []
+        self._build(groups, members)
+
+    def _id(self) -> int:
+        return next(self._ids)
+
+    # -- payload builders ------------------------------------------------------
+
+    def _role(self, name: str, position: int, permissions: str = "0", **extra) -> dict:
+        role = {
+            "id": str(extra.pop("id", None) or self._id()),
+            "name": name,
+            "color": 0,
+            "hoist": False,
+            "position": position,
+            "permissions": permissions,
+            "managed": False,
+            "mentionable": False,
+            "flags": 0,
+        }
+        role.update(extra)
+        self.roles[int(role["id"])] = role
+        return role
+
+    def _channel(
+        self, name: str, type: int, parent_id=None, overwrites=None, **extra
+    ) -> dict:
+        channel = {
+            "id": str(self._id()),
+            "type": type,
+            "guild_id": str(self.guild_id),
+            "name": name,
+            "position": len(self.channels),
+            "parent_id": str(parent_id) if parent_id else None,
+            "permission_overwrites": overwrites or [],
+            "nsfw": False,
+        }
+        if type == 2:
+            channel.update(bitrate=64000, user_limit=0, rtc_region=None)
+        channel.update(extra)
+        self.channels[int(channel["id"])] = channel
+        return channel
+
+    def _member(self, user_id: int, username: str, roles: list[int]) -> dict:
+        member = {
+            "user": {
+                "id": str(user_id),
+                "username": username,
+                "discriminator": "0",
+                "global_name": None,
+                "avatar": None,
+                "bot": user_id == self.bot_id,
+            },
+            "roles": [str(r) for r in roles],
+            "joined_at": datetime.now(timezone.utc).isoformat(),
+            "deaf": False,
+            "mute": False,
+            "flags": 0,
+        }
+        self.members[user_id] = member
+        return member
+
+    def _build(self, groups: int, members: int) -> None:
+        self._role("@everyone", 0, id=self.guild_id)
+        students = self._role("students", 1)
+        bot_role = self._role("ta-bot", 1000, _ADMINISTRATOR)
+        self._member(self.bot_id, "ta-bot", [int(bot_role["id"])])
+
+        group_roles = []
+        if groups:
+            deny = [{"id": str(self.guild_id), "type": 0, "allow": "0", "deny": "1024"}]
+            for n in range(1, groups + 1):
+                # 50 channels per category: ``group_text_channels``, then
+                # ``group_text_channels_2`` and so on.
+                if n % _CATEGORY_LIMIT == 1:
+                    suffix = f"_{n // _CATEGORY_LIMIT + 1}" if n > 1 else ""
+                    text = self._channel(
+                        f"group_text_channels{suffix}", 4, overwrites=deny
+                    )
+                    voice = self._channel(
+                        f"group_voice_channels{suffix}", 4, overwrites=deny
+                    )
+                name = f"{self.year}_group_{n}"
+                role = self._role(name, 1 + n, hoist=True)
+                group_roles.append(int(role["id"]))
+                self._channel(name, 0, text["id"])
+                self._channel(name, 2, voice["id"])
+
+        for i in range(members):
+            roles = [int(students["id"])]
+            if group_roles:
+                roles.append(group_roles[i % len(group_roles)])
+            self._member(self._id(), f"student{i}", roles)
+
+    def guild_payload(self) -> dict:
+        return {
+            "id": str(self.guild_id),
+            "name": "Benchmark guild",
+            "owner_id": str(self.bot_id),
+            "roles": list(self.roles.values()),
+            "channels": list(self.channels.values()),
+            "members": list(self.members.values()),
+            "member_count": len(self.members),
+            "emojis": [],
+            "stickers": [],
+            "features": [],
+            "premium_tier": 0,
+            "unavailable": False,
+        }
+
+    def attach(self, bot: discord.Client) -> discord.Guild:
+        """Load the fake guild into ``bot``'s cache and route events to it."""
+        self.state = bot._connection
+        self.state.chunk_guild = self._chunk_guild
+        guild = discord.Guild(data=self.guild_payload(), state=self.state)
+        self.state._add_guild(guild)
+        return guild
+
+    async def _chunk_guild(self, guild, *, wait=True, cache=None):
+        """Gateway member chunking: one round trip per 1000 members."""
+        await asyncio.sleep(self.latency * max(1, -(-len(self.members) // 1000)))
+        members = [
+            discord.Member(data=data, guild=guild, state=self.state)
+            for data in self.members.values()
+        ]
+        if cache if cache is not None else self.state.member_cache_flags.joined:
+            for member in members:
+                guild._add_member(member)
+        return members
+
+    def _dispatch(self, event: str, data: dict) -> None:
+        if self.state is not None:
+            getattr(self.state, f"parse_{event}")(data)
+
+    # -- server ----------------------------------------------------------------
+
+    async def start(self) -> str:
+        """Start serving; returns the API base URL to point discord.py at."""
+        app = web.Application(middlewares=[self._middleware])
+        app.add_routes(
+            [
+                web.get(f"{_API}/users/@me", self.get_me),
+                web.get(f"{_API}/oauth2/applications/@me", self.get_application),
+                web.put(f"{_API}/applications/{{app}}/commands", self.put_commands),
+                web.put(
+                    f"{_API}/applications/{{app}}/guilds/{{guild}}/commands",
+                    self.put_commands,
+                ),
+                web.post(f"{_API}/guilds/{{guild}}/roles", self.create_role),
+                web.patch(f"{_API}/guilds/{{guild}}/roles", self.move_roles),
+                web.patch(f"{_API}/guilds/{{guild}}/roles/{{role}}", self.edit_role),
+                web.delete(f"{_API}/guilds/{{guild}}/roles/{{role}}", self.delete_role),
+                web.post(f"{_API}/guilds/{{guild}}/channels", self.create_channel),
+                web.patch(f"{_API}/channels/{{channel}}", self.edit_channel),
+                web.delete(f"{_API}/channels/{{channel}}", self.delete_channel),
+                web.put(
+                    f"{_API}/channels/{{channel}}/permissions/{{target}}",
+                    self.put_permissions,
+                ),
+                web.patch(
+                    f"{_API}/guilds/{{guild}}/members/{{user}}", self.edit_member
+                ),
+                web.get(f"{_API}/guilds/{{guild}}/onboarding", self.get_onboarding),
+                web.put(f"{_API}/guilds/{{guild}}/onboarding", self.put_onboarding),
+                web.post(f"{_API}/webhooks/{{app}}/{{token}}", self.followup),
+                web.patch(
+                    f"{_API}/webhooks/{{app}}/{{token}}/messages/{{message}}",
+                    self.followup,
+                ),
+            ]
+        )
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{self.port}{_API}"
+
+    async def stop(self) -> None:
+        if self._runner:
+            await self._runner.cleanup()
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler):
+        await asyncio.sleep(self.latency)
+        route, major = route_key(request.method, request.path)
+        if major is None:
+            major = next(
+                (int(v) for v in request.match_info.values() if v.isdigit()), None
+            )
+        self.calls[route] += 1
+
+        now = time.monotonic()
+        bucket = self.buckets.setdefault(
+            (route, major), _Bucket(self.limit, self.window)
+        )
+        retry_after = self.global_bucket.hit(now)
+        is_global = retry_after is not None
+        if retry_after is None:
+            retry_after = bucket.hit(now)
+        if retry_after is not None:
+            self.rate_limited += 1
+            # discord.py treats a 429 without a Via header as a Cloudflare ban.
+            headers = {"Retry-After": f"{retry_after:.3f}", "Via": "1.1 google"}
+            if is_global:
+                headers["X-RateLimit-Global"] = "true"
+            return _json(
+                {
+                    "message": "You are being rate limited.",
+                    "retry_after": retry_after,
+                    "global": is_global,
+                },
+                status=429,
+                headers=headers,
+            )
+
+        response = await handler(request)
+        response.headers.update(
+            {
+                "X-RateLimit-Limit": str(bucket.limit),
+                "X-RateLimit-Remaining": str(bucket.remaining),
+                "X-RateLimit-Reset": f"{time.time() + bucket.reset_at - now:.3f}",
+                "X-RateLimit-Reset-After": f"{bucket.reset_at - now:.3f}",
+                "X-RateLimit-Bucket": f"{route}:{major}",
+            }
+        )
+        return response
+
+    @staticmethod
+    def _error(status: int, code: int, message: str) -> web.Response:
+        return _json({"code": code, "message": message}, status=status)
+
+    # -- handlers --------------------------------------------------------------
+
+    async def get_me(self, request):
+        return _json(self.members[self.bot_id]["user"])
+
+    async def get_application(self, request):
+        return _json(
+            {
+                "id": str(self.app_id),
+                "name": "ta-bot",
+                "description": "",
+                "icon": None,
+                "bot_public": False,
+                "bot_require_code_grant": False,
+                "owner": self.members[self.bot_id]["user"],
+                "verify_key": "",
+                "flags": 0,
+                "interactions_endpoint_url": None,
+            }
+        )
+
+    async def put_commands(self, request):
+        commands = await request.json()
+        for command in commands:
+            command.setdefault("id", str(self._id()))
+            command.setdefault("application_id", str(self.app_id))
+            command.setdefault("version", "1")
+        return _json(commands)
+
+    async def create_role(self, request):
+        body = await request.json()
+        position = 1 + max(
+            (r["position"] for r in self.roles.values() if r["name"] != "ta-bot"),
+            default=0,
+        )
+        role = self._role(
+            body.get("name", "new role"),
+            position,
+            body.get("permissions", "0"),
+            hoist=body.get("hoist", False),
+        )
+        self._dispatch("guild_role_create", {"guild_id": str(self.guild_id), "role": role})
+        return _json(role)
+
+    async def edit_role(self, request):
+        role = self.roles.get(int(request.match_info["role"]))
+        if role is None:
+            return self._error(404, 10011, "Unknown Role")
+        role.update(await request.json())
+        self._dispatch("guild_role_update", {"guild_id": str(self.guild_id), "role": role})
+        return _json(role)
+
+    async def move_roles(self, request):
+        for item in await request.json():
+            role = self.roles[int(item["id"])]
+            role["position"] = item["position"]
+            self._dispatch(
+                "guild_role_update", {"guild_id": str(self.guild_id), "role": role}
+            )
+        return _json(list(self.roles.values()))
+
+    async def delete_role(self, request):
+        role_id = int(request.match_info["role"])
+        if self.roles.pop(role_id, None) is None:
+            return self._error(404, 10011, "Unknown Role")
+        for member in self.members.values():
+            if str(role_id) in member["roles"]:
+                member["roles"].remove(str(role_id))
+        self._dispatch(
+            "guild_role_delete",
+            {"guild_id": str(self.guild_id), "role_id": str(role_id)},
+        )
+        return web.Response(status=204)
+
+    def _category_full(self, parent_id) -> bool:
+        return (
+            parent_id is not None
+            and sum(c["parent_id"] == str(parent_id) for c in self.channels.values())
+            >= _CATEGORY_LIMIT
+        )
+
+    async def create_channel(self, request):
+        body = await request.json()
+        parent_id = body.get("parent_id")
+        if self._category_full(parent_id):
+            return self._error(400, 50035, "Maximum number of channels in category reached (50)")
+        channel = self._channel(
+            body["name"],
+            body.get("type", 0),
+            parent_id,
+            body.get("permission_overwrites", []),
+        )
+        self._dispatch("channel_create", channel)
+        return _json(channel)
+
+    async def edit_channel(self, request):
+        channel = self.channels.get(int(request.match_info["channel"]))
+        if channel is None:
+            return self._error(404, 10003, "Unknown Channel")
+        body = await request.json()
+        if "parent_id" in body and body["parent_id"] != channel["parent_id"]:
+            if self._category_full(body["parent_id"]):
+                return self._error(
+                    400, 50035, "Maximum number of channels in category reached (50)"
+                )
+        for key in ("name", "parent_id", "permission_overwrites", "position"):
+            if key in body:
+                channel[key] = (
+                    str(body[key]) if key == "parent_id" and body[key] else body[key]
+                )
+        self._dispatch("channel_update", channel)
+        return _json(channel)
+
+    async def delete_channel(self, request):
+        channel = self.channels.pop(int(request.match_info["channel"]), None)
+        if channel is None:
+            return self._error(404, 10003, "Unknown Channel")
+        self._dispatch("channel_delete", channel)
+        return _json(channel)
+
+    async def put_permissions(self, request):
+        channel = self.channels.get(int(request.match_info["channel"]))
+        if channel is None:
+            return self._error(404, 10003, "Unknown Channel")
+        body = await request.json()
+        target = request.match_info["target"]
+        channel["permission_overwrites"] = [
+            o for o in channel["permission_overwrites"] if o["id"] != target
+        ] + [{"id": target, **body}]
+        self._dispatch("channel_update", channel)
+        return web.Response(status=204)
+
+    async def edit_member(self, request):
+        member = self.members.get(int(request.match_info["user"]))
+        if member is None:
+            return self._error(404, 10007, "Unknown Member")
+        body = await request.json()
+        if "roles" in body:
+            member["roles"] = [str(r) for r in body["roles"]]
+        self._dispatch(
+            "guild_member_update", {"guild_id": str(self.guild_id), **member}
+        )
+        return _json(member)
+
+    def _onboarding(self) -> dict:
+        return {
+            "guild_id": str(self.guild_id),
+            "prompts": self.prompts,
+            "default_channel_ids": [],
+            "enabled": True,
+            "mode": 0,
+        }
+
+    async def get_onboarding(self, request):
+        return _json(self._onboarding())
+
+    async def put_onboarding(self, request):
+        body = await request.json()
+        prompts = body.get("prompts", self.prompts)
+        for prompt in prompts:
+            if not 1 <= len(prompt["options"]) <= 50:
+                return self._error(400, 50035, "Prompt options must be between 1 and 50")
+            prompt["id"] = str(prompt.get("id") or self._id())
+            for option in prompt["options"]:
+                option.setdefault("id", str(self._id()))
+                if option.get("emoji") is None:
+                    option.pop("emoji", None)
+        self.prompts = prompts
+        return _json(self._onboarding())
+
+    async def followup(self, request):
+        return _json(
+            {
+                "id": str(self._id()),
+                "channel_id": str(self._id()),
+                "type": 0,
+                "content": "",
+                "author": self.members[self.bot_id]["user"],
+                "attachments": [],
+                "embeds": [],
+                "mentions": [],
+                "mention_roles": [],
+                "pinned": False,
+                "mention_everyone": False,
+                "tts": False,
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "edited_timestamp": None,
+            }
+        )
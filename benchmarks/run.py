@@ -0,0 +1,225 @@
+"""
+Benchmark the semester and bulk-deletion commands against a fake Discord.
+
+Runs the real ``Role`` and ``Admin`` cog commands on a real :class:`Bot`
+whose REST calls go to :class:`~benchmarks.fake_discord.FakeDiscord`, and
+sweeps group and member counts. Each scenario records wall time, API calls
+per route, 429 responses and throughput to a JSON file.
+
+Rate-limit windows are compressed by ``--time-scale`` (and the bot's
+scheduler rates raised by the same factor) so a full sweep finishes in
+minutes; compare results only between runs with the same settings.
+
+Usage::
+
+    PYTHONPATH=src python -m benchmarks.run --output bench_results.json
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+import tempfile
+import platform
+from datetime import datetime, timezone
+
+_COMMANDS = ("start_semester", "end_semester", "delete_groups", "delete_channels")
+
+
+class _Response:
+    async def defer(self, **kwargs) -> None:
+        pass
+
+    async def send_message(self, content=None, **kwargs) -> None:
+        pass
+
+
+class _Followup:
+    def __init__(self):
+        self.messages: list[str] = []
+
+    async def send(self, content=None, **kwargs):
+        self.messages.append(content)
+
+
+class FakeInteraction:
+    """The subset of ``discord.Interaction`` the benchmarked commands touch."""
+
+    def __init__(self, guild):
+        self.guild = guild
+        self.guild_id = guild.id
+        self.token = "benchmark-interaction"
+        self.user = guild.me
+        self.channel = None
+        self.response = _Response()
+        self.followup = _Followup()
+
+    def is_expired(self) -> bool:
+        return False
+
+
+async def run_scenario(command: str, groups: int, members: int, args) -> dict:
+    import discord
+    from discord_ta_bot import Bot
+    from discord_ta_bot.utils import JobState, journal_path
+    from benchmarks.fake_discord import FakeDiscord
+
+    existing_groups = 0 if command == "start_semester" else groups
+    fake = FakeDiscord(
+        groups=existing_groups,
+        members=members,
+        latency=args.latency,
+        limit=args.limit,
+        window=args.window / args.time_scale,
+        global_limit=int(50 * args.time_scale),
+    )
+    discord.http.Route.BASE = await fake.start()
+    # Fake ids repeat between scenarios; never resume a previous scenario's run.
+    journal_path(fake.guild_id).unlink(missing_ok=True)
+
+    root = logging.getLogger()
+    handlers = list(root.handlers)
+    bot = Bot()
+    result = {
+        "command": command,
+        "groups": groups,
+        "members": members,
+        "concurrency": args.concurrency,
+        "intents": os.environ.get("BOT_INTENTS", "all"),
+        "error": None,
+    }
+    try:
+        await bot.login("benchmark-token")
+        guild = fake.attach(bot)
+        interaction = FakeInteraction(guild)
+        fake.calls.clear()
+        fake.rate_limited = 0
+
+        if command in ("start_semester", "end_semester"):
+            cog = bot.get_cog("Role")
+        else:
+            cog = bot.get_cog("Admin")
+        callback = getattr(cog, command).callback
+        prefix = f"{fake.year}_group_"
+        arguments = {
+            "start_semester": (groups, args.concurrency),
+            "end_semester": (args.concurrency,),
+            "delete_groups": (prefix,),
+            "delete_channels": (prefix,),
+        }[command]
+
+        started = time.perf_counter()
+        try:
+            await callback(cog, interaction, *arguments)
+            # The commands run as background jobs; time them to the end.
+            await bot.jobs.join()
+        except Exception as e:
+            result["error"] = repr(e)
+        elapsed = time.perf_counter() - started
+        # A job's failure is caught by the job manager, not raised here.
+        unsuccessful = [
+            f"Job #{job.id} ({job.name}) {job.state}"
+            + (f": {job.error}" if job.error else "")
+            for job in bot.jobs.list()
+            if job.state != JobState.SUCCEEDED
+        ]
+        if unsuccessful and result["error"] is None:
+            result["error"] = "; ".join(unsuccessful)
+
+        total = sum(fake.calls.values())
+        result.update(
+            wall_time=round(elapsed, 4),
+            api_calls=total,
+            calls_by_route=dict(fake.calls),
+            rate_limited=fake.rate_limited,
+            throughput=round(total / elapsed, 2) if elapsed else None,
+            scheduler=dict(bot.scheduler.stats),
+            reply=interaction.followup.messages[-1:] or None,
+        )
+    finally:
+        await bot.close()
+        await fake.stop()
+        for handler in root.handlers[:]:
+            if handler not in handlers:
+                root.removeHandler(handler)
+                handler.close()
+    return result
+
+
+def _counts(value: str) -> list[int]:
+    return [int(v) for v in value.split(",") if v]
+
+
+async def main(args) -> None:
+    scenarios = []
+    for command in args.commands:
+        if command == "start_semester":
+            scenarios += [(command, g, args.base_members) for g in args.groups]
+        elif command == "end_semester":
+            scenarios += [(command, g, args.base_members) for g in args.groups]
+            scenarios += [(command, args.base_groups, m) for m in args.members]
+        else:
+            scenarios += [(command, g, 0) for g in args.groups]
+
+    results = []
+    for command, groups, members in scenarios:
+        result = await run_scenario(command, groups, members, args)
+        results.append(result)
+        print(
+            f"{command:16} groups={groups:<4} members={members:<5} "
+            f"{result.get('wall_time', 0):8.2f}s {result.get('api_calls', 0):6} calls "
+            f"{result.get('rate_limited', 0):4} 429s"
+            + (f"  ERROR {result['error']}" if result["error"] else ""),
+            flush=True,
+        )
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "settings": {
+            k: v for k, v in vars(args).items() if k not in ("output", "commands")
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {len(results)} result(s) to {args.output}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument(
+        "--commands", type=lambda v: v.split(","), default=list(_COMMANDS)
+    )
+    parser.add_argument("--groups", type=_counts, default=[1, 10, 50, 100, 200])
+    parser.add_argument("--members", type=_counts, default=[10, 100, 1000, 5000])
+    parser.add_argument("--base-groups", type=int, default=20)
+    parser.add_argument("--base-members", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--window", type=float, default=1.0)
+    parser.add_argument("--time-scale", type=float, default=10.0)
+    parser.add_argument(
+        "--intents", default="all", help="BOT_INTENTS setting, e.g. all or lean"
+    )
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    state_dir = tempfile.mkdtemp(prefix="discord-ta-bot-bench-")
+    # Keep logs and journals of benchmark runs out of the real state directory
+    # and speed the bot's scheduler up as much as the fake's buckets.
+    os.environ.setdefault("LOGFILE_BASE_PATH", state_dir)
+    os.environ.setdefault("STATE_BASE_PATH", state_dir)
+    os.environ.setdefault("LOGFILE_FORMAT", "%(levelname)s %(name)s %(asctime)s - %(message)s")
+    os.environ.setdefault("LOGFILE_SIZE", "1000000")
+    os.environ.setdefault("SCHEDULER_GLOBAL_RATE", str(50 * args.time_scale))
+    os.environ.setdefault("SCHEDULER_GUILD_RATE", str(25 * args.time_scale))
+    os.environ["BOT_INTENTS"] = args.intents
+    sys.exit(asyncio.run(main(args)))
@@ -0,0 +1,110 @@
+"""
+Compare startup cost of ``BOT_INTENTS=all`` and ``BOT_INTENTS=lean``.
+
+Each mode runs in a fresh interpreter that constructs the :class:`Bot` and
+loads ``--guilds`` fake guilds of ``--members`` members each into its cache,
+the way GUILD_CREATE plus startup chunking would. Reported per mode: time
+to construct the bot, time to load the guilds, members left in the cache
+and resident memory before and after loading.
+
+Usage::
+
+    PYTHONPATH=src python -m benchmarks.startup --guilds 5 --members 20000
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+
+def child(args) -> dict:
+    import discord
+    from discord_ta_bot import Bot
+    from discord_ta_bot.utils import process_memory
+    from benchmarks.fake_discord import FakeDiscord
+
+    started = time.perf_counter()
+    bot = Bot()
+    init_seconds = time.perf_counter() - started
+
+    payloads = [
+        FakeDiscord(groups=args.groups_per_guild, members=args.members).guild_payload()
+        for _ in range(args.guilds)
+    ]
+    rss_before, _ = process_memory()
+
+    started = time.perf_counter()
+    state = bot._connection
+    for n, payload in enumerate(payloads):
+        payload["id"] = str(int(payload["id"]) + n)
+        state._add_guild(discord.Guild(data=payload, state=state))
+    load_seconds = time.perf_counter() - started
+    del payloads
+
+    rss_after, peak = process_memory()
+    return {
+        "intents": os.environ["BOT_INTENTS"],
+        "bot_init_seconds": round(init_seconds, 4),
+        "guild_load_seconds": round(load_seconds, 4),
+        "cached_members": sum(len(g.members) for g in bot.guilds),
+        "rss_before_mib": round(rss_before / 2**20, 1) if rss_before else None,
+        "rss_after_mib": round(rss_after / 2**20, 1) if rss_after else None,
+        "peak_rss_mib": round(peak / 2**20, 1) if peak else None,
+    }
+
+
+def main(args) -> None:
+    state_dir = tempfile.mkdtemp(prefix="discord-ta-bot-bench-")
+    results = []
+    for mode in args.modes:
+        env = dict(
+            os.environ,
+            BOT_INTENTS=mode,
+            LOGFILE_BASE_PATH=state_dir,
+            STATE_BASE_PATH=state_dir,
+            LOGFILE_FORMAT="%(levelname)s %(name)s %(asctime)s - %(message)s",
+        )
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.startup", "--child", *sys.argv[1:]],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        results.append(result)
+        print(
+            f"{mode:8} init {result['bot_init_seconds']:6.2f}s  "
+            f"load {result['guild_load_seconds']:6.2f}s  "
+            f"members {result['cached_members']:7}  "
+            f"RSS {result['rss_before_mib']} -> {result['rss_after_mib']} MiB",
+            flush=True,
+        )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"settings": vars(args), "results": results}, f, indent=2)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--guilds", type=int, default=5)
+    parser.add_argument("--members", type=int, default=10000)
+    parser.add_argument("--groups-per-guild", type=int, default=20)
+    parser.add_argument(
+        "--modes", type=lambda v: v.split(","), default=["all", "lean"]
+    )
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.child:
+        print(json.dumps(child(args)))
+    else:
+        main(args)
@@ -1,15 +1,61 @@
 import os
+import time
+import asyncio
 import pathlib
 import logging
-from logging.handlers import RotatingFileHandler
+
+# Startup is profiled from here, so the imports below are included.
+_IMPORT_STARTED = time.perf_counter()
 
 import discord
 from dotenv import load_dotenv, find_dotenv
 from discord.ext import commands
 
+from .utils.command_sync import CommandSyncer
+from .utils.guild_index import GuildIndexRegistry
+from .utils.guild_store import GuildStore
+from .utils.jobs import JobManager
+from .utils.log_queue import QueueLogging
+from .utils.log_rotation import CompressingRotatingFileHandler
+from .utils.metrics import MeteredCommandTree, MetricsRegistry, process_memory
+from .utils.scheduler import MutationScheduler
+from .utils.startup import StartupProfile
+
+_IMPORT_FINISHED = time.perf_counter()
+
 _DEFAULT_LOG_PATH = pathlib.Path.home() / ".local" / "state" / "discord-ta-bot"
+# Intents of BOT_INTENTS=lean: roles and channels (guilds) plus the
+# privileged members intent, which on-demand member chunking requires.
+_LEAN_INTENTS = ("guilds", "members")
+
+__all__ = ["Bot", "ShardedBot"]
+
+
+def _client_options(spec: str) -> dict:
+    """
+    ``commands.Bot`` options for the BOT_INTENTS setting.
 
-__all__ = ["Bot"]
+    ``all`` requests every intent and caches every member of every guild at
+    startup. ``lean``, or a comma-separated list of intent names, requests
+    only those intents (``guilds`` is always included) and turns the member
+    cache off; members are then chunked on demand by the commands that need
+    them (see ``GuildIndexRegistry.members_loaded``).
+    """
+    spec = spec.strip().lower()
+    if spec == "all":
+        return {"intents": discord.Intents.all()}
+    names = _LEAN_INTENTS if spec == "lean" else spec.split(",")
+    intents = discord.Intents.none()
+    intents.guilds = True
+    for name in filter(None, (n.strip() for n in names)):
+        if name not in discord.Intents.VALID_FLAGS:
+            raise ValueError(f"Unknown intent {name!r} in BOT_INTENTS")
+        setattr(intents, name, True)
+    return {
+        "intents": intents,
+        "member_cache_flags": discord.MemberCacheFlags.none(),
+        "chunk_guilds_at_startup": False,
+    }
 
 
 class Bot(commands.Bot):
@@ -22,18 +68,111 @@ class Bot(commands.Bot):
     - LOGFILE_SIZE
     - LOGFILE_COUNT
 
+    Optional environment variables:
+    - SCHEDULER_GLOBAL_RATE
+    - SCHEDULER_GUILD_RATE
+    - METRICS_PORT, METRICS_HOST
+    - BOT_INTENTS
+    - DEV_GUILD_IDS
+    - LOGFILE_QUEUE_SIZE
+    - LOGFILE_ROTATE_WHEN, LOGFILE_ROTATE_INTERVAL, LOGFILE_COMPRESS
+
     It requires the following discord intents:
-    - all
+    - all, or with BOT_INTENTS=lean only guilds and members (member cache
+      off, members chunked on demand)
 
     Specific functionality is implemented in the cogs found under /cogs.
-    The bot is fully stateless — all context is derived from the interaction
-    guild at command time. Multiple guilds are supported without any shared
-    state.
+    Commands derive the guild they act on from the interaction; the guild's
+    Discord state (roles, channels, members) is the source of truth for the
+    semester commands. Multiple guilds share the bot-wide services below,
+    which keep per-guild caches, queues and settings:
+    - ``scheduler``, a :class:`~discord_ta_bot.utils.scheduler.MutationScheduler`
+      that paces REST mutations from all cogs against Discord's rate limits.
+    - ``indexes``, a :class:`~discord_ta_bot.utils.guild_index.GuildIndexRegistry`
+      of per-guild role/channel/membership lookup tables kept current from
+      gateway events.
+    - ``metrics``, a :class:`~discord_ta_bot.utils.metrics.MetricsRegistry`
+      of command latencies, REST call counts and rate-limit figures, served
+      in the Prometheus text format when METRICS_PORT is set.
+    - ``startup``, a :class:`~discord_ta_bot.utils.startup.StartupProfile`
+      timing imports, login, cog setup, command sync and the first READY,
+      logged once the bot is ready.
+    - ``store``, a :class:`~discord_ta_bot.utils.guild_store.GuildStore` of
+      per-guild settings (:class:`~discord_ta_bot.objects.Guild`, e.g. linked
+      Canvas courses) in a local SQLite database. The semester commands do
+      not depend on it.
+    - ``jobs``, a :class:`~discord_ta_bot.utils.jobs.JobManager` running
+      long commands (semester transitions, bulk deletions) as background
+      jobs with progress and cancellation, listed by ``/jobs``.
+
+    Parameters
+    ----------
+    worker : int | None
+        Index of this process in a cluster (see :mod:`discord_ta_bot.cluster`).
+        Workers log to their own files, serve metrics on METRICS_PORT plus
+        their index, and only worker 0 syncs commands.
+    global_rate : float | None
+        Requests per second this process may send across all guilds, by
+        default SCHEDULER_GLOBAL_RATE. Cluster workers share the bot's
+        global rate limit and each get their part of it.
+    **options
+        Passed on to ``commands.Bot``, e.g. ``shard_ids`` and ``shard_count``.
     """
 
-    def __init__(self):
-        intents = discord.Intents.all()
-        super().__init__(command_prefix="!", intents=intents)
+    def __init__(
+        self,
+        worker: int | None = None,
+        global_rate: float | None = None,
+        **options,
+    ):
+        self.worker = worker
+        self.log_name = self.__class__.__name__ + (
+            f".{worker}" if worker is not None else ""
+        )
+        self.startup = StartupProfile(_IMPORT_STARTED)
+        self.startup.record("imports", _IMPORT_FINISHED - _IMPORT_STARTED)
+        self.ready_after: float | None = None
+        self._connect_started: float | None = None
+        self.intents_mode = os.getenv("BOT_INTENTS", "all")
+        self.dev_guild_ids = [
+            int(guild_id)
+            for guild_id in os.getenv("DEV_GUILD_IDS", "").split(",")
+            if guild_id.strip()
+        ]
+        self.scheduler = (
+            MutationScheduler(global_rate=global_rate)
+            if global_rate is not None
+            else MutationScheduler()
+        )
+        self.metrics = MetricsRegistry()
+        super().__init__(
+            command_prefix="!",
+            tree_cls=MeteredCommandTree,
+            http_trace=self.metrics.instrument(self.scheduler.trace_config()),
+            **_client_options(self.intents_mode),
+            **options,
+        )
+        self.indexes = GuildIndexRegistry()
+        self.indexes.attach(self)
+        self.store = GuildStore()
+        self.jobs = JobManager()
+        self.metrics.track_bot(self)
+        self.metrics.gauge(
+            "discord_ready_seconds",
+            "Seconds from startup to the first READY event.",
+            function=lambda: self.ready_after,
+        )
+        self.metrics.gauge(
+            "discord_jobs_running",
+            "Background jobs currently running.",
+            function=lambda: len(self.jobs.running),
+        )
+        self.startup_phases = self.metrics.gauge(
+            "discord_startup_phase_seconds",
+            "Seconds spent in each startup phase.",
+            ("phase",),
+        )
+        self.add_listener(self.report_startup, "on_ready")
 
         self.cog_modules = [
             f"discord_ta_bot.cogs.{cog.name.removesuffix('.py')}"
@@ -46,22 +185,33 @@ class Bot(commands.Bot):
         """
         Setup logging for the bot.
         Configures two rotating file loggers (WARNING and DEBUG level).
-        Sizes and counts are controlled via LOGFILE_SIZE and LOGFILE_COUNT.
+        Sizes and counts are controlled via LOGFILE_SIZE and LOGFILE_COUNT;
+        LOGFILE_ROTATE_WHEN and LOGFILE_ROTATE_INTERVAL add time-based
+        rotation. Rotated files are gzipped in the background unless
+        LOGFILE_COMPRESS is 0.
+
+        Unless LOGFILE_QUEUE_SIZE is 0, the file handlers are driven by a
+        background thread fed through a queue of that many records, so
+        logging never waits for the disk; records that do not fit are
+        dropped and counted.
         """
         formatter = logging.Formatter(os.getenv("LOGFILE_FORMAT"))
+        rotation = dict(
+            max_bytes=int(os.getenv("LOGFILE_SIZE", 100)),
+            backup_count=int(os.getenv("LOGFILE_COUNT", 1)),
+            when=os.getenv("LOGFILE_ROTATE_WHEN") or None,
+            interval=int(os.getenv("LOGFILE_ROTATE_INTERVAL", 1)),
+            compress=os.getenv("LOGFILE_COMPRESS", "1") not in ("0", "false", "False"),
+        )
 
         log_path = (
             pathlib.Path.home()
             / os.getenv("LOGFILE_BASE_PATH", _DEFAULT_LOG_PATH)
-            / f"{self.__class__.__name__}.log"
+            / f"{self.log_name}.log"
         )
         log_path.parent.mkdir(parents=True, exist_ok=True)
 
-        normal_handler = RotatingFileHandler(
-            log_path,
-            maxBytes=int(os.getenv("LOGFILE_SIZE", 100)),
-            backupCount=int(os.getenv("LOGFILE_COUNT", 1)),
-        )
+        normal_handler = CompressingRotatingFileHandler(log_path, **rotation)
         normal_handler.setFormatter(formatter)
         normal_handler.setLevel(logging.WARNING)
 
@@ -69,43 +219,187 @@ class Bot(commands.Bot):
             pathlib.Path.home()
             / os.getenv("LOGFILE_BASE_PATH", _DEFAULT_LOG_PATH)
             / "debug"
-            / f"{self.__class__.__name__}.debug.log"
+            / f"{self.log_name}.debug.log"
         )
         debug_path.parent.mkdir(parents=True, exist_ok=True)
 
-        debug_handler = RotatingFileHandler(
-            debug_path,
-            maxBytes=int(os.getenv("LOGFILE_SIZE", 100)),
-            backupCount=int(os.getenv("LOGFILE_COUNT", 1)),
-        )
+        debug_handler = CompressingRotatingFileHandler(debug_path, **rotation)
         debug_handler.setFormatter(formatter)
         debug_handler.setLevel(logging.DEBUG)
 
+        self.log_path = log_path
+        self.debug_log_path = debug_path
+
         logger = logging.getLogger()
         logger.setLevel(logging.DEBUG)
-        logger.addHandler(normal_handler)
-        logger.addHandler(debug_handler)
+        queue_size = int(os.getenv("LOGFILE_QUEUE_SIZE", 10000))
+        if queue_size > 0:
+            self.log_queue = QueueLogging(queue_size)
+            self.log_queue.start(logger, normal_handler, debug_handler)
+            self.metrics.counter(
+                "discord_log_records_dropped_total",
+                "Log records dropped because the log queue was full.",
+                function=lambda: self.log_queue.dropped,
+            )
+            self.metrics.gauge(
+                "discord_log_queue_pending",
+                "Log records waiting to be written.",
+                function=self.log_queue.pending,
+            )
+        else:
+            self.log_queue = None
+            logger.addHandler(normal_handler)
+            logger.addHandler(debug_handler)
         return logger
 
     async def setup_hook(self) -> None:
-        """Load all cogs and sync slash commands globally."""
-        for cog in self.cog_modules:
-            await self.load_extension(cog)
-        await self.tree.sync()
+        """
+        Start the mutation scheduler and metrics endpoint, load all cogs and
+        sync slash commands if they changed (see :meth:`sync_commands`).
+        """
+        self.scheduler.start()
+        # Cluster workers serve their metrics on consecutive ports.
+        await self.metrics.serve(
+            port=os.getenv("METRICS_PORT") or None, offset=self.worker or 0
+        )
+        await self.load_cogs()
+        # In a cluster only the first worker syncs; the tree is the same.
+        if not self.worker:
+            with self.startup.phase("command sync"):
+                await self.sync_commands()
+
+    async def load_cogs(self) -> None:
+        """
+        Load all cogs concurrently. Cogs do not depend on each other, so a
+        cog whose setup waits on I/O does not hold up the rest. Every cog is
+        attempted; afterwards the first failure, if any, is raised.
+        """
+
+        async def load(cog: str) -> None:
+            with self.startup.phase(f"cog {cog.rsplit('.', 1)[-1]}"):
+                await self.load_extension(cog)
+
+        with self.startup.phase("cogs"):
+            results = await asyncio.gather(
+                *(load(cog) for cog in self.cog_modules), return_exceptions=True
+            )
+        failures = [
+            (cog, result)
+            for cog, result in zip(self.cog_modules, results)
+            if isinstance(result, BaseException)
+        ]
+        for cog, error in failures:
+            logging.getLogger(__name__).error(f"Could not load {cog}: {error!r}")
+        if failures:
+            raise failures[0][1]
+
+    async def login(self, token: str) -> None:
+        started = time.perf_counter()
+        await super().login(token)
+        # setup_hook runs inside login; its phases are recorded on their own.
+        setup = sum(
+            seconds
+            for name, seconds in self.startup.phases.items()
+            if name in ("cogs", "command sync")
+        )
+        self.startup.record("login", time.perf_counter() - started - setup)
+
+    async def connect(self, *, reconnect: bool = True) -> None:
+        if self._connect_started is None:
+            self._connect_started = time.perf_counter()
+        await super().connect(reconnect=reconnect)
+
+    async def report_startup(self) -> None:
+        """Log the startup profile and memory use at the first READY event."""
+        if self.ready_after is not None:
+            return
+        if self._connect_started is not None:
+            self.startup.record(
+                "gateway READY", time.perf_counter() - self._connect_started
+            )
+        self.ready_after = self.startup.finish()
+        for phase, seconds in self.startup.phases.items():
+            self.startup_phases.set(seconds, phase=phase)
+
+        rss, peak = process_memory()
+        mib = lambda n: f"{n / 2**20:.0f} MiB" if n is not None else "n/a"
+        members = sum(len(guild.members) for guild in self.guilds)
+        logging.getLogger(__name__).info(
+            f"Ready after {self.ready_after:.2f}s (BOT_INTENTS={self.intents_mode}): "
+            f"{len(self.guilds)} guild(s), {members} cached member(s), "
+            f"RSS {mib(rss)} (peak {mib(peak)})\n{self.startup.render()}"
+        )
 
     async def unload_all(self) -> None:
         """Unload all cogs."""
         for cog in self.cog_modules:
             await self.unload_extension(cog)
 
-    async def sync_commands(self) -> None:
-        await self.tree.sync()
+    async def sync_commands(self, force: bool = False) -> None:
+        """
+        Sync slash commands globally, or only to DEV_GUILD_IDS when set.
+        Unless ``force``, scopes whose command tree is unchanged since the
+        last sync are skipped.
+        """
+        syncer = CommandSyncer(self.tree, self.application_id)
+        await syncer.sync(self.dev_guild_ids, force=force)
+
+    async def close(self) -> None:
+        await self.jobs.close()
+        await self.scheduler.close()
+        await self.metrics.close()
+        await super().close()
+        await self.store.close()
+        if self.log_queue is not None:
+            self.log_queue.stop()
+
+
+class ShardedBot(Bot, commands.AutoShardedBot):
+    """
+    :class:`Bot` on several gateway connections (shards).
+
+    Without ``shard_ids``/``shard_count`` Discord's recommended number of
+    shards is used and all of them run in this process; the cluster
+    launcher passes each worker its own range. Shard connection changes are
+    logged and every shard's latency and state is exported as metrics.
+    """
+
+    def __init__(
+        self, worker: int | None = None, global_rate: float | None = None, **options
+    ):
+        super().__init__(worker, global_rate, **options)
+        self.shard_logger = logging.getLogger(f"{__name__}.shards")
+
+    async def on_shard_ready(self, shard_id: int) -> None:
+        guilds = sum(1 for guild in self.guilds if guild.shard_id == shard_id)
+        self.shard_logger.info(f"Shard {shard_id} ready with {guilds} guild(s)")
+
+    async def on_shard_disconnect(self, shard_id: int) -> None:
+        self.shard_logger.warning(f"Shard {shard_id} disconnected")
+
+    async def on_shard_resumed(self, shard_id: int) -> None:
+        self.shard_logger.info(f"Shard {shard_id} resumed")
 
 
 def main():
+    """
+    Entry point. SHARD_COUNT=auto (or a number) runs all shards in this
+    process; CLUSTER_PROCESSES > 1 spreads them over worker processes.
+    """
     load_dotenv(find_dotenv(".env"))
-    client = Bot()
-    client.run(os.getenv("DISCORD_TOKEN"))
+    token = os.getenv("DISCORD_TOKEN")
+    processes = int(os.getenv("CLUSTER_PROCESSES", 1))
+    shard_count = os.getenv("SHARD_COUNT")
+    if processes > 1:
+        from .cluster import ClusterLauncher
+
+        count = int(shard_count) if shard_count and shard_count != "auto" else None
+        ClusterLauncher(token, processes, count).run()
+    elif shard_count:
+        options = {} if shard_count == "auto" else {"shard_count": int(shard_count)}
+        ShardedBot(**options).run(token)
+    else:
+        Bot().run(token)
 
 
 if __name__ == "__main__":
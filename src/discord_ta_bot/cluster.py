@@ -0,0 +1,229 @@
+import time
+import signal
+import asyncio
+import logging
+import multiprocessing
+
+import discord
+
+__all__ = ["ClusterLauncher", "shard_ranges"]
+
+# Seconds between checks on the worker processes.
+_CHECK_INTERVAL = 5.0
+# A worker that ran at least this long before dying is restarted at once;
+# quicker deaths back off exponentially up to _MAX_BACKOFF seconds.
+_STABLE_AFTER = 60.0
+_MAX_BACKOFF = 300.0
+
+
+def shard_ranges(shard_count: int, processes: int) -> list[list[int]]:
+    """Split shards ``0..shard_count-1`` into contiguous, even ranges."""
+    processes = max(1, min(processes, shard_count))
+    size, extra = divmod(shard_count, processes)
+    ranges, start = [], 0
+    for i in range(processes):
+        end = start + size + (1 if i < extra else 0)
+        ranges.append(list(range(start, end)))
+        start = end
+    return ranges
+
+
+def _next_backoff(backoff: float, uptime: float) -> float:
+    """Seconds before restarting a worker that died after ``uptime`` seconds."""
+    if uptime >= _STABLE_AFTER:
+        return 0.0
+    return min(_MAX_BACKOFF, max(1.0, backoff * 2))
+
+
+async def recommended_shards(token: str) -> int:
+    """Discord's recommended shard count for the bot behind ``token``."""
+    http = discord.http.HTTPClient(asyncio.get_running_loop())
+    try:
+        await http.static_login(token)
+        shards, _, _ = await http.get_bot_gateway()
+        return shards
+    finally:
+        await http.close()
+
+
+def _run_worker(
+    token: str,
+    index: int,
+    workers: int,
+    shard_ids: list[int],
+    shard_count: int,
+    ready,
+) -> None:
+    # Imported here so the launcher process never builds a bot.
+    from .Bot import ShardedBot
+    from .utils.scheduler import DEFAULT_GLOBAL_RATE
+
+    # Discord's global rate limit is per bot, not per connection, so the
+    # workers split it.
+    bot = ShardedBot(
+        worker=index,
+        global_rate=DEFAULT_GLOBAL_RATE / workers,
+        shard_ids=shard_ids,
+        shard_count=shard_count,
+    )
+
+    async def signal_ready() -> None:
+        ready.set()
+
+    async def main() -> None:
+        closing: asyncio.Future | None = None
+
+        def terminate() -> None:
+            # The launcher stops workers with SIGTERM; close the bot as on
+            # SIGINT so jobs are cancelled, settings flushed and queued log
+            # records written before the process exits.
+            nonlocal closing
+            if closing is None:
+                logging.getLogger(__name__).info(f"Worker {index} terminating")
+                closing = asyncio.ensure_future(bot.close())
+
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, terminate)
+        async with bot:
+            await bot.start(token)
+        if closing is not None:
+            await closing
+
+    bot.add_listener(signal_ready, "on_ready")
+    discord.utils.setup_logging()
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+
+
+class _Worker:
+    def __init__(self, index: int, shard_ids: list[int]):
+        self.index = index
+        self.shard_ids = shard_ids
+        self.process: multiprocessing.Process | None = None
+        self.ready = None
+        self.started = 0.0
+        self.restarts = 0
+        self.backoff = 0.0
+        self.restart_at: float | None = None
+
+    @property
+    def label(self) -> str:
+        return f"worker {self.index} (shards {self.shard_ids[0]}-{self.shard_ids[-1]})"
+
+
+class ClusterLauncher:
+    """
+    Runs the bot's shards spread over several worker processes.
+
+    Each worker is a :class:`~discord_ta_bot.Bot.ShardedBot` owning one
+    contiguous range of shards. Workers are started one after another, each
+    once the previous one is ready, so identifies stay within Discord's
+    session start limits. The launcher then supervises them: a worker
+    that exits is logged and restarted, with exponential backoff if it
+    keeps dying. SIGINT/SIGTERM stop every worker: each receives SIGTERM and
+    closes its bot cleanly. Each worker's scheduler gets an equal share of
+    SCHEDULER_GLOBAL_RATE, since Discord's global limit covers the whole bot.
+
+    Parameters
+    ----------
+    token : str
+        The bot token.
+    processes : int
+        Number of worker processes; at most one per shard.
+    shard_count : int | None
+        Total number of shards, by default Discord's recommendation.
+    """
+
+    def __init__(self, token: str, processes: int, shard_count: int | None = None):
+        self.logger = logging.getLogger(__name__)
+        self.token = token
+        self.processes = processes
+        self.shard_count = shard_count
+        self.workers: list[_Worker] = []
+        self._context = multiprocessing.get_context("spawn")
+        self._stopping = False
+
+    def _start(self, worker: _Worker) -> None:
+        worker.ready = self._context.Event()
+        worker.process = self._context.Process(
+            target=_run_worker,
+            args=(
+                self.token,
+                worker.index,
+                len(self.workers),
+                worker.shard_ids,
+                self.shard_count,
+                worker.ready,
+            ),
+            name=f"discord-ta-bot-worker-{worker.index}",
+        )
+        worker.process.start()
+        worker.started = time.monotonic()
+        worker.restart_at = None
+        self.logger.info(f"Started {worker.label} as pid {worker.process.pid}")
+
+    def _wait_ready(self, worker: _Worker) -> None:
+        # Shards in one process identify about 5 seconds apart.
+        timeout = 60 + 6 * len(worker.shard_ids)
+        deadline = time.monotonic() + timeout
+        while not self._stopping and time.monotonic() < deadline:
+            if worker.ready.wait(1) or not worker.process.is_alive():
+                break
+        if worker.ready.is_set():
+            self.logger.info(
+                f"{worker.label} ready after {time.monotonic() - worker.started:.1f}s"
+            )
+        else:
+            self.logger.warning(f"{worker.label} not ready after {timeout}s")
+
+    def _supervise(self) -> None:
+        now = time.monotonic()
+        for worker in self.workers:
+            if worker.process.is_alive():
+                continue
+            if worker.restart_at is None:
+                uptime = now - worker.started
+                worker.backoff = _next_backoff(worker.backoff, uptime)
+                worker.restart_at = now + worker.backoff
+                self.logger.error(
+                    f"{worker.label} exited with code {worker.process.exitcode} "
+                    f"after {uptime:.0f}s; restarting in {worker.backoff:.0f}s"
+                )
+            elif now >= worker.restart_at:
+                worker.restarts += 1
+                self._start(worker)
+                self._wait_ready(worker)
+
+    def _stop(self, signum, frame) -> None:
+        self._stopping = True
+
+    def run(self) -> None:
+        discord.utils.setup_logging()
+        if self.shard_count is None:
+            self.shard_count = asyncio.run(recommended_shards(self.token))
+        ranges = shard_ranges(self.shard_count, self.processes)
+        self.workers = [_Worker(i, shard_ids) for i, shard_ids in enumerate(ranges)]
+        self.logger.info(
+            f"Running {self.shard_count} shard(s) in {len(self.workers)} process(es)"
+        )
+
+        signal.signal(signal.SIGINT, self._stop)
+        signal.signal(signal.SIGTERM, self._stop)
+        try:
+            for worker in self.workers:
+                if self._stopping:
+                    break
+                self._start(worker)
+                self._wait_ready(worker)
+            while not self._stopping:
+                time.sleep(_CHECK_INTERVAL)
+                self._supervise()
+        finally:
+            for worker in self.workers:
+                if worker.process is not None and worker.process.is_alive():
+                    worker.process.terminate()
+            for worker in self.workers:
+                if worker.process is not None:
+                    worker.process.join(timeout=30)
+            self.logger.info("Cluster stopped")
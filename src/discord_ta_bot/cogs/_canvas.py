@@ -1,12 +1,34 @@
 import os
+import re
+import html
+import aiohttp
 import discord
 import asyncio
+import logging
 from discord import app_commands
 from discord.app_commands.checks import has_permissions
 from discord.ext import commands, tasks
-from canvasapi import Canvas as cv
 from datetime import datetime
 
+from ..objects import Course
+from ..utils import (
+    AnnouncementRelay,
+    AnnouncementState,
+    CanvasClient,
+    CanvasError,
+    CourseCache,
+    Priority,
+    Routes,
+)
+
+# Discord shows at most 25 autocomplete choices and waits 3 seconds for them.
+_MAX_CHOICES = 25
+_AUTOCOMPLETE_TIMEOUT = 2.5
+# Seconds between announcement polls.
+RELAY_INTERVAL = float(os.getenv("CANVAS_RELAY_INTERVAL", 300))
+_MAX_DESCRIPTION = 1000
+_HTML_TAG = re.compile(r"<[^>]+>")
+
 
 class Canvas(commands.Cog):
     """
@@ -16,30 +38,96 @@ class Canvas(commands.Cog):
 
     - CANVAS_URL(Base url for your canvas instance)
     - CANVAS_TOKEN
+    - CANVAS_TIMEOUT(Seconds per request, default 10)
+    - CANVAS_COURSE_TTL(Seconds before the course cache is refreshed, default 900)
+    - CANVAS_MAX_COURSES(Courses kept in the cache, default 5000)
+    - CANVAS_RELAY_INTERVAL(Seconds between announcement polls, default 300)
+    - CANVAS_RELAY_BATCH(Courses per announcement request, default 10)
+    - CANVAS_RELAY_CONCURRENCY(Announcement requests in flight, default 4)
+
+    Canvas is queried through an asynchronous, pooled
+    :class:`~discord_ta_bot.utils.canvas.CanvasClient`, so slow Canvas
+    responses never block the gateway. Course autocomplete is served from
+    a :class:`~discord_ta_bot.utils.course_cache.CourseCache` that is
+    refreshed in the background. Announcements of linked courses are
+    relayed by an :class:`~discord_ta_bot.utils.announcements.AnnouncementRelay`
+    to the channel set with ``/canvas_announcements``. Added courses are
+    stored on the guild's settings in ``bot.store``.
+
+    The cog ships dormant: ``load_cogs`` skips modules whose name starts
+    with ``_``. Rename this module to ``canvas.py`` and set CANVAS_URL and
+    CANVAS_TOKEN to enable it.
 
     Parameters
     ----------
     bot : commands.Bot
         The bot object.
-
-    NOTE: This cog is currently disabled (prefixed with `_`) pending a
-    stateless redesign. The `add_canvas_course` method on Bot has been
-    removed as part of the DB-removal refactor.
     """
 
     def __init__(self, bot):
         self.bot = bot
-        self.canvas_handle = cv(os.getenv("CANVAS_URL"), os.getenv("CANVAS_TOKEN"))
+        self.logger = logging.getLogger(__name__)
+        self.client = CanvasClient(
+            os.getenv("CANVAS_URL", ""),
+            os.getenv("CANVAS_TOKEN", ""),
+            timeout=float(os.getenv("CANVAS_TIMEOUT", 10)),
+        )
+        self.courses = CourseCache(
+            self._load_courses,
+            ttl=float(os.getenv("CANVAS_COURSE_TTL", 900)),
+            max_courses=int(os.getenv("CANVAS_MAX_COURSES", 5000)),
+        )
+        self.announcements = AnnouncementState()
+        self.relay = AnnouncementRelay(
+            self.client,
+            self.announcements,
+            self._announcement_targets,
+            self._post_announcement,
+            batch_size=int(os.getenv("CANVAS_RELAY_BATCH", 10)),
+            concurrency=int(os.getenv("CANVAS_RELAY_CONCURRENCY", 4)),
+        )
+
+    async def cog_load(self) -> None:
+        # Warm the cache so the first autocomplete is answered from memory.
+        self.courses.refresh(self.client.token)
+        self.relay_announcements.start()
+
+    async def cog_unload(self) -> None:
+        self.relay_announcements.cancel()
+        self.courses.close()
+        await self.client.close()
+
+    async def _load_courses(self, token: str) -> list[dict]:
+        """Courses created since last year, newest first."""
+        last_year = str(datetime.now().year - 1)
+        # ISO 8601 timestamps compare correctly as strings.
+        courses = [
+            course
+            async for course in self.client.get_courses()
+            if (course.get("created_at") or "") >= last_year
+        ]
+        courses.sort(key=lambda c: c.get("created_at") or "", reverse=True)
+        return courses
 
     @has_permissions(administrator=True)
     async def canvas_add_course_autocomplete(
-        self, interaction: discord.Interaction, course_code: int
+        self, interaction: discord.Interaction, current: str
     ) -> list[app_commands.Choice[str]]:
-        last_year = datetime.now().year - 1
+        """
+        Courses created since last year whose name or id starts with (or
+        contains) what has been typed so far, answered from the course
+        cache. Only right after startup, before the cache has loaded, does
+        this wait for Canvas, and never past Discord's deadline.
+        """
+        token = self.client.token
+        if not await self.courses.wait_loaded(token, _AUTOCOMPLETE_TIMEOUT):
+            return []
         return [
-            app_commands.Choice(name=o.name, value=str(o.id))
-            for o in self.canvas_handle.get_courses()
-            if o.created_at_date.year >= last_year
+            app_commands.Choice(
+                name=(course.get("name") or str(course["id"]))[:100],
+                value=str(course["id"]),
+            )
+            for course in self.courses.search(token, current, _MAX_CHOICES)
         ]
 
     @app_commands.command(
@@ -61,16 +149,100 @@ class Canvas(commands.Cog):
         course_code : int
             The course code.
         """
-        course = self.canvas_handle.get_course(course_code)
-        # TODO: persist course without MongoDB once stateless redesign is complete
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        try:
+            course = await self.client.get_course(course_code)
+        except (CanvasError, aiohttp.ClientError, TimeoutError) as e:
+            self.logger.warning(f"Could not load Canvas course {course_code}: {e}")
+            await interaction.followup.send(
+                f"Could not load {course_code} from Canvas.", ephemeral=True
+            )
+            return
+        guild = await self.bot.store.get_or_create(
+            interaction.guild_id, interaction.guild.name
+        )
+        linked = guild.with_course(Course(name=course.get("name", ""), id=course["id"]))
+        if linked is not guild:
+            await self.bot.store.put(linked)
+        await interaction.followup.send(
+            f"Loaded {course.get('name', course_code)}.", ephemeral=True
+        )
+
+    @app_commands.command(
+        name="canvas_announcements",
+        description="Relay announcements of this server's Canvas courses to a channel.",
+    )
+    @app_commands.describe(channel="Channel to post to; leave out to stop relaying.")
+    @has_permissions(administrator=True)
+    async def set_announcement_channel(
+        self,
+        interaction: discord.Interaction,
+        channel: discord.TextChannel | None = None,
+    ) -> None:
+        """
+        Post new announcements of the courses added with
+        ``/canvas_add_course`` to ``channel``, or stop relaying them.
+        """
+        guild = await self.bot.store.get_or_create(
+            interaction.guild_id, interaction.guild.name
+        )
+        await self.bot.store.put(
+            guild.replace(announcement_channel=channel.id if channel else None)
+        )
         await interaction.response.send_message(
-            f"Loaded {course_code}.", ephemeral=True
+            f"Relaying Canvas announcements to {channel.mention}."
+            if channel
+            else "Stopped relaying Canvas announcements.",
+            ephemeral=True,
         )
 
-    """
-    TODO: Setup announcement relay. Use EP's code as a base?
-    https://github.com/EdvardPedersen/CanvasHelper
-    """
+    async def _announcement_targets(self) -> dict[int, list[int]]:
+        """Channel ids to relay each linked course's announcements to."""
+        targets: dict[int, list[int]] = {}
+        for guild in await self.bot.store.all():
+            if guild.announcement_channel is None:
+                continue
+            for course in guild.canvas_courses:
+                targets.setdefault(course.id, []).append(guild.announcement_channel)
+        return targets
+
+    async def _post_announcement(self, announcement: dict, channel_ids: list[int]) -> None:
+        text = html.unescape(_HTML_TAG.sub(" ", announcement.get("message") or ""))
+        text = " ".join(text.split())
+        embed = discord.Embed(
+            title=(announcement.get("title") or "Announcement")[:256],
+            url=announcement.get("html_url"),
+            description=text[:_MAX_DESCRIPTION]
+            + ("…" if len(text) > _MAX_DESCRIPTION else ""),
+            timestamp=datetime.fromisoformat(announcement["posted_at"]),
+        )
+        author = (announcement.get("author") or {}).get("display_name")
+        if author:
+            embed.set_author(name=author)
+        for channel_id in channel_ids:
+            channel = self.bot.get_channel(channel_id)
+            if channel is None:
+                self.logger.warning(f"Announcement channel {channel_id} not found")
+                continue
+            await self.bot.scheduler.submit(
+                lambda channel=channel: channel.send(embed=embed),
+                route=Routes.MESSAGE_CREATE,
+                guild_id=channel.guild.id,
+                major=channel.id,
+                priority=Priority.NORMAL,
+            )
+
+    @tasks.loop(seconds=RELAY_INTERVAL)
+    async def relay_announcements(self) -> None:
+        """Poll the linked courses and post their new announcements."""
+        try:
+            await self.relay.poll()
+        except Exception as e:
+            self.logger.exception(f"Announcement relay failed: {e}")
+
+    @relay_announcements.before_loop
+    async def before_relay(self) -> None:
+        await self.bot.wait_until_ready()
 
 
 async def setup(bot):
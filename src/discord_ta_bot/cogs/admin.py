@@ -1,11 +1,37 @@
+import io
 import os
+import time
 import discord
 import asyncio
 import logging
+from typing import Awaitable, Callable
 from discord import app_commands
 from discord.ext import commands
 from discord.app_commands.checks import has_permissions
 
+from ..utils import (
+    Job,
+    LogQuery,
+    Priority,
+    ProgressMessage,
+    Routes,
+    run_as_job,
+    run_worker_pool,
+    send_report,
+    tail_log,
+)
+
+# Replies longer than this are sent as a file instead of a code block.
+_MAX_INLINE_LOG = 1900
+# Maximum number of roles/channels deleted at once by the bulk deletion commands.
+DEFAULT_DELETE_CONCURRENCY = int(os.getenv("DELETE_CONCURRENCY", 8))
+# Names the bulk deletion commands never delete (case-insensitive).
+PROTECTED_NAMES = frozenset(
+    name.strip().lower()
+    for name in os.getenv("PROTECTED_NAMES", "students,Alumni").split(",")
+    if name.strip()
+)
+
 
 class Admin(commands.Cog):
     """
@@ -35,30 +61,195 @@ class Admin(commands.Cog):
         ]
         return extensions
 
+    async def _followup(
+        self, interaction: discord.Interaction, text: str, filename: str
+    ) -> None:
+        """Ephemeral followup of ``text``, as a file if it is too long."""
+        await send_report(self.bot.scheduler, interaction, text, filename)
+
+    async def _bulk_delete(
+        self,
+        interaction: discord.Interaction,
+        job: Job,
+        noun: str,
+        targets: list[discord.Role] | list[discord.abc.GuildChannel],
+        route: str,
+        concurrency: int,
+    ) -> tuple[list, list[str], float]:
+        """
+        Delete ``targets`` with up to ``concurrency`` deletions in flight,
+        counting them on ``job`` and keeping a progress message with counts
+        and throughput up to date. Returns the deleted targets, a note per
+        failure and the elapsed time.
+        """
+        guild = interaction.guild
+        deleted: list = []
+        failures: list[str] = []
+        job.total = len(targets)
+        started = time.perf_counter()
+
+        async def delete(target) -> None:
+            try:
+                await self.bot.scheduler.submit(
+                    lambda: target.delete(),
+                    route=route,
+                    guild_id=guild.id,
+                    major=target.id if route == Routes.CHANNEL_DELETE else None,
+                    priority=Priority.BULK,
+                )
+            except discord.NotFound:
+                pass  # Already gone.
+            except discord.HTTPException as e:
+                self.log.warning(f"Could not delete {noun} {target.id} in {guild.id}: {e}")
+                failures.append(f"`{target.name}`: {e.text or e.status}")
+                job.advance(failed=True)
+                return
+            deleted.append(target)
+            job.advance()
+
+        def render() -> str:
+            elapsed = time.perf_counter() - started
+            rate = f" ({job.done / elapsed:.1f}/s)" if job.done and elapsed else ""
+            failed = f", {job.failed} failed" if job.failed else ""
+            return (
+                f"Job #{job.id}: deleting {noun}s: {job.done}/{len(targets)} "
+                f"done{rate}{failed}. Stop it with `/jobs cancel {job.id}`."
+            )
+
+        async with ProgressMessage(self.bot.scheduler, interaction, render):
+            # Time the deletions only, not sending the progress message.
+            started = time.perf_counter()
+            await run_worker_pool(targets, delete, concurrency)
+        elapsed = time.perf_counter() - started
+        self.log.info(
+            f"Deleted {len(deleted)}/{len(targets)} {noun}(s) in {guild.id} "
+            f"in {elapsed:.2f}s"
+        )
+        return deleted, failures, elapsed
+
+    def _deletion_report(
+        self,
+        summary: str,
+        elapsed: float,
+        count: int,
+        failures: list[str],
+        skipped: list[str],
+    ) -> str:
+        if elapsed and count:
+            summary += f" in {elapsed:.1f}s ({count / elapsed:.1f}/s)"
+        lines = [summary + "."]
+        if failures:
+            lines += ["Failed:"] + [f"- {failure}" for failure in failures]
+        if skipped:
+            lines += ["Skipped:"] + [f"- {name}" for name in skipped]
+        return "\n".join(lines)
+
+    async def _start_deletion(
+        self,
+        interaction: discord.Interaction,
+        command: str,
+        work: Callable[[Job], Awaitable[str]],
+    ) -> None:
+        """
+        Run a bulk deletion as a background job; one per command and guild
+        at a time. Its progress message tells the user the job id.
+        """
+        await run_as_job(
+            self.bot.jobs,
+            self.bot.scheduler,
+            interaction,
+            command,
+            work,
+            f"{command}.txt",
+            key=f"{command}:{interaction.guild_id}",
+            announce=False,
+        )
+
     @app_commands.command(
         name="delete_groups",
         description="Delete groups with a prefix",
     )
+    @app_commands.describe(
+        concurrency="Maximum number of roles deleted at once.",
+        dry_run="Only list the roles that would be deleted.",
+    )
     @has_permissions(administrator=True)
     async def delete_groups(
-        self, interaction: discord.Interaction, prefix: str
+        self,
+        interaction: discord.Interaction,
+        prefix: str,
+        concurrency: app_commands.Range[int, 1, 50] = DEFAULT_DELETE_CONCURRENCY,
+        dry_run: bool = False,
     ) -> None:
+        """
+        Delete every role whose name starts with ``prefix``. Protected roles
+        (PROTECTED_NAMES, by default ``students`` and ``Alumni``), the
+        ``@everyone`` role, integration roles and roles above the bot's own
+        are never deleted. The deletion runs as a background job (see
+        ``/jobs``).
+        """
+        if not prefix:
+            await interaction.response.send_message(
+                "Prefix must be something", ephemeral=True
+            )
+            return
         await interaction.response.defer(ephemeral=True, thinking=True)
         guild = interaction.guild
 
+        targets, skipped = [], []
         for role in guild.roles:
-            if role.name.startswith(prefix):
-                await role.delete()
-        await interaction.followup.send("Done", ephemeral=True)
+            if not role.name.startswith(prefix):
+                continue
+            if role.name.lower() in PROTECTED_NAMES:
+                skipped.append(f"`{role.name}` (protected)")
+            elif not role.is_assignable():
+                skipped.append(f"`{role.name}` (managed or above the bot's role)")
+            else:
+                targets.append(role)
+
+        if dry_run:
+            lines = [f"Would delete {len(targets)} role(s) starting with `{prefix}`:"]
+            lines += [f"- `{role.name}`" for role in targets]
+            if skipped:
+                lines += ["Skipped:"] + [f"- {name}" for name in skipped]
+            await self._followup(interaction, "\n".join(lines), "delete_groups.txt")
+            return
+
+        async def work(job: Job) -> str:
+            deleted, failures, elapsed = await self._bulk_delete(
+                interaction, job, "role", targets, Routes.ROLE_DELETE, concurrency
+            )
+            return self._deletion_report(
+                f"Deleted {len(deleted)} role(s) starting with `{prefix}`",
+                elapsed,
+                len(deleted),
+                failures,
+                skipped,
+            )
+
+        await self._start_deletion(interaction, "delete_groups", work)
 
     @app_commands.command(
         name="delete_channels",
         description="Delete channels(text and voice) with given sprefix",
     )
+    @app_commands.describe(
+        concurrency="Maximum number of channels deleted at once.",
+        dry_run="Only list the channels that would be deleted.",
+    )
     @has_permissions(administrator=True)
     async def delete_channels(
-        self, interaction: discord.Interaction, prefix: str
+        self,
+        interaction: discord.Interaction,
+        prefix: str,
+        concurrency: app_commands.Range[int, 1, 50] = DEFAULT_DELETE_CONCURRENCY,
+        dry_run: bool = False,
     ) -> None:
+        """
+        Delete every text and voice channel whose name starts with
+        ``prefix``, except protected ones (PROTECTED_NAMES). The deletion
+        runs as a background job (see ``/jobs``).
+        """
         if not prefix:
             await interaction.response.send_message(
                 "Prefix must be something", ephemeral=True
@@ -66,22 +257,41 @@ class Admin(commands.Cog):
             return
         await interaction.response.defer(ephemeral=True, thinking=True)
         guild = interaction.guild
-        tc = [
-            textch for textch in guild.text_channels if textch.name.startswith(prefix)
-        ]
-        vc = [
-            voicech
-            for voicech in guild.voice_channels
-            if voicech.name.startswith(prefix)
-        ]
-        for channel in tc:
-            await channel.delete()
-        for channel in vc:
-            await channel.delete()
-        await interaction.followup.send(
-            f"Deleted {len(tc)} text channels and {len(vc)} voice channels starting with: {prefix}",
-            ephemeral=True,
-        )
+
+        targets, skipped = [], []
+        for channel in guild.text_channels + guild.voice_channels:
+            if not channel.name.startswith(prefix):
+                continue
+            if channel.name.lower() in PROTECTED_NAMES:
+                skipped.append(f"`{channel.name}` (protected)")
+            else:
+                targets.append(channel)
+
+        if dry_run:
+            lines = [
+                f"Would delete {len(targets)} channel(s) starting with `{prefix}`:"
+            ]
+            lines += [f"- `{channel.name}` ({channel.type})" for channel in targets]
+            if skipped:
+                lines += ["Skipped:"] + [f"- {name}" for name in skipped]
+            await self._followup(interaction, "\n".join(lines), "delete_channels.txt")
+            return
+
+        async def work(job: Job) -> str:
+            deleted, failures, elapsed = await self._bulk_delete(
+                interaction, job, "channel", targets, Routes.CHANNEL_DELETE, concurrency
+            )
+            text = sum(isinstance(c, discord.TextChannel) for c in deleted)
+            return self._deletion_report(
+                f"Deleted {text} text channels and {len(deleted) - text} voice "
+                f"channels starting with: {prefix}",
+                elapsed,
+                len(deleted),
+                failures,
+                skipped,
+            )
+
+        await self._start_deletion(interaction, "delete_channels", work)
 
     @app_commands.command(
         name="unload",
@@ -164,14 +374,114 @@ class Admin(commands.Cog):
     @has_permissions(administrator=True)
     async def sync_commands(self, interaction: discord.Interaction):
         """
-        Syncs commands with the discord API.
+        Syncs commands with the discord API, even if they are unchanged.
         Will make breaking changes to your bot visible to users.
         """
         await interaction.response.defer(ephemeral=True, thinking=True)
 
-        await self.bot.sync_commands()
+        await self.bot.sync_commands(force=True)
         await interaction.followup.send("Commands synced.", ephemeral=True)
 
+    @app_commands.command(
+        name="logs",
+        description="Show the last lines of the bot's log.",
+    )
+    @app_commands.describe(
+        lines="Number of log records to show",
+        level="Only show records of this level or higher",
+        logger="Only show records of this logger (and its children)",
+        guild_id="Only show records mentioning this guild id",
+    )
+    @app_commands.choices(
+        level=[
+            app_commands.Choice(name=level, value=level)
+            for level in ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+        ]
+    )
+    @has_permissions(administrator=True)
+    async def logs(
+        self,
+        interaction: discord.Interaction,
+        lines: app_commands.Range[int, 1, 1000] = 50,
+        level: str | None = None,
+        logger: str | None = None,
+        guild_id: str | None = None,
+    ) -> None:
+        """
+        Show the newest log records, reading backwards from the end of the
+        active log file and then its rotated files.
+
+        The log is shared by every guild, so only the bot owner may read
+        records of other guilds; for anyone else ``guild_id`` is this guild.
+        Records of level WARNING and above are read from the smaller
+        warning log, everything else from the debug log.
+        """
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        if not await self.bot.is_owner(interaction.user):
+            guild_id = str(interaction.guild_id)
+
+        query = LogQuery(level=level, logger=logger, text=guild_id)
+        path = (
+            self.bot.log_path
+            if query.level is not None and query.level >= logging.WARNING
+            else self.bot.debug_log_path
+        )
+        self.log.debug(
+            f"User [{interaction.user.id}] from [{interaction.guild_id}] reading "
+            f"{lines} log record(s): level={level} logger={logger} guild={guild_id}"
+        )
+        records = await asyncio.to_thread(tail_log, path, lines, query)
+
+        if not records:
+            await interaction.followup.send("No matching log records.", ephemeral=True)
+            return
+        text = "\n".join(records)
+        if len(text) <= _MAX_INLINE_LOG:
+            await interaction.followup.send(f"```\n{text}\n```", ephemeral=True)
+        else:
+            await interaction.followup.send(
+                f"Last {len(records)} log record(s):",
+                file=discord.File(io.BytesIO(text.encode()), filename="logs.txt"),
+                ephemeral=True,
+            )
+
+    @app_commands.command(
+        name="shards",
+        description="Show the health of this process's gateway shards.",
+    )
+    @has_permissions(administrator=True)
+    async def shards(self, interaction: discord.Interaction) -> None:
+        """
+        List the shards run by this process with their latency, connection
+        state and guild count. In a cluster, other workers' shards are not
+        listed; their metrics endpoints report them.
+        """
+        if isinstance(self.bot, commands.AutoShardedBot):
+            shards = sorted(self.bot.shards.items())
+        else:
+            shards = [(0, None)]
+        guilds: dict[int, int] = {}
+        for guild in self.bot.guilds:
+            guilds[guild.shard_id] = guilds.get(guild.shard_id, 0) + 1
+
+        lines = []
+        for shard_id, shard in shards:
+            closed = self.bot.is_closed() if shard is None else shard.is_closed()
+            latency = self.bot.latency if shard is None else shard.latency
+            state = "down" if closed else f"{latency * 1000:.0f} ms"
+            lines.append(
+                f"{shard_id:>4}  {state:>8}  {guilds.get(shard_id, 0)} guild(s)"
+            )
+        here = (
+            f"shard {interaction.guild.shard_id}"
+            if interaction.guild is not None
+            else "no guild"
+        )
+        await interaction.response.send_message(
+            f"This guild is on {here}.\n```\n" + "\n".join(lines) + "\n```",
+            ephemeral=True,
+        )
+
     @app_commands.command(
         name="timer",
         description="Set a timer.",
@@ -0,0 +1,111 @@
+import logging
+import discord
+from discord import app_commands
+from discord.ext import commands
+from discord.app_commands.checks import has_permissions
+
+from ..Bot import Bot
+from ..utils import Job, send_report
+
+
+class Jobs(commands.GroupCog, group_name="jobs"):
+    """
+    Inspect and stop the background jobs of ``bot.jobs``: semester
+    transitions, rollovers and bulk deletions.
+
+    Administrators see and cancel the jobs started in their guild; the bot
+    owner sees and cancels every job of this bot process.
+
+    Parameters
+    ----------
+    bot : commands.Bot
+        The bot object.
+    """
+
+    def __init__(self, bot):
+        self.bot: Bot = bot
+        self.logger = logging.getLogger(__name__)
+
+    async def _visible(self, interaction: discord.Interaction) -> list[Job]:
+        """Jobs the user may see, running first, newest first."""
+        if await self.bot.is_owner(interaction.user):
+            return self.bot.jobs.list()
+        return self.bot.jobs.list(interaction.guild_id)
+
+    async def _job(self, interaction: discord.Interaction, job_id: int) -> Job | None:
+        job = self.bot.jobs.get(job_id)
+        if job is None or job not in await self._visible(interaction):
+            await interaction.response.send_message(
+                f"No job #{job_id} in this server.", ephemeral=True
+            )
+            return None
+        return job
+
+    async def job_autocomplete(
+        self, interaction: discord.Interaction, current: str
+    ) -> list[app_commands.Choice[int]]:
+        """Visible jobs whose id starts with what was typed so far."""
+        return [
+            app_commands.Choice(name=f"#{job.id} {job.name} ({job.state})", value=job.id)
+            for job in await self._visible(interaction)
+            if str(job.id).startswith(current)
+        ][:25]
+
+    @app_commands.command(name="list", description="List running and recent jobs.")
+    @has_permissions(administrator=True)
+    async def list_jobs(self, interaction: discord.Interaction) -> None:
+        jobs = await self._visible(interaction)
+        if not jobs:
+            await interaction.response.send_message("No jobs.", ephemeral=True)
+            return
+        await interaction.response.defer(ephemeral=True)
+        await send_report(
+            self.bot.scheduler,
+            interaction,
+            "\n".join(job.describe() for job in jobs),
+            "jobs.txt",
+        )
+
+    @app_commands.command(name="status", description="Show a job's progress or result.")
+    @app_commands.describe(job_id="The job's number, as shown by /jobs list.")
+    @app_commands.autocomplete(job_id=job_autocomplete)
+    @has_permissions(administrator=True)
+    async def status(self, interaction: discord.Interaction, job_id: int) -> None:
+        """The job's progress and ETA, or its report if it has finished."""
+        job = await self._job(interaction, job_id)
+        if job is None:
+            return
+        text = job.describe()
+        if job.result:
+            text += "\n\n" + job.result
+        elif job.error:
+            text += "\n\n" + job.error
+        await interaction.response.defer(ephemeral=True)
+        await send_report(self.bot.scheduler, interaction, text, f"job_{job.id}.txt")
+
+    @app_commands.command(name="cancel", description="Stop a running job.")
+    @app_commands.describe(job_id="The job's number, as shown by /jobs list.")
+    @app_commands.autocomplete(job_id=job_autocomplete)
+    @has_permissions(administrator=True)
+    async def cancel(self, interaction: discord.Interaction, job_id: int) -> None:
+        """
+        Cancel a running job. Calls already sent are not undone; an
+        interrupted semester transition can be finished with
+        ``/resume_semester``.
+        """
+        job = await self._job(interaction, job_id)
+        if job is None:
+            return
+        if not self.bot.jobs.cancel(job.id):
+            await interaction.response.send_message(
+                f"Job #{job.id} has already {job.state}.", ephemeral=True
+            )
+            return
+        self.logger.info(f"User [{interaction.user.id}] cancelled job {job.id}")
+        await interaction.response.send_message(
+            f"Cancelling job #{job.id} `{job.name}`.", ephemeral=True
+        )
+
+
+async def setup(bot):
+    await bot.add_cog(Jobs(bot))
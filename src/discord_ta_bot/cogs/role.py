@@ -1,15 +1,55 @@
+import os
 import re
+import time
+import itertools
+import contextlib
 import discord
 import logging
 from datetime import datetime, timezone
+from typing import Iterator, Optional
 from ..Bot import Bot
+from ..utils import (
+    GROUP_ROLE_PATTERN,
+    GuildIndex,
+    Job,
+    JobConflict,
+    Plan,
+    Priority,
+    ProgressMessage,
+    Routes,
+    TransitionJournal,
+    run_as_job,
+    run_worker_pool,
+)
 from discord import app_commands
 from discord.ext import commands
 from discord.app_commands.checks import has_permissions
 
-
-GROUP_ROLE_PATTERN = re.compile(r"^(\d{4})_group_(\d+)$")
 ONBOARDING_PROMPT_TITLE = "Which group are you in?"
+# Discord allows at most 50 options per onboarding prompt; more groups are
+# split over several prompts.
+MAX_PROMPT_OPTIONS = 50
+# Active group channels go to these categories (numbered ``_2``, ``_3``, …
+# once full).
+GROUP_TEXT_CATEGORY = "group_text_channels"
+GROUP_VOICE_CATEGORY = "group_voice_channels"
+# Archived text channels go to ``<ARCHIVE_CATEGORY>_<year>`` categories
+# (numbered the same way); older archives used the bare name.
+ARCHIVE_CATEGORY = "Archived_text_channels"
+# Discord allows at most 50 channels per category.
+MAX_CATEGORY_CHANNELS = 50
+# Most groups a semester can have: each takes a role and two channels, and
+# Discord caps a guild at 250 roles and 500 channels.
+MAX_GROUPS = 200
+# The single group prompt, or one of its ranges, e.g. "... (groups 51–100)".
+_GROUP_PROMPT_TITLE = re.compile(
+    re.escape(ONBOARDING_PROMPT_TITLE) + r"( \(groups \d+–\d+\))?"
+)
+# Maximum number of provisioning REST calls in flight at once. 1 restores the
+# original one-call-at-a-time behaviour.
+DEFAULT_PROVISION_CONCURRENCY = int(os.getenv("PROVISION_CONCURRENCY", 8))
+# Maximum number of guilds /rollover transitions at once.
+DEFAULT_ROLLOVER_CONCURRENCY = int(os.getenv("ROLLOVER_GUILD_CONCURRENCY", 4))
 
 
 class Role(commands.Cog):
@@ -25,9 +65,17 @@ class Role(commands.Cog):
     set read-only) and the onboarding prompt is removed. Roles are left as-is
     so members retain access to their archived channel automatically.
 
-    The bot is fully stateless — all context is derived from
-    ``interaction.guild`` at command time. Multiple guilds are supported
-    without any shared state.
+    Each transition is planned before it runs: the planners compare the
+    desired guild state with the current one and only emit the mutations
+    that are actually needed, so re-runs are nearly free and ``dry_run``
+    can show the cost of a run before it starts.
+
+    All context is derived from ``interaction.guild`` at command time: the
+    guild's roles and channels are the only record of its semesters. The
+    bot-wide services shared by every guild are ``bot.indexes`` (lookup
+    tables for the planners), ``bot.scheduler`` (which paces every mutation),
+    ``bot.jobs`` (which runs each transition as a background job) and the
+    transition journals that let an interrupted run be resumed.
 
     Parameters
     ----------
@@ -38,6 +86,7 @@ class Role(commands.Cog):
     def __init__(self, bot):
         self.bot: Bot = bot
         self.logger: logging.Logger = logging.getLogger(__name__)
+        self.default_deny = discord.PermissionOverwrite(view_channel=False)
         self.group_text_permissions = discord.PermissionOverwrite(
             view_channel=True,
             send_messages=True,
@@ -57,13 +106,31 @@ class Role(commands.Cog):
             use_voice_activation=True,
         )
 
-    async def get_or_create_category(
-        self, guild: discord.Guild, name: str
-    ) -> discord.CategoryChannel:
-        category = discord.utils.get(guild.categories, name=name)
-        if not category:
-            category = await guild.create_category(name)
-        return category
+    async def _mutate(
+        self,
+        guild: discord.Guild,
+        route: str,
+        factory,
+        priority: Priority = Priority.BULK,
+        major: int | None = None,
+    ):
+        """
+        Send a REST mutation for ``guild`` through the bot's scheduler.
+        Channel routes pass the channel id as ``major``.
+        """
+        return await self.bot.scheduler.submit(
+            factory, route=route, guild_id=guild.id, major=major, priority=priority
+        )
+
+    async def _reply(self, interaction: discord.Interaction, content: str) -> None:
+        """Send an ephemeral followup ahead of any queued bulk mutations."""
+        await self.bot.scheduler.submit(
+            lambda: interaction.followup.send(content, ephemeral=True),
+            route=Routes.FOLLOWUP,
+            guild_id=interaction.guild_id,
+            major=interaction.token,
+            priority=Priority.INTERACTIVE,
+        )
 
     def _check_bot_permissions(self, guild: discord.Guild) -> str | None:
         """Return an error message if the bot lacks required permissions, else None."""
@@ -79,189 +146,1037 @@ class Role(commands.Cog):
             return f"Bot is missing required permissions: {', '.join(missing)}."
         return None
 
-    async def create_groups(
-        self, guild: discord.Guild, year: int, number_of_roles: int
-    ) -> tuple[list[discord.Role], list[str]]:
+    def _index(self, guild: discord.Guild) -> GuildIndex:
+        """The bot's event-maintained lookup index for ``guild``."""
+        return self.bot.indexes.get(guild)
+
+    def _role(self, plan: Plan, guild: discord.Guild, name: str) -> discord.Role | None:
+        """Role ``name``, preferring one created earlier in ``plan``."""
+        return plan.results.get(f"role:{name}") or self._index(guild).role(name)
+
+    def _category(
+        self, plan: Plan, guild: discord.Guild, name: str
+    ) -> discord.CategoryChannel | None:
+        """Category ``name``, preferring one created earlier in ``plan``."""
+        return plan.results.get(f"category:{name}") or self._index(guild).category(
+            name
+        )
+
+    def _plan_category(
+        self,
+        plan: Plan,
+        guild: discord.Guild,
+        name: str,
+        overwrites: dict | None = None,
+    ) -> None:
+        """Plan creation of category ``name`` unless it exists."""
+        if self._index(guild).category(name):
+            return
+
+        async def create() -> discord.CategoryChannel:
+            category = await self._mutate(
+                guild,
+                Routes.CHANNEL_CREATE,
+                lambda: guild.create_category(name, overwrites=overwrites or {}),
+                Priority.NORMAL,
+            )
+            self.logger.info(f"Created category: {name}")
+            return category
+
+        plan.add(
+            "categories",
+            f"category:{name}",
+            "category create",
+            Routes.CHANNEL_CREATE,
+            f"Create category `{name}`",
+            create,
+        )
+
+    @staticmethod
+    def _category_names(base: str) -> Iterator[str]:
+        """``base``, then its overflow categories ``base_2``, ``base_3``, …"""
+        yield base
+        for n in itertools.count(2):
+            yield f"{base}_{n}"
+
+    @classmethod
+    def _archive_category_names(cls, year: int) -> Iterator[str]:
+        """``Archived_text_channels_<year>``, then ``…_<year>_2``, ``…_<year>_3``, …"""
+        return cls._category_names(f"{ARCHIVE_CATEGORY}_{year}")
+
+    def _existing_categories(
+        self, guild: discord.Guild, base: str
+    ) -> list[discord.CategoryChannel]:
+        """``base`` and its overflow categories, up to the first missing one."""
+        index = self._index(guild)
+        categories = []
+        for name in self._category_names(base):
+            category = index.category(name)
+            if category is None:
+                return categories
+            categories.append(category)
+
+    def _plan_categories(
+        self,
+        plan: Plan,
+        guild: discord.Guild,
+        names: Iterator[str],
+        count: int,
+        overwrites: dict | None = None,
+    ) -> list[str]:
+        """
+        The category for each of ``count`` new channels. The categories
+        ``names`` are filled in order up to ``MAX_CATEGORY_CHANNELS`` channels
+        each, going by the index's channel counts; categories that are needed
+        but missing are planned with ``overwrites``.
+        """
+        index = self._index(guild)
+        placement: list[str] = []
+        for name in names:
+            if len(placement) == count:
+                break
+            category = index.category(name)
+            used = index.channel_count(category) if category else 0
+            free = min(MAX_CATEGORY_CHANNELS - used, count - len(placement))
+            if free <= 0:
+                continue
+            self._plan_category(plan, guild, name, overwrites)
+            placement += [name] * free
+        return placement
+
+    def _plan_archive_categories(
+        self, plan: Plan, guild: discord.Guild, year: int, count: int
+    ) -> list[str]:
+        """The archive category for each of ``count`` text channels archived in ``year``."""
+        return self._plan_categories(
+            plan, guild, self._archive_category_names(year), count
+        )
+
+    def _group_channel(
+        self, guild: discord.Guild, kind: str, name: str
+    ) -> discord.abc.GuildChannel | None:
+        """Group ``kind`` (text/voice) channel ``name`` in any active group category."""
+        index = self._index(guild)
+        if kind == "text":
+            base, lookup = GROUP_TEXT_CATEGORY, index.text_channel
+        else:
+            base, lookup = GROUP_VOICE_CATEGORY, index.voice_channel
+        for category in self._existing_categories(guild, base):
+            if channel := lookup(category, name):
+                return channel
+        return None
+
+    def _archived_text_channel(
+        self, guild: discord.Guild, year: int, name: str
+    ) -> discord.TextChannel | None:
+        """
+        Text channel ``name`` in the legacy ``Archived_text_channels``
+        category or one of ``year``'s archive categories.
+        """
+        index = self._index(guild)
+        legacy = index.category(ARCHIVE_CATEGORY)
+        if legacy and (channel := index.text_channel(legacy, name)):
+            return channel
+        for category_name in self._archive_category_names(year):
+            category = index.category(category_name)
+            if category is None:
+                return None
+            if channel := index.text_channel(category, name):
+                return channel
+
+    def _plan_alumni_role(self, plan: Plan, guild: discord.Guild, reason: str) -> None:
+        """Plan creation of the ``Alumni`` role unless it exists."""
+        if self._index(guild).role("Alumni"):
+            return
+
+        async def create() -> discord.Role:
+            role = await self._mutate(
+                guild,
+                Routes.ROLE_CREATE,
+                lambda: guild.create_role(name="Alumni", reason=reason, hoist=True),
+                Priority.NORMAL,
+            )
+            self.logger.info("Created Alumni role")
+            return role
+
+        plan.add(
+            "roles",
+            "role:Alumni",
+            "role create",
+            Routes.ROLE_CREATE,
+            "Create role `Alumni`",
+            create,
+        )
+
+    def plan_groups(
+        self,
+        plan: Plan,
+        guild: discord.Guild,
+        year: int,
+        number_of_roles: int,
+        journal: TransitionJournal | None = None,
+    ) -> None:
         """
-        Create ``<year>_group_1`` … ``<year>_group_n`` roles for the semester.
+        Plan ``<year>_group_1`` … ``<year>_group_n`` roles for the semester.
 
-        Roles that already exist are skipped with a warning (this normally
-        should not happen — roles from a previous semester have a different
-        year prefix). Returns a tuple of ``(roles, warnings)``.
+        Missing roles are created hoisted. Roles that already exist are
+        skipped with a warning (this normally should not happen — roles from
+        a previous semester have a different year prefix) and only edited if
+        they are not hoisted. Roles ``journal`` shows this run created are
+        skipped silently.
         """
-        roles: list[discord.Role] = []
-        warnings: list[str] = []
+        journal = journal or TransitionJournal()
+        index = self._index(guild)
         for n in range(1, number_of_roles + 1):
             name = f"{year}_group_{n}"
-            existing = discord.utils.get(guild.roles, name=name)
-            if existing:
+            existing = index.group_role(year, n)
+            if existing is None:
+
+                async def create(name: str = name) -> discord.Role:
+                    role = await self._mutate(
+                        guild,
+                        Routes.ROLE_CREATE,
+                        lambda: guild.create_role(name=name, hoist=True),
+                    )
+                    self.logger.info(f"Created role: {role.name}")
+                    return role
+
+                plan.add(
+                    "roles",
+                    f"role:{name}",
+                    "role create",
+                    Routes.ROLE_CREATE,
+                    f"Create role `{name}`",
+                    create,
+                )
+                continue
+
+            if not journal.is_done(f"role:{name}"):
                 msg = f"Role `{name}` already exists — skipped."
-                await existing.edit(hoist=True)
                 self.logger.warning(msg)
-                warnings.append(msg)
-                roles.append(existing)
-            else:
-                role = await guild.create_role(name=name, hoist=True)
-                self.logger.info(f"Created role: {role.name}")
-                roles.append(role)
-
-        return roles, warnings
+                plan.warnings.append(msg)
+            if not existing.hoist:
+                plan.add(
+                    "roles",
+                    f"hoist:{name}",
+                    "role edit",
+                    Routes.ROLE_EDIT,
+                    f"Hoist role `{name}`",
+                    lambda role=existing: self._mutate(
+                        guild, Routes.ROLE_EDIT, lambda: role.edit(hoist=True)
+                    ),
+                )
 
-    async def setup_group_channels(
-        self, guild: discord.Guild, roles: list[discord.Role]
-    ) -> list[str]:
+    def plan_group_channels(
+        self,
+        plan: Plan,
+        guild: discord.Guild,
+        year: int,
+        number_of_roles: int,
+        journal: TransitionJournal | None = None,
+    ) -> None:
         """
-        Create private text and voice channels for each group role under
-        dedicated categories. @everyone is denied view access on both
+        Plan private text and voice channels for each group role under
+        dedicated categories. @everyone is denied view access on the
         categories; each group role is granted access only to its own
         channels.
 
-        Channels that already exist inside the respective category are
-        skipped with a warning. Returns a list of warning strings.
+        Discord allows ``MAX_CATEGORY_CHANNELS`` channels per category, so
+        once ``group_text_channels`` is full new text channels go to
+        ``group_text_channels_2``, ``group_text_channels_3`` and so on (voice
+        channels likewise). Categories are created with the deny overwrite in
+        place; existing categories only get it set if it is missing. Channels
+        that already exist inside one of the categories are skipped with a
+        warning, unless ``journal`` shows this run created them.
         """
-        default_deny = discord.PermissionOverwrite(view_channel=False)
-        warnings: list[str] = []
+        journal = journal or TransitionJournal()
+        channel_kinds = (
+            (GROUP_TEXT_CATEGORY, "text", self.group_text_permissions),
+            (GROUP_VOICE_CATEGORY, "voice", self.group_voice_permissions),
+        )
+        deny = {guild.default_role: self.default_deny}
 
-        text_category = await self.get_or_create_category(guild, "group_text_channels")
-        await text_category.set_permissions(guild.default_role, overwrite=default_deny)
+        for base, kind, permissions in channel_kinds:
+            for category in self._existing_categories(guild, base):
+                if category.overwrites_for(guild.default_role).view_channel is False:
+                    continue
+                plan.add(
+                    "categories",
+                    f"category_permissions:{category.name}",
+                    "category permissions",
+                    Routes.CHANNEL_PERMISSIONS,
+                    f"Hide `{category.name}` from @everyone",
+                    lambda category=category: self._mutate(
+                        guild,
+                        Routes.CHANNEL_PERMISSIONS,
+                        lambda: category.set_permissions(
+                            guild.default_role, overwrite=self.default_deny
+                        ),
+                        Priority.NORMAL,
+                        major=category.id,
+                    ),
+                )
 
-        voice_category = await self.get_or_create_category(
-            guild, "group_voice_channels"
-        )
-        await voice_category.set_permissions(guild.default_role, overwrite=default_deny)
+            missing = []
+            for n in range(1, number_of_roles + 1):
+                name = f"{year}_group_{n}"
+                existing = self._group_channel(guild, kind, name)
+                if existing is None:
+                    missing.append(name)
+                elif not journal.is_done(f"{kind}:{name}"):
+                    msg = f"{kind.capitalize()} channel `{name}` already exists in `{existing.category.name}` — skipped."
+                    self.logger.warning(msg)
+                    plan.warnings.append(msg)
+            if not missing:
+                # Keep the base category even when every channel exists.
+                if not self._existing_categories(guild, base):
+                    self._plan_category(plan, guild, base, deny)
+                continue
+            placement = self._plan_categories(
+                plan, guild, self._category_names(base), len(missing), deny
+            )
 
-        existing_text_names = {ch.name for ch in text_category.text_channels}
-        existing_voice_names = {ch.name for ch in voice_category.voice_channels}
+            for name, category_name in zip(missing, placement):
 
-        for role in roles:
-            if role.name in existing_text_names:
-                msg = f"Text channel `{role.name}` already exists in `group_text_channels` — skipped."
-                self.logger.warning(msg)
-                warnings.append(msg)
-            else:
-                await text_category.create_text_channel(
-                    role.name,
-                    overwrites={
-                        guild.default_role: default_deny,
-                        role: self.group_text_permissions,
-                    },
+                async def create(
+                    name: str = name,
+                    kind: str = kind,
+                    category_name: str = category_name,
+                    permissions: discord.PermissionOverwrite = permissions,
+                ) -> None:
+                    category = self._category(plan, guild, category_name)
+                    overwrites = {
+                        guild.default_role: self.default_deny,
+                        self._role(plan, guild, name): permissions,
+                    }
+                    create_channel = (
+                        category.create_text_channel
+                        if kind == "text"
+                        else category.create_voice_channel
+                    )
+                    await self._mutate(
+                        guild,
+                        Routes.CHANNEL_CREATE,
+                        lambda: create_channel(name, overwrites=overwrites),
+                    )
+                    self.logger.info(f"Created {kind} channel: {name}")
+
+                plan.add(
+                    "channels",
+                    f"{kind}:{name}",
+                    f"{kind} channel create",
+                    Routes.CHANNEL_CREATE,
+                    f"Create {kind} channel `{name}`",
+                    create,
                 )
-                self.logger.info(f"Created text channel: {role.name}")
 
-            if role.name in existing_voice_names:
-                msg = f"Voice channel `{role.name}` already exists in `group_voice_channels` — skipped."
-                self.logger.warning(msg)
-                warnings.append(msg)
-            else:
-                await voice_category.create_voice_channel(
-                    role.name,
-                    overwrites={
-                        guild.default_role: default_deny,
-                        role: self.group_voice_permissions,
-                    },
+    def plan_member_migration(
+        self,
+        plan: Plan,
+        guild: discord.Guild,
+        group_roles: list[discord.Role],
+        students_role: discord.Role | None,
+    ) -> None:
+        """
+        Plan moving every member of ``group_roles`` and ``students_role`` to
+        their end-of-semester role set in a single edit per member.
+
+        Group members gain ``Alumni``; everyone loses ``students_role``.
+        Members already in that state are left out of the plan. Each final
+        role list is computed from the member's roles when the edit runs and
+        applied with one ``member.edit(roles=...)`` call.
+        """
+        index = self._index(guild)
+        alumni_role = index.role("Alumni")
+        group_members: dict[int, discord.Member] = {}
+        for role in group_roles:
+            for member in index.members_of(role):
+                group_members[member.id] = member
+
+        members = dict(group_members)
+        if students_role:
+            for member in index.members_of(students_role):
+                members[member.id] = member
+
+        for member in members.values():
+            is_group_member = member.id in group_members
+            needs_alumni = is_group_member and (
+                alumni_role is None or alumni_role not in member.roles
+            )
+            has_students = students_role is not None and students_role in member.roles
+            if not (needs_alumni or has_students):
+                continue
+
+            async def migrate(
+                member: discord.Member = member, is_group_member: bool = is_group_member
+            ) -> None:
+                alumni = self._role(plan, guild, "Alumni")
+                roles = [
+                    r
+                    for r in member.roles
+                    if not r.is_default() and r != students_role
+                ]
+                students_removed = students_role is not None and (
+                    students_role in member.roles
                 )
-                self.logger.info(f"Created voice channel: {role.name}")
+                alumni_added = is_group_member and alumni not in roles
+                if alumni_added:
+                    roles.append(alumni)
+                await self._mutate(
+                    guild,
+                    Routes.MEMBER_EDIT,
+                    lambda: member.edit(
+                        roles=roles, reason="Semester end — roles updated by bot"
+                    ),
+                )
+                self.logger.info(
+                    f"Updated roles for {member.name}: alumni added="
+                    f"{alumni_added}, students removed={students_removed}"
+                )
+
+            plan.add(
+                "members",
+                f"member:{member.id}",
+                "member edit",
+                Routes.MEMBER_EDIT,
+                f"Update roles of `{member.name}`",
+                migrate,
+            )
 
-        return warnings
+    def _member_error(self, mutation, error: Exception) -> str:
+        """Turn a failed member edit into a warning; re-raise anything else."""
+        if mutation.kind != "member edit" or not isinstance(
+            error, discord.HTTPException
+        ):
+            raise error
+        msg = f"Could not {mutation.description[0].lower()}{mutation.description[1:]}: {error.text or error}"
+        self.logger.warning(msg)
+        return msg
 
-    async def _upsert_onboarding_prompt(
+    def _group_prompt_layout(
         self, guild: discord.Guild, roles: list[discord.Role]
-    ) -> None:
+    ) -> list[tuple[str, list[tuple[str, set[int]]]]]:
         """
-        Update the Discord Onboarding prompt titled ``ONBOARDING_PROMPT_TITLE``
-        so its options match ``roles`` exactly (one option per role).
+        Titles and options (title, role ids) of the group prompts for
+        ``roles``: one prompt titled ``ONBOARDING_PROMPT_TITLE`` for up to
+        ``MAX_PROMPT_OPTIONS`` roles, otherwise one prompt per range of that
+        many groups, e.g. "Which group are you in? (groups 1–50)".
 
         Each option assigns both the group role and the ``students`` role, so
-        that selecting any group automatically grants both roles to the member.
-        If the ``students`` role does not exist it is omitted from the options
-        with a warning.
+        that selecting any group automatically grants both roles to the
+        member. If the ``students`` role does not exist it is omitted from
+        the options with a warning.
+        """
+        students_role = self._index(guild).role("students")
+        if roles and not students_role:
+            self.logger.warning(
+                "'students' role not found — group options will not assign it."
+            )
+        options = [
+            (role.name, {role.id, students_role.id} if students_role else {role.id})
+            for role in roles
+        ]
+        if len(options) <= MAX_PROMPT_OPTIONS:
+            return [(ONBOARDING_PROMPT_TITLE, options)] if options else []
+        return [
+            (
+                f"{ONBOARDING_PROMPT_TITLE} (groups {start + 1}–"
+                f"{min(start + MAX_PROMPT_OPTIONS, len(options))})",
+                options[start : start + MAX_PROMPT_OPTIONS],
+            )
+            for start in range(0, len(options), MAX_PROMPT_OPTIONS)
+        ]
+
+    @staticmethod
+    def _group_prompts_match(
+        prompts: list[discord.OnboardingPrompt],
+        layout: list[tuple[str, list[tuple[str, set[int]]]]],
+    ) -> bool:
+        """Whether the group prompts among ``prompts`` are exactly ``layout``."""
+        current = [
+            (p.title, [(o.title, o.role_ids) for o in p.options])
+            for p in prompts
+            if _GROUP_PROMPT_TITLE.fullmatch(p.title)
+        ]
+        return current == layout
+
+    async def _upsert_onboarding_prompt(
+        self, guild: discord.Guild, roles: list[discord.Role]
+    ) -> None:
+        """
+        Make the Discord Onboarding group prompts match ``roles`` exactly
+        (one option per role, see :meth:`_group_prompt_layout`).
 
-        If the prompt does not exist it is created and appended to the
-        existing prompts. All other prompts are left untouched.
+        The current prompts are compared first and nothing is sent if they
+        already match. Otherwise one edit replaces the group prompts: prompts
+        that already match are kept as they are, new or changed ones take
+        the place of the first existing group prompt (or are appended), and
+        stale ones — e.g. a range that is no longer needed — are removed.
+        All other prompts are left untouched. A single prompt is required;
+        ranged prompts are optional, since a member only picks from one.
 
-        Pass an empty ``roles`` list to remove the prompt entirely (e.g. at
+        Pass an empty ``roles`` list to remove every group prompt (e.g. at
         end of semester). Discord does not allow prompts with zero options,
-        so removal deletes the prompt.
+        so removal deletes the prompts.
         """
         onboarding = await guild.onboarding()
-
-        students_role = discord.utils.get(guild.roles, name="students")
-        if roles and not students_role:
-            self.logger.warning(
-                "'students' role not found — group options will not assign it."
+        layout = self._group_prompt_layout(guild, roles)
+        if self._group_prompts_match(onboarding.prompts, layout):
+            self.logger.info(
+                f"Onboarding group prompts already match {len(roles)} group(s); "
+                "nothing to change."
             )
+            return
 
-        options = [
-            discord.OnboardingPromptOption(
-                title=role.name,
-                roles=[role, students_role] if students_role else [role],
+        existing = {
+            p.title: p
+            for p in onboarding.prompts
+            if _GROUP_PROMPT_TITLE.fullmatch(p.title)
+        }
+        template = next(iter(existing.values()), None)
+        # A single prompt keeps whether it was required; ranges never are.
+        required = len(layout) == 1 and (
+            template.required
+            if template is not None and template.title == ONBOARDING_PROMPT_TITLE
+            else True
+        )
+        group_prompts = []
+        for title, options in layout:
+            prompt = existing.get(title)
+            if prompt is not None and [
+                (o.title, o.role_ids) for o in prompt.options
+            ] == options:
+                group_prompts.append(prompt)
+                continue
+            group_prompts.append(
+                discord.OnboardingPrompt(
+                    type=discord.OnboardingPromptType.multiple_choice,
+                    title=title,
+                    options=[
+                        discord.OnboardingPromptOption(title=name, roles=role_ids)
+                        for name, role_ids in options
+                    ],
+                    single_select=True,
+                    required=required,
+                    in_onboarding=(
+                        template.in_onboarding if template is not None else True
+                    ),
+                )
             )
-            for role in roles
+
+        new_prompts = []
+        for prompt in onboarding.prompts:
+            if prompt is template:
+                new_prompts += group_prompts
+            elif prompt.title not in existing:
+                new_prompts.append(prompt)
+        if template is None:
+            new_prompts += group_prompts
+
+        await self._mutate(
+            guild,
+            Routes.ONBOARDING_EDIT,
+            lambda: guild.edit_onboarding(
+                prompts=new_prompts,
+                reason=(
+                    "Semester update by bot"
+                    if roles
+                    else "Semester end — group prompt removed by bot"
+                ),
+            ),
+            Priority.NORMAL,
+        )
+        self.logger.info(
+            f"Onboarding group prompts set to {len(group_prompts)} prompt(s) "
+            f"with {len(roles)} option(s); {len(existing)} replaced."
+        )
+
+    async def plan_start_semester(
+        self,
+        guild: discord.Guild,
+        year: int,
+        number_of_groups: int,
+        journal: TransitionJournal | None = None,
+    ) -> Plan:
+        """Plan the mutations ``/start_semester`` needs in ``guild``."""
+        plan = Plan(f"Start semester {year} ({number_of_groups} group(s))")
+        self.plan_groups(plan, guild, year, number_of_groups, journal)
+        self._plan_alumni_role(
+            plan, guild, f"Created by bot at beginning of semester {year}"
+        )
+        self.plan_group_channels(plan, guild, year, number_of_groups, journal)
+
+        group_names = [f"{year}_group_{n}" for n in range(1, number_of_groups + 1)]
+        # With every group role in place the prompts can be compared now, so
+        # re-runs plan no onboarding edit at all.
+        roles = [
+            self._index(guild).group_role(year, n)
+            for n in range(1, number_of_groups + 1)
         ]
+        up_to_date = False
+        if all(roles):
+            onboarding = await guild.onboarding()
+            up_to_date = self._group_prompts_match(
+                onboarding.prompts, self._group_prompt_layout(guild, roles)
+            )
+        if not up_to_date:
+            prompts = -(-number_of_groups // MAX_PROMPT_OPTIONS)
+            plan.add(
+                "onboarding",
+                "onboarding",
+                "onboarding edit",
+                Routes.ONBOARDING_EDIT,
+                f"Set onboarding prompt options to {number_of_groups} group(s)"
+                + (f" in {prompts} prompts" if prompts > 1 else ""),
+                lambda: self._upsert_onboarding_prompt(
+                    guild, [self._role(plan, guild, name) for name in group_names]
+                ),
+            )
 
-        existing = next(
-            (p for p in onboarding.prompts if p.title == ONBOARDING_PROMPT_TITLE),
-            None,
+        # Ensure students taking the course again will be displayed as current students not alumni
+        alumni = self._index(guild).role("Alumni")
+        last_group = self._index(guild).group_role(year, number_of_groups)
+        if alumni is None or last_group is None or alumni.position <= last_group.position:
+            plan.add(
+                "positions",
+                "alumni_position",
+                "role move",
+                Routes.ROLE_POSITIONS,
+                "Move `Alumni` above the group roles",
+                lambda: self._mutate(
+                    guild,
+                    Routes.ROLE_POSITIONS,
+                    lambda: self._role(plan, guild, "Alumni").move(
+                        above=self._role(plan, guild, group_names[-1])
+                    ),
+                    Priority.NORMAL,
+                ),
+            )
+        return plan
+
+    async def plan_end_semester(
+        self,
+        guild: discord.Guild,
+        year: int,
+        group_roles: list[discord.Role],
+        journal: TransitionJournal | None = None,
+    ) -> Plan:
+        """Plan the mutations ``/end_semester`` needs to archive ``group_roles``."""
+        journal = journal or TransitionJournal()
+        plan = Plan(f"End semester {year} ({len(group_roles)} group(s))")
+
+        # Do not show group-roles separately after end of semester
+        for role in group_roles:
+            if role.hoist:
+                plan.add(
+                    "roles",
+                    f"hoist:{role.name}",
+                    "role edit",
+                    Routes.ROLE_EDIT,
+                    f"Stop hoisting `{role.name}`",
+                    lambda role=role: self._mutate(
+                        guild, Routes.ROLE_EDIT, lambda: role.edit(hoist=False)
+                    ),
+                )
+        self._plan_alumni_role(plan, guild, f"Created by bot at end of semester {year}")
+
+        index = self._index(guild)
+        students_role = index.role("students")
+        alumni_role = index.role("Alumni")
+        if students_role and (
+            alumni_role is None or alumni_role.position != students_role.position - 1
+        ):
+            plan.add(
+                "positions",
+                "alumni_position",
+                "role move",
+                Routes.ROLE_POSITIONS,
+                "Move `Alumni` directly below `students`",
+                lambda: self._mutate(
+                    guild,
+                    Routes.ROLE_POSITIONS,
+                    lambda: self._role(plan, guild, "Alumni").move(below=students_role),
+                    Priority.NORMAL,
+                ),
+            )
+
+        # Archive text channels (lookup by current role name across the
+        # active categories and their overflow categories)
+        text_channels = {
+            role.id: self._group_channel(guild, "text", role.name)
+            for role in group_roles
+        }
+        placement = iter(
+            self._plan_archive_categories(
+                plan,
+                guild,
+                year,
+                sum(channel is not None for channel in text_channels.values()),
+            )
         )
 
-        # Discord requires 1–50 options per prompt. If roles is empty (e.g.
-        # end_semester), remove the prompt entirely instead of sending 0 options.
-        if not roles:
-            if existing is None:
-                self.logger.info(
-                    f"Onboarding prompt '{ONBOARDING_PROMPT_TITLE}' not found; nothing to remove."
+        for role in group_roles:
+            text_channel = text_channels.get(role.id)
+            if text_channel:
+                archive_name = next(placement)
+
+                async def archive(
+                    role: discord.Role = role,
+                    channel: discord.TextChannel = text_channel,
+                    archive_name: str = archive_name,
+                ) -> None:
+                    overwrites = {
+                        guild.default_role: discord.PermissionOverwrite(
+                            read_messages=False
+                        ),
+                        role: discord.PermissionOverwrite(
+                            read_messages=True,
+                            send_messages=False,
+                            add_reactions=False,
+                        ),
+                    }
+                    await self._mutate(
+                        guild,
+                        Routes.CHANNEL_EDIT,
+                        lambda: channel.edit(
+                            name=role.name,
+                            category=self._category(plan, guild, archive_name),
+                            overwrites=overwrites,
+                        ),
+                        major=channel.id,
+                    )
+                    self.logger.info(
+                        f"Archived text channel `{role.name}` to `{archive_name}` "
+                        f"(read-only for {role.name})"
+                    )
+
+                plan.add(
+                    "channels",
+                    f"archive:{role.name}",
+                    "text channel archive",
+                    Routes.CHANNEL_EDIT,
+                    f"Archive text channel `{role.name}` to `{archive_name}`",
+                    archive,
                 )
-                return
-            new_prompts = [
-                p for p in onboarding.prompts if p.title != ONBOARDING_PROMPT_TITLE
-            ]
-            await guild.edit_onboarding(
-                prompts=new_prompts,
-                reason="Semester end — group prompt removed by bot",
+            elif not journal.is_done(
+                f"archive:{role.name}"
+            ) and not self._archived_text_channel(guild, year, role.name):
+                msg = f"Text channel `{role.name}` not found in `{GROUP_TEXT_CATEGORY}` — skipped."
+                self.logger.warning(msg)
+                plan.warnings.append(msg)
+
+            # Delete voice channel (category-scoped lookup)
+            voice_channel = self._group_channel(guild, "voice", role.name)
+            if voice_channel:
+
+                async def delete_voice(
+                    name: str = role.name, channel: discord.VoiceChannel = voice_channel
+                ) -> None:
+                    await self._mutate(
+                        guild,
+                        Routes.CHANNEL_DELETE,
+                        lambda: channel.delete(),
+                        major=channel.id,
+                    )
+                    self.logger.info(f"Deleted voice channel: {name}")
+
+                plan.add(
+                    "channels",
+                    f"voice_delete:{role.name}",
+                    "voice channel delete",
+                    Routes.CHANNEL_DELETE,
+                    f"Delete voice channel `{role.name}`",
+                    delete_voice,
+                )
+            elif not journal.is_done(f"voice_delete:{role.name}"):
+                msg = f"Voice channel `{role.name}` not found in `{GROUP_VOICE_CATEGORY}` — skipped."
+                self.logger.warning(msg)
+                plan.warnings.append(msg)
+
+        # Give group members Alumni and strip students in one edit per member
+        self.plan_member_migration(plan, guild, group_roles, students_role)
+
+        # Delete the now-empty active categories, overflow ones included
+        for base in (GROUP_TEXT_CATEGORY, GROUP_VOICE_CATEGORY):
+            for category in self._existing_categories(guild, base):
+                plan.add(
+                    "cleanup",
+                    f"category_delete:{category.name}",
+                    "category delete",
+                    Routes.CHANNEL_DELETE,
+                    f"Delete category `{category.name}`",
+                    lambda category=category: self._mutate(
+                        guild,
+                        Routes.CHANNEL_DELETE,
+                        lambda: category.delete(),
+                        major=category.id,
+                    ),
+                )
+
+        # Remove the onboarding group-selection prompts
+        onboarding = await guild.onboarding()
+        if any(_GROUP_PROMPT_TITLE.fullmatch(p.title) for p in onboarding.prompts):
+            plan.add(
+                "onboarding",
+                "onboarding",
+                "onboarding edit",
+                Routes.ONBOARDING_EDIT,
+                "Remove onboarding group prompts",
+                lambda: self._upsert_onboarding_prompt(guild, []),
             )
-            self.logger.info(f"Onboarding prompt '{ONBOARDING_PROMPT_TITLE}' removed.")
-            return
+        return plan
 
-        if existing is not None:
-            updated_prompt = discord.OnboardingPrompt(
-                type=existing.type,
-                title=existing.title,
-                options=options,
-                single_select=existing.single_select,
-                required=existing.required,
-                in_onboarding=existing.in_onboarding,
+    def _describe_plan(
+        self, plan: Plan, guild: discord.Guild, concurrency: int
+    ) -> str:
+        """Dry-run report: the plan, its call count and estimated duration."""
+        summary = plan.render()
+        if plan.call_count():
+            eta = plan.estimate(self.bot.scheduler, guild.id, concurrency)
+            summary += (
+                f"\n\nEstimated duration: ~{eta:.0f}s at current rate limits "
+                f"(concurrency {concurrency})."
             )
-            new_prompts = [
-                updated_prompt if p.title == ONBOARDING_PROMPT_TITLE else p
-                for p in onboarding.prompts
-            ]
-        else:
-            new_prompt = discord.OnboardingPrompt(
-                type=discord.OnboardingPromptType.multiple_choice,
-                title=ONBOARDING_PROMPT_TITLE,
-                options=options,
-                single_select=True,
-                required=True,
-                in_onboarding=True,
+        if plan.warnings:
+            summary += "\n\nWarnings:\n" + "\n".join(f"- {w}" for w in plan.warnings)
+        return summary
+
+    def _calls_summary(self, plan: Plan, elapsed: float, concurrency: int) -> str:
+        if not plan.calls:
+            return f"Nothing needed changing ({elapsed:.1f}s)."
+        return (
+            f"Done in {elapsed:.1f}s with {plan.calls.total()} API call(s) "
+            f"(concurrency {concurrency}): "
+            + ", ".join(f"{count} {kind}" for kind, count in sorted(plan.calls.items()))
+        )
+
+    async def _execute(
+        self,
+        plan: Plan,
+        concurrency: int,
+        journal: TransitionJournal,
+        job: Job | None,
+    ) -> None:
+        """Execute ``plan``, counting its remaining steps on ``job``."""
+        on_step = None
+        if job is not None:
+            job.total = plan.pending_count(journal)
+            on_step = lambda mutation: job.advance()
+        await plan.execute(concurrency, journal, self._member_error, on_step)
+
+    async def _run_start_semester(
+        self,
+        guild: discord.Guild,
+        year: int,
+        number_of_groups: int,
+        concurrency: int = DEFAULT_PROVISION_CONCURRENCY,
+        journal: TransitionJournal | None = None,
+        dry_run: bool = False,
+        job: Job | None = None,
+    ) -> str:
+        """
+        Provision ``guild`` for semester ``year`` and return the summary.
+
+        Every completed step is recorded in ``journal`` so an interrupted run
+        can be resumed without repeating finished work. With ``dry_run`` the
+        plan is described instead of executed. Steps are counted on ``job``.
+        """
+        journal = journal or TransitionJournal()
+        plan = await self.plan_start_semester(guild, year, number_of_groups, journal)
+        if dry_run:
+            return self._describe_plan(plan, guild, concurrency)
+
+        started = time.perf_counter()
+        await self._execute(plan, concurrency, journal, job)
+        elapsed = time.perf_counter() - started
+
+        summary = (
+            f"Semester {year} started: {number_of_groups} group(s) ready.\n"
+            + self._calls_summary(plan, elapsed, concurrency)
+        )
+        if plan.warnings:
+            summary += "\n\nWarnings:\n" + "\n".join(f"- {w}" for w in plan.warnings)
+        self.logger.info(
+            f"start_semester in {guild.id}: {plan.calls.total()} calls in {elapsed:.2f}s"
+        )
+        journal.complete()
+        await journal.flush()
+        return summary
+
+    async def _run_end_semester(
+        self,
+        guild: discord.Guild,
+        year: int,
+        concurrency: int = DEFAULT_PROVISION_CONCURRENCY,
+        journal: TransitionJournal | None = None,
+        dry_run: bool = False,
+        job: Job | None = None,
+    ) -> str:
+        """
+        Archive semester ``year`` in ``guild`` and return the summary.
+
+        Every completed step is recorded in ``journal`` so an interrupted run
+        can be resumed without repeating finished work. With ``dry_run`` the
+        plan is described instead of executed. Steps are counted on ``job``.
+        """
+        journal = journal or TransitionJournal()
+        year_prefix = f"{year}_group_"
+
+        group_roles = self._index(guild).year_groups(year)
+        if not group_roles:
+            if not dry_run:
+                journal.complete()
+                await journal.flush()
+            return (
+                f"No group roles found for {year} "
+                f"(expected names matching `{year_prefix}<n>`)."
             )
-            new_prompts = list(onboarding.prompts) + [new_prompt]
 
-        await guild.edit_onboarding(
-            prompts=new_prompts,
-            reason="Semester update by bot",
+        # Member migration needs every member; without a member cache they
+        # are chunked for this run only.
+        async with self.bot.indexes.members_loaded(guild):
+            plan = await self.plan_end_semester(guild, year, group_roles, journal)
+            if dry_run:
+                return self._describe_plan(plan, guild, concurrency)
+
+            started = time.perf_counter()
+            await self._execute(plan, concurrency, journal, job)
+            elapsed = time.perf_counter() - started
+
+        summary = (
+            f"Semester {year} ended: {len(group_roles)} group(s) archived. "
+            f"Run `/start_semester` to begin the next semester.\n"
+            + self._calls_summary(plan, elapsed, concurrency)
         )
+        if plan.warnings:
+            summary += "\n\nWarnings:\n" + "\n".join(f"- {w}" for w in plan.warnings)
         self.logger.info(
-            f"Onboarding prompt '{ONBOARDING_PROMPT_TITLE}' updated "
-            f"with {len(options)} option(s)."
+            f"end_semester in {guild.id}: {plan.calls.total()} calls in {elapsed:.2f}s"
+        )
+        journal.complete()
+        await journal.flush()
+        return summary
+
+    async def _open_journal(
+        self, guild: discord.Guild, transition: str, **params
+    ) -> tuple[TransitionJournal, str]:
+        """
+        Open ``guild``'s journal for ``transition``. An unfinished run with the
+        same parameters is continued; anything else starts a new journal.
+        Returns the journal and a note for the summary (empty if none).
+        """
+        journal = await TransitionJournal.for_guild(guild.id)
+        if journal.matches(transition, **params):
+            note = (
+                f"Resumed unfinished `{transition}` "
+                f"({journal.completed()} step(s) already done).\n"
+            )
+            return journal, note
+        note = ""
+        if journal.active is not None:
+            note = f"Discarded unfinished `{journal.active['transition']}` checkpoint.\n"
+        journal.begin(transition, **params)
+        return journal, note
+
+    async def _run_transition(
+        self,
+        guild: discord.Guild,
+        transition: str,
+        year: int,
+        number_of_groups: int | None,
+        concurrency: int,
+        dry_run: bool,
+    ) -> str:
+        """
+        Run ``transition`` in ``guild`` as its own command would, journal
+        included, and return the summary. Raises ``PermissionError`` if the
+        bot lacks the permissions the transition needs and ``ValueError`` if
+        ``number_of_groups`` is out of range for ``start_semester``.
+        """
+        perm_error = self._check_bot_permissions(guild)
+        if perm_error:
+            raise PermissionError(perm_error)
+        if transition == "start_semester" and not (
+            number_of_groups and 1 <= number_of_groups <= MAX_GROUPS
+        ):
+            raise ValueError(
+                f"`number_of_groups` must be between 1 and {MAX_GROUPS}, "
+                f"not {number_of_groups}."
+            )
+
+        if transition == "start_semester":
+            if dry_run:
+                return await self._run_start_semester(
+                    guild, year, number_of_groups, concurrency, dry_run=True
+                )
+            journal, note = await self._open_journal(
+                guild, transition, year=year, number_of_groups=number_of_groups
+            )
+            return note + await self._run_start_semester(
+                guild, year, number_of_groups, concurrency, journal
+            )
+
+        if dry_run:
+            return await self._run_end_semester(guild, year, concurrency, dry_run=True)
+        journal, note = await self._open_journal(guild, transition, year=year)
+        return note + await self._run_end_semester(guild, year, concurrency, journal)
+
+    async def _start_transition(
+        self,
+        interaction: discord.Interaction,
+        command: str,
+        work,
+    ) -> None:
+        """
+        Run a semester transition of the interaction's guild as a background
+        job (see ``/jobs``). Only one transition runs per guild at a time.
+        """
+        await run_as_job(
+            self.bot.jobs,
+            self.bot.scheduler,
+            interaction,
+            command,
+            work,
+            f"{command}.txt",
+            key=f"semester:{interaction.guild_id}",
         )
 
+    def _rollover_targets(
+        self, guild_ids: str | None
+    ) -> tuple[list[discord.Guild], list[str]]:
+        """
+        Guilds named by the comma-separated ``guild_ids``, or every guild the
+        bot is in. Returns the guilds and a note for each id that is not.
+        """
+        if not guild_ids:
+            return sorted(self.bot.guilds, key=lambda g: g.id), []
+        guilds, unknown = [], []
+        for part in guild_ids.replace(" ", ",").split(","):
+            if not part:
+                continue
+            guild = self.bot.get_guild(int(part)) if part.isdigit() else None
+            if guild is None:
+                unknown.append(f"`{part}`: not a guild this bot process is in.")
+            elif guild not in guilds:
+                guilds.append(guild)
+        return guilds, unknown
+
     @app_commands.command(
         name="start_semester",
         description="Create group roles and private channels for the new semester.",
     )
     @has_permissions(administrator=True)
+    @app_commands.describe(
+        number_of_groups=f"Number of groups this semester (1–{MAX_GROUPS}).",
+        concurrency="Maximum number of roles/channels created at once (1 = one at a time).",
+        dry_run="Only show the changes, API call count and estimated duration.",
+    )
     async def start_semester(
-        self, interaction: discord.Interaction, number_of_groups: int
+        self,
+        interaction: discord.Interaction,
+        number_of_groups: app_commands.Range[int, 1, MAX_GROUPS],
+        concurrency: app_commands.Range[int, 1, 50] = DEFAULT_PROVISION_CONCURRENCY,
+        dry_run: bool = False,
     ) -> None:
         """
         Start a new semester by:
@@ -269,11 +1184,19 @@ class Role(commands.Cog):
           is the current UTC year.
         - Creating a private text and voice channel per group.
         - Creating or updating the Discord Onboarding group-selection prompt
-          (each option assigns both the group role and ``students``).
+          (each option assigns both the group role and ``students``); beyond
+          50 groups, one prompt per range of 50 groups.
 
         Role assignment to students is handled via Discord Onboarding.
         The ``students`` role and ``shared_channels`` category must exist
         beforehand (one-time manual setup — see Conventions.md).
+
+        Only changes the guild actually needs are made. Roles and channels
+        are provisioned with up to ``concurrency`` REST calls in flight; the
+        summary reports wall-clock time and call counts. With ``dry_run`` the
+        planned changes, call count and estimated duration are shown instead.
+        The run is a background job (see ``/jobs``) and its progress is
+        journaled; see ``/resume_semester``.
         """
         await interaction.response.defer(ephemeral=True, thinking=True)
 
@@ -281,55 +1204,66 @@ class Role(commands.Cog):
 
         perm_error = self._check_bot_permissions(guild)
         if perm_error:
-            await interaction.followup.send(perm_error, ephemeral=True)
+            await self._reply(interaction, perm_error)
             return
 
         year = datetime.now(timezone.utc).year
-        roles, role_warnings = await self.create_groups(guild, year, number_of_groups)
-        channel_warnings = await self.setup_group_channels(guild, roles)
-        await self._upsert_onboarding_prompt(guild, roles)
-
-        all_warnings = role_warnings + channel_warnings
-        summary = f"Semester {year} started: {number_of_groups} group(s) ready."
-        if all_warnings:
-            summary += "\n\nWarnings:\n" + "\n".join(f"- {w}" for w in all_warnings)
-
-        alumni = discord.utils.get(guild.roles, name="Alumni")
-        if not alumni:
-            alumni = await guild.create_role(
-                name="Alumni",
-                reason=f"Created by bot at beginning of semester {year}",
-                hoist=True,
+        if dry_run:
+            summary = await self._run_start_semester(
+                guild, year, number_of_groups, concurrency, dry_run=True
             )
-        # Ensure students taking the course again will be displayed as current students not alumni
-        await alumni.move(above=roles[-1])
-        await interaction.followup.send(summary, ephemeral=True)
+            await self._reply(interaction, summary)
+            return
+
+        async def work(job: Job) -> str:
+            journal, note = await self._open_journal(
+                guild, "start_semester", year=year, number_of_groups=number_of_groups
+            )
+            return note + await self._run_start_semester(
+                guild, year, number_of_groups, concurrency, journal, job=job
+            )
+
+        await self._start_transition(interaction, "start_semester", work)
 
     @app_commands.command(
         name="end_semester",
         description="Archive group channels and remove the onboarding prompt.",
     )
     @has_permissions(administrator=True)
-    async def end_semester(self, interaction: discord.Interaction) -> None:
+    @app_commands.describe(
+        concurrency="Maximum number of member edits in flight at once (1 = one at a time).",
+        dry_run="Only show the changes, API call count and estimated duration.",
+    )
+    async def end_semester(
+        self,
+        interaction: discord.Interaction,
+        concurrency: app_commands.Range[int, 1, 50] = DEFAULT_PROVISION_CONCURRENCY,
+        dry_run: bool = False,
+    ) -> None:
         """
         End the current semester by:
         - Finding all ``<year>_group_<n>`` roles matching the current UTC year.
-        - Assigning the ``Alumni`` role to every member of each group
-          (created if it does not exist).
         - Archiving each group's text channel (from ``group_text_channels``
-          only): moved to
-          ``Archived_text_channels``, with overwrites: deny ``@everyone``,
+          and its overflow categories ``group_text_channels_2``, … only):
+          moved to ``Archived_text_channels_<year>`` (``…_<year>_2``
+          and so on once a category holds 50 channels), with overwrites: deny ``@everyone``,
           allow ``<year>_group_<n>`` (read-only). Members with
           ``administrator`` permission bypass overwrites automatically.
         - Deleting each group's voice channel (from ``group_voice_channels``
-          only).
+          and its overflow categories only).
+        - Rewriting every affected member's roles in a single edit: group
+          members gain ``Alumni`` (created if it does not exist) and everyone
+          loses ``students``. Edits run on ``concurrency`` workers.
         - Deleting the ``group_text_channels`` and ``group_voice_channels``
-          categories.
-        - Removing the ``students`` role from every member who holds it.
-        - Removing the Discord Onboarding group-selection prompt.
+          categories, overflow categories included.
+        - Removing the Discord Onboarding group-selection prompt(s).
 
         Group roles are not deleted — members retain them and automatically
-        keep read-only access to their own archived channel.
+        keep read-only access to their own archived channel. Only changes the
+        guild actually needs are made; ``dry_run`` shows them, the call count
+        and the estimated duration without executing. The run is a background
+        job (see ``/jobs``) and its progress is journaled; see
+        ``/resume_semester``.
         """
         await interaction.response.defer(ephemeral=True, thinking=True)
 
@@ -337,128 +1271,217 @@ class Role(commands.Cog):
 
         perm_error = self._check_bot_permissions(guild)
         if perm_error:
-            await interaction.followup.send(perm_error, ephemeral=True)
+            await self._reply(interaction, perm_error)
             return
 
         year = datetime.now(timezone.utc).year
-        year_prefix = f"{year}_group_"
-
-        group_roles = [
-            role for role in guild.roles if role.name.startswith(year_prefix)
-        ]
-        # Do not show group-roles separately after end of semester
-        for role in group_roles:
-            await role.edit(hoist=False)
-
-        if not group_roles:
-            await interaction.followup.send(
-                f"No group roles found for {year} "
-                f"(expected names matching `{year_prefix}<n>`).",
-                ephemeral=True,
+        if dry_run:
+            summary = await self._run_end_semester(
+                guild, year, concurrency, dry_run=True
             )
+            await self._reply(interaction, summary)
             return
 
-        # Ensure archive category exists
-        archived_category = await self.get_or_create_category(
-            guild, "Archived_text_channels"
-        )
+        async def work(job: Job) -> str:
+            journal, note = await self._open_journal(guild, "end_semester", year=year)
+            return note + await self._run_end_semester(
+                guild, year, concurrency, journal, job=job
+            )
 
-        # Resolve active channel categories (may be None if already deleted)
-        text_category = discord.utils.get(guild.categories, name="group_text_channels")
-        voice_category = discord.utils.get(
-            guild.categories, name="group_voice_channels"
-        )
+        await self._start_transition(interaction, "end_semester", work)
 
-        # Ensure Alumni role exists
-        alumni_role = discord.utils.get(guild.roles, name="Alumni")
-        if alumni_role is None:
-            alumni_role = await guild.create_role(
-                name="Alumni",
-                reason=f"Created by bot at end of semester {year}",
-                hoist=True,
-            )
-            self.logger.info("Created Alumni role")
+    @app_commands.command(
+        name="resume_semester",
+        description="Continue an interrupted /start_semester or /end_semester.",
+    )
+    @has_permissions(administrator=True)
+    async def resume_semester(
+        self,
+        interaction: discord.Interaction,
+        concurrency: app_commands.Range[int, 1, 50] = DEFAULT_PROVISION_CONCURRENCY,
+    ) -> None:
+        """
+        Resume the transition recorded in this guild's journal, skipping every
+        step it had already completed before the bot stopped.
+        """
+        await interaction.response.defer(ephemeral=True, thinking=True)
 
-        await alumni_role.move(below=discord.utils.get(guild.roles, name="students"))
-        warnings: list[str] = []
+        guild = interaction.guild
 
-        for role in group_roles:
+        perm_error = self._check_bot_permissions(guild)
+        if perm_error:
+            await self._reply(interaction, perm_error)
+            return
 
-            # Assign Alumni to every member of this group
-            for member in list(role.members):
-                await member.add_roles(alumni_role)
-                self.logger.info(
-                    f"Assigned Alumni to {member.name} (was in {role.name})"
-                )
+        journal = await TransitionJournal.for_guild(guild.id)
+        if journal.active is None:
+            await self._reply(interaction, "No unfinished semester transition to resume.")
+            return
 
-            # Archive text channel (category-scoped lookup by current role name)
-            text_channel = None
-            if text_category:
-                text_channel = discord.utils.get(
-                    text_category.text_channels, name=role.name
-                )
-            if text_channel:
-                overwrites = {
-                    guild.default_role: discord.PermissionOverwrite(
-                        read_messages=False
-                    ),
-                    role: discord.PermissionOverwrite(
-                        read_messages=True,
-                        send_messages=False,
-                        add_reactions=False,
-                    ),
-                }
-                await text_channel.edit(
-                    name=role.name,
-                    category=archived_category,
-                    overwrites=overwrites,
-                )
-                self.logger.info(
-                    f"Archived text channel `{role.name}` "
-                    f"(read-only for {role.name})"
-                )
-            else:
-                msg = f"Text channel `{role.name}` not found in `group_text_channels` — skipped."
-                self.logger.warning(msg)
-                warnings.append(msg)
+        transition = journal.active["transition"]
+        params = journal.active["params"]
 
-            # Delete voice channel (category-scoped lookup)
-            voice_channel = None
-            if voice_category:
-                voice_channel = discord.utils.get(
-                    voice_category.voice_channels, name=role.name
+        async def work(job: Job) -> str:
+            note = (
+                f"Resuming `{transition}` "
+                f"({journal.completed()} step(s) already done).\n"
+            )
+            self.logger.info(f"{note.strip()} in guild {guild.id}")
+            if transition == "start_semester":
+                summary = await self._run_start_semester(
+                    guild,
+                    params["year"],
+                    params["number_of_groups"],
+                    concurrency,
+                    journal,
+                    job=job,
                 )
-            if voice_channel:
-                await voice_channel.delete()
-                self.logger.info(f"Deleted voice channel: {role.name}")
             else:
-                msg = f"Voice channel `{role.name}` not found in `group_voice_channels` — skipped."
-                self.logger.warning(msg)
-                warnings.append(msg)
+                summary = await self._run_end_semester(
+                    guild, params["year"], concurrency, journal, job=job
+                )
+            return note + summary
 
-        # Remove students role from every member who holds it
-        students_role = discord.utils.get(guild.roles, name="students")
-        if students_role:
-            for member in list(students_role.members):
-                await member.remove_roles(students_role)
-                self.logger.info(f"Removed students role from {member.name}")
+        await self._start_transition(interaction, "resume_semester", work)
 
-        # Delete the now-empty active categories
-        for category in (text_category, voice_category):
-            if category:
-                await category.delete()
+    @app_commands.command(
+        name="rollover",
+        description="Run /start_semester or /end_semester in many guilds at once (bot owner only).",
+    )
+    @has_permissions(administrator=True)
+    @app_commands.describe(
+        transition="The transition to run in every guild.",
+        guild_ids="Comma-separated guild ids (default: every guild the bot is in).",
+        number_of_groups="Number of groups per guild; required for start_semester.",
+        guild_concurrency="Maximum number of guilds transitioned at once.",
+        concurrency="Maximum number of REST calls in flight per guild.",
+        dry_run="Only show each guild's changes, API call count and estimated duration.",
+    )
+    @app_commands.choices(
+        transition=[
+            app_commands.Choice(name=name, value=name)
+            for name in ("start_semester", "end_semester")
+        ]
+    )
+    async def rollover(
+        self,
+        interaction: discord.Interaction,
+        transition: str,
+        guild_ids: str | None = None,
+        number_of_groups: Optional[app_commands.Range[int, 1, MAX_GROUPS]] = None,
+        guild_concurrency: app_commands.Range[int, 1, 50] = DEFAULT_ROLLOVER_CONCURRENCY,
+        concurrency: app_commands.Range[int, 1, 50] = DEFAULT_PROVISION_CONCURRENCY,
+        dry_run: bool = False,
+    ) -> None:
+        """
+        Run a semester transition in several guilds, as if ``/start_semester``
+        or ``/end_semester`` had been run in each of them (journals included,
+        so ``/resume_semester`` works per guild afterwards).
 
-        # Remove the onboarding group-selection prompt
-        await self._upsert_onboarding_prompt(guild, [])
+        Up to ``guild_concurrency`` guilds run at once; the scheduler shares
+        the global rate limit fairly between them, so the rollover takes
+        about as long as the slowest guild rather than the sum of all. A
+        failing guild does not stop the others, and guilds with a semester
+        job of their own running are skipped. Each guild's semester key is
+        held by the rollover while its transition runs, so ``/start_semester``
+        and the like are refused there meanwhile. The rollover runs as a
+        background job (see ``/jobs``); progress is updated while the guilds
+        run and one report lists every guild's summary or error.
+        """
+        if not await self.bot.is_owner(interaction.user):
+            await interaction.response.send_message(
+                "Only the bot owner can run a rollover.", ephemeral=True
+            )
+            return
+        if transition == "start_semester" and not number_of_groups:
+            await interaction.response.send_message(
+                "`number_of_groups` is required for `start_semester`.", ephemeral=True
+            )
+            return
+        await interaction.response.defer(ephemeral=True, thinking=True)
 
-        summary = (
-            f"Semester {year} ended: {len(group_roles)} group(s) archived. "
-            f"Run `/start_semester` to begin the next semester."
+        guilds, notes = self._rollover_targets(guild_ids)
+        if not guilds:
+            await self._reply(interaction, "\n".join(notes) or "No guilds to roll over.")
+            return
+
+        year = datetime.now(timezone.utc).year
+        self.logger.info(
+            f"User [{interaction.user.id}] running {transition} for {year} in "
+            f"{len(guilds)} guild(s), {guild_concurrency} at a time (dry_run={dry_run})"
         )
-        if warnings:
-            summary += "\n\nWarnings:\n" + "\n".join(f"- {w}" for w in warnings)
 
-        await interaction.followup.send(summary, ephemeral=True)
+        async def work(job: Job) -> str:
+            durations: dict[int, float] = {}
+            skipped: set[int] = set()
+            job.total = len(guilds)
+
+            async def run(guild: discord.Guild) -> str:
+                started = time.perf_counter()
+                try:
+                    with (
+                        contextlib.nullcontext()
+                        if dry_run
+                        else self.bot.jobs.claim(f"semester:{guild.id}", job)
+                    ):
+                        result = await self._run_transition(
+                            guild, transition, year, number_of_groups, concurrency, dry_run
+                        )
+                except JobConflict as e:
+                    skipped.add(guild.id)
+                    job.advance()
+                    self.logger.warning(f"{transition} skipped in {guild.id}: {e}")
+                    return f"SKIPPED: {e}"
+                except Exception as e:
+                    job.advance(failed=True)
+                    self.logger.error(f"{transition} failed in {guild.id}: {e!r}")
+                    raise
+                finally:
+                    durations[guild.id] = time.perf_counter() - started
+                job.advance()
+                return result
+
+            def render() -> str:
+                return (
+                    f"Job #{job.id} `{transition}`: {job.done}/{len(guilds)} guild(s) done"
+                    + (f", {job.failed} failed." if job.failed else ".")
+                )
+
+            async with ProgressMessage(self.bot.scheduler, interaction, render):
+                started = time.perf_counter()
+                results = await run_worker_pool(guilds, run, guild_concurrency)
+            elapsed = time.perf_counter() - started
+
+            sections = []
+            for guild, result in results:
+                title = f"{guild.name} ({guild.id}, {durations[guild.id]:.1f}s)"
+                if isinstance(result, BaseException):
+                    sections.append(f"{title}: FAILED\n{result}")
+                else:
+                    sections.append(f"{title}\n{result}")
+            header = (
+                f"`{transition}`{' (dry run)' if dry_run else ''} for {year} in "
+                f"{len(guilds)} guild(s) took {elapsed:.1f}s "
+                f"(slowest guild {max(durations.values()):.1f}s): "
+                f"{len(guilds) - job.failed - len(skipped)} succeeded, "
+                f"{job.failed} failed"
+                + (f", {len(skipped)} skipped (busy)." if skipped else ".")
+            )
+            if notes:
+                header += "\n" + "\n".join(notes)
+            self.logger.info(header)
+            return header + "\n\n" + "\n\n".join(sections)
+
+        await run_as_job(
+            self.bot.jobs,
+            self.bot.scheduler,
+            interaction,
+            "rollover",
+            work,
+            "rollover.txt",
+            key="rollover",
+            announce=False,
+        )
 
 
 async def setup(bot):
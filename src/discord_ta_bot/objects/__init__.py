@@ -1 +1,4 @@
 from .canvas_course import *
+from .group import *
+from .guild import *
+from .snapshot import *
@@ -1,7 +1,17 @@
+from dataclasses import dataclass
+
+__all__ = ["Course"]
+
+
+@dataclass(frozen=True, slots=True)
 class Course:
-    def __init__(self, name: str, id: int) -> None:
-        self.name: str = name
-        self.id: int = id
+    """A Canvas course linked to a guild."""
+
+    name: str
+    id: int
 
     def __str__(self) -> str:
         return f"{self.name}: {str(self.id)}"
+
+    def to_json(self) -> dict:
+        return {"name": self.name, "id": self.id}
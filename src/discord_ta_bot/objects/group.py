@@ -0,0 +1,24 @@
+from dataclasses import dataclass
+
+__all__ = ["Group"]
+
+
+@dataclass(frozen=True, slots=True)
+class Group:
+    '''
+    Group AKA TA group
+
+    Discord looks at this as 'roles' and hence the group object holds a reference
+    to the corresponding Discord role.
+    '''
+
+    name: str | None = None
+    emoji: str | None = None
+    role_id: int | None = None
+
+    def to_json(self):
+        return {
+            "name": self.name,
+            "emoji": self.emoji,
+            "role_id": self.role_id,
+        }
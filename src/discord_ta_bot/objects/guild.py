@@ -1,31 +1,70 @@
+import dataclasses
+from dataclasses import dataclass
+
 from .canvas_course import Course
 from .group import Group
-import discord
+
+__all__ = ["Guild"]
 
 
+@dataclass(frozen=True, slots=True)
 class Guild:
-    def __init__(
-        self,
-        _id: int = None,
-        name: str = None,
-        canvas_courses: list[dict] = [],
-        github_orgs: list[str] = [],
-        role_message: discord.Message = None,
-        groups: list[Group] = [],
-    ):
-        self.id = _id
-        self.name = name
-        self.canvas_courses = [Course(**course) for course in canvas_courses]
-        self.github_orgs = github_orgs
-        self.role_message = role_message
-        self.groups = [Group(**group) for group in groups]
+    """
+    Stored settings of one guild.
+
+    Instances are immutable and their collections are tuples, so a guild
+    can be shared (e.g. by a cache) without copying; :meth:`replace` returns
+    a changed copy.
+    """
+
+    id: int
+    name: str | None = None
+    canvas_courses: tuple[Course, ...] = ()
+    github_orgs: tuple[str, ...] = ()
+    # Id of the role-selection message.
+    role_message: int | None = None
+    groups: tuple[Group, ...] = ()
+    # Id of the channel announcements of the Canvas courses are relayed to.
+    announcement_channel: int | None = None
+
+    def __post_init__(self):
+        # Accept lists for convenience; store tuples so nothing is shared.
+        for field in ("canvas_courses", "github_orgs", "groups"):
+            value = getattr(self, field)
+            if not isinstance(value, tuple):
+                object.__setattr__(self, field, tuple(value))
+
+    def replace(self, **changes) -> "Guild":
+        return dataclasses.replace(self, **changes)
+
+    def with_course(self, course: Course) -> "Guild":
+        """This guild with ``course`` linked (unchanged if it already is)."""
+        if any(c.id == course.id for c in self.canvas_courses):
+            return self
+        return self.replace(canvas_courses=self.canvas_courses + (course,))
+
+    @classmethod
+    def from_json(cls, data: dict) -> "Guild":
+        """Inverse of :meth:`to_json`."""
+        return cls(
+            id=data["_id"],
+            name=data.get("name"),
+            canvas_courses=tuple(
+                Course(**course) for course in data.get("canvas_courses", ())
+            ),
+            github_orgs=tuple(data.get("github_orgs", ())),
+            role_message=data.get("role_message"),
+            groups=tuple(Group(**group) for group in data.get("groups", ())),
+            announcement_channel=data.get("announcement_channel"),
+        )
 
     def to_json(self):
         return {
             "_id": self.id,
             "name": self.name,
-            "canvas_courses": [course.__dict__ for course in self.canvas_courses],
-            "github_orgs": self.github_orgs,
-            "role_message": self.role_message.id if self.role_message else None,
-            "groups": [group.__dict__ for group in self.groups]
+            "canvas_courses": [course.to_json() for course in self.canvas_courses],
+            "github_orgs": list(self.github_orgs),
+            "role_message": self.role_message,
+            "groups": [group.to_json() for group in self.groups],
+            "announcement_channel": self.announcement_channel,
         }
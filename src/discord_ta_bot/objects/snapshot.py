@@ -0,0 +1,133 @@
+import os
+import gzip
+import json
+import pathlib
+from typing import IO, Iterable, Iterator
+
+from .canvas_course import Course
+from .group import Group
+from .guild import Guild
+
+__all__ = [
+    "SNAPSHOT_VERSION",
+    "decode_guild",
+    "dump_guilds",
+    "encode_guild",
+    "load_guilds",
+    "read_snapshot",
+    "write_snapshot",
+]
+
+SNAPSHOT_FORMAT = "discord-ta-bot/guilds"
+# 2: guilds gained announcement_channel.
+SNAPSHOT_VERSION = 2
+
+_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+_decoder = json.JSONDecoder()
+
+
+def encode_guild(guild: Guild) -> str:
+    """
+    One guild as a compact JSON array, fields by position::
+
+        [id, name, [[course_id, course_name], ...], [github_org, ...],
+         role_message, [[group_name, emoji, role_id], ...],
+         announcement_channel]
+    """
+    return _encoder.encode(
+        [
+            guild.id,
+            guild.name,
+            [[course.id, course.name] for course in guild.canvas_courses],
+            guild.github_orgs,
+            guild.role_message,
+            [[group.name, group.emoji, group.role_id] for group in guild.groups],
+            guild.announcement_channel,
+        ]
+    )
+
+
+def decode_guild(text: str) -> Guild:
+    """
+    Inverse of :func:`encode_guild`; also accepts the object form written by
+    :meth:`Guild.to_json` and rows written before ``announcement_channel``.
+    """
+    data = _decoder.decode(text)
+    if isinstance(data, dict):
+        return Guild.from_json(data)
+    guild_id, name, courses, orgs, role_message, groups, *rest = data
+    return Guild(
+        guild_id,
+        name,
+        tuple(Course(course_name, course_id) for course_id, course_name in courses),
+        tuple(orgs),
+        role_message,
+        tuple(Group(*group) for group in groups),
+        rest[0] if rest else None,
+    )
+
+
+def dump_guilds(guilds: Iterable[Guild], fp: IO[str]) -> int:
+    """
+    Write a snapshot of ``guilds`` to the text stream ``fp``: a header line
+    with the format version, then one :func:`encode_guild` line per guild.
+    Guilds are written as they are iterated. Returns the number written.
+    """
+    fp.write(
+        _encoder.encode({"format": SNAPSHOT_FORMAT, "version": SNAPSHOT_VERSION})
+        + "\n"
+    )
+    count = 0
+    for guild in guilds:
+        fp.write(encode_guild(guild) + "\n")
+        count += 1
+    return count
+
+
+def load_guilds(fp: IO[str]) -> Iterator[Guild]:
+    """
+    Read a snapshot written by :func:`dump_guilds`, one guild at a time.
+    Raises ``ValueError`` for other files and newer format versions.
+    """
+    header = fp.readline()
+    try:
+        meta = _decoder.decode(header)
+    except ValueError:
+        meta = None
+    if not isinstance(meta, dict) or meta.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError("Not a guild snapshot")
+    if meta.get("version", 0) > SNAPSHOT_VERSION:
+        raise ValueError(
+            f"Guild snapshot version {meta['version']} is newer than the "
+            f"supported version {SNAPSHOT_VERSION}"
+        )
+    for line in fp:
+        if line.strip():
+            yield decode_guild(line)
+
+
+def _open(path: pathlib.Path, mode: str, compressed: bool) -> IO[str]:
+    if compressed:
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def write_snapshot(path: str | os.PathLike, guilds: Iterable[Guild]) -> int:
+    """
+    :func:`dump_guilds` to ``path`` (gzipped if it ends in ``.gz``),
+    replacing it atomically. Returns the number of guilds written.
+    """
+    path = pathlib.Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(path.name + ".tmp")
+    with _open(partial, "w", path.suffix == ".gz") as fp:
+        count = dump_guilds(guilds, fp)
+    os.replace(partial, path)
+    return count
+
+
+def read_snapshot(path: str | os.PathLike) -> Iterator[Guild]:
+    """:func:`load_guilds` from ``path`` (gzipped if it ends in ``.gz``)."""
+    path = pathlib.Path(path)
+    with _open(path, "r", path.suffix == ".gz") as fp:
+        yield from load_guilds(fp)
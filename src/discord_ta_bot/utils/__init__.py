@@ -0,0 +1,17 @@
+from .concurrency import *
+from .scheduler import *
+from .journal import *
+from .planner import *
+from .guild_index import *
+from .metrics import *
+from .log_queue import *
+from .log_rotation import *
+from .log_tail import *
+from .command_sync import *
+from .startup import *
+from .canvas import *
+from .course_cache import *
+from .announcements import *
+from .guild_store import *
+from .jobs import *
+from .progress import *
@@ -0,0 +1,235 @@
+import os
+import json
+import logging
+import pathlib
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable
+
+from .canvas import CanvasClient
+from .concurrency import gather_bounded
+
+__all__ = ["AnnouncementRelay", "AnnouncementState", "announcements_path"]
+
+_DEFAULT_STATE_PATH = pathlib.Path.home() / ".local" / "state" / "discord-ta-bot"
+# Announcement ids remembered per course to drop repeats at the cursor.
+_SEEN_PER_COURSE = 100
+
+
+def announcements_path() -> pathlib.Path:
+    """Location of the announcement relay's cursors."""
+    return (
+        pathlib.Path.home()
+        / os.getenv("STATE_BASE_PATH", _DEFAULT_STATE_PATH)
+        / "announcements.json"
+    )
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _until() -> str:
+    """
+    Upper bound for announcement requests: the end of the next UTC day.
+    Without one Canvas ends the range 28 days after ``start_date``; a bound
+    that only moves once a day keeps requests, and so their ETags, stable.
+    """
+    day_after_tomorrow = datetime.now(timezone.utc).date() + timedelta(days=2)
+    return day_after_tomorrow.strftime("%Y-%m-%dT00:00:00Z")
+
+
+class AnnouncementState:
+    """
+    How far the announcement relay has got.
+
+    - ``cursors``: per course id, ``since``, the ``posted_at`` of the newest
+      relayed announcement, and the ids of the most recent ones.
+    - ``etags``: the ``ETag`` of the last response to each poll request.
+
+    Which courses are relayed where is not kept here but in the guild
+    settings (``Guild.canvas_courses`` and ``Guild.announcement_channel``).
+    Everything is kept in one small JSON file, replaced atomically on
+    :meth:`save`.
+
+    Parameters
+    ----------
+    path : pathlib.Path | None
+        State file, by default ``announcements.json`` in the state directory.
+    """
+
+    def __init__(self, path: pathlib.Path | None = None):
+        self.logger = logging.getLogger(__name__)
+        self.path = path or announcements_path()
+        self.cursors: dict[str, dict] = {}
+        self.etags: dict[str, str] = {}
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable {self.path}: {e}")
+            return
+        self.cursors = data.get("cursors", {})
+        self.etags = data.get("etags", {})
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        partial = self.path.with_suffix(".tmp")
+        with open(partial, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "cursors": self.cursors,
+                    "etags": self.etags,
+                },
+                f,
+                indent=2,
+                sort_keys=True,
+            )
+        os.replace(partial, self.path)
+
+
+class AnnouncementRelay:
+    """
+    Polls Canvas for new announcements in every linked course.
+
+    One poll cycle asks for the announcements of ``batch_size`` courses per
+    request (Canvas accepts several ``context_codes``), starting at the
+    oldest cursor of the batch and ending at the end of the next UTC day,
+    with at most ``concurrency`` requests in flight. Requests repeat exactly while nothing new was posted, so each
+    carries the previous response's ``ETag`` and an unchanged batch costs a
+    304 with no body. A course is relayed from the moment it is first
+    polled; older announcements are not posted.
+
+    New announcements are handed to ``post`` oldest first, with the ids of
+    the channels to post them to, and the course's cursor moves past them.
+
+    Parameters
+    ----------
+    client : CanvasClient
+        Client for the Canvas instance the courses belong to.
+    state : AnnouncementState
+        Cursors and ETags; saved after every cycle that changed them.
+    targets : Callable[[], Awaitable[dict[int, list[int]]]]
+        Returns the channel ids to relay each course's announcements to,
+        read from the guild settings at the start of every cycle.
+    post : Callable[[dict, list[int]], Awaitable[None]]
+        Posts one announcement (as returned by Canvas) to the channels.
+    batch_size : int
+        Courses per request.
+    concurrency : int
+        Maximum number of requests in flight.
+    """
+
+    def __init__(
+        self,
+        client: CanvasClient,
+        state: AnnouncementState,
+        targets: Callable[[], Awaitable[dict[int, list[int]]]],
+        post: Callable[[dict, list[int]], Awaitable[None]],
+        batch_size: int = 10,
+        concurrency: int = 4,
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.client = client
+        self.state = state
+        self.targets = targets
+        self.post = post
+        self.batch_size = max(1, batch_size)
+        self.concurrency = concurrency
+
+    async def _poll_batch(
+        self, course_ids: list[int], until: str, etags: dict[str, str]
+    ) -> list[dict]:
+        since = min(self.state.cursors[str(c)]["since"] for c in course_ids)
+        params = [("context_codes[]", f"course_{c}") for c in course_ids]
+        params += [("start_date", since), ("end_date", until), ("per_page", 100)]
+        key = ",".join(map(str, course_ids)) + f"@{since}..{until}"
+
+        try:
+            items, etag, url = await self.client.get_page(
+                "announcements", params, self.state.etags.get(key)
+            )
+            if url is not None:
+                items += [item async for item in self.client.paginate(url)]
+        except Exception as e:
+            # Leave this batch's cursors and ETag for the next cycle.
+            self.logger.warning(f"Polling announcements of {course_ids} failed: {e!r}")
+            if key in self.state.etags:
+                etags[key] = self.state.etags[key]
+            return []
+        if etag:
+            etags[key] = etag
+        if items is None:
+            return []
+
+        new = []
+        for item in items:
+            course_id = item.get("context_code", "").removeprefix("course_")
+            cursor = self.state.cursors.get(course_id)
+            posted_at = item.get("posted_at") or ""
+            if cursor is None or posted_at < cursor["since"]:
+                continue
+            if item["id"] in cursor["seen"]:
+                continue
+            new.append(item)
+        return new
+
+    async def poll(self) -> int:
+        """Run one poll cycle; returns the number of announcements relayed."""
+        targets = await self.targets()
+        started = _now()
+        until = _until()
+        for course_id in targets:
+            # Start relaying new courses from now on.
+            self.state.cursors.setdefault(str(course_id), {"since": started, "seen": []})
+        course_ids = sorted(targets)
+        batches = [
+            course_ids[i : i + self.batch_size]
+            for i in range(0, len(course_ids), self.batch_size)
+        ]
+
+        etags: dict[str, str] = {}
+        results = await gather_bounded(
+            (self._poll_batch(batch, until, etags) for batch in batches),
+            self.concurrency,
+        )
+        new = sorted(
+            (item for items in results for item in items),
+            key=lambda item: item.get("posted_at") or "",
+        )
+
+        for item in new:
+            course_id = item["context_code"].removeprefix("course_")
+            try:
+                await self.post(item, targets[int(course_id)])
+            except Exception as e:
+                # Skip it rather than retry it forever.
+                self.logger.warning(
+                    f"Could not relay announcement {item['id']} of course "
+                    f"{course_id}: {e!r}"
+                )
+            cursor = self.state.cursors[course_id]
+            cursor["since"] = max(cursor["since"], item["posted_at"])
+            cursor["seen"] = (cursor["seen"] + [item["id"]])[-_SEEN_PER_COURSE:]
+
+        # Forget cursors of unlinked courses and ETags of requests not made.
+        linked = {str(course_id) for course_id in targets}
+        changed = bool(new) or etags != self.state.etags
+        changed |= self.state.cursors.keys() != linked
+        self.state.cursors = {
+            course_id: cursor
+            for course_id, cursor in self.state.cursors.items()
+            if course_id in linked
+        }
+        self.state.etags = etags
+        if changed:
+            self.state.save()
+        self.logger.debug(
+            f"Polled {len(course_ids)} course(s) in {len(batches)} request(s), "
+            f"relayed {len(new)} announcement(s)"
+        )
+        return len(new)
@@ -0,0 +1,165 @@
+import asyncio
+import logging
+from typing import Any, AsyncIterator
+
+import aiohttp
+
+__all__ = ["CanvasClient", "CanvasError"]
+
+# Canvas caps per_page at 100 for most list endpoints.
+_PAGE_SIZE = 100
+# Canvas answers throttled requests with 403 and this body.
+_THROTTLED = "Rate Limit Exceeded"
+
+Params = dict[str, Any] | list[tuple[str, Any]]
+
+
+class CanvasError(Exception):
+    """A Canvas API request failed with an HTTP error status."""
+
+    def __init__(self, status: int, method: str, url: str, message: str):
+        super().__init__(f"{method} {url} failed with {status}: {message}")
+        self.status = status
+
+
+class CanvasClient:
+    """
+    Asynchronous client for the Canvas LMS REST API.
+
+    All requests share one keep-alive connection pool, are bounded by a
+    timeout, and never block the event loop. List endpoints are read with
+    :meth:`paginate`, which follows Canvas' ``Link`` headers one page at a
+    time so callers can stop early. Throttled requests (403 "Rate Limit
+    Exceeded") are retried a few times with backoff.
+
+    The session is created on first use; call :meth:`close` when done.
+
+    Parameters
+    ----------
+    base_url : str
+        Canvas instance, e.g. ``https://uit.instructure.com``.
+    token : str
+        API access token.
+    timeout : float
+        Seconds a single request (including reading its body) may take.
+    connections : int
+        Maximum number of connections kept open to Canvas.
+    retries : int
+        How often a throttled request is retried.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        token: str,
+        timeout: float = 10.0,
+        connections: int = 8,
+        retries: int = 3,
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.base_url = base_url.rstrip("/") + "/api/v1/"
+        self.token = token
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.connections = connections
+        self.retries = retries
+        self._session: aiohttp.ClientSession | None = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.connections, keepalive_timeout=60
+                ),
+                headers={"Authorization": f"Bearer {self.token}"},
+                timeout=self.timeout,
+                raise_for_status=False,
+            )
+        return self._session
+
+    def _url(self, path: str) -> str:
+        return path if path.startswith("http") else self.base_url + path.lstrip("/")
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        params: Params | None = None,
+        headers: dict[str, str] | None = None,
+        **kwargs,
+    ) -> tuple[Any, aiohttp.ClientResponse]:
+        """
+        Send a request and return the decoded JSON body (``None`` for an
+        empty one) with the response. ``path`` is relative to ``/api/v1/``
+        or a full URL, e.g. a pagination link.
+        """
+        url = self._url(path)
+        for attempt in range(self.retries + 1):
+            async with self.session.request(
+                method, url, params=params, headers=headers, **kwargs
+            ) as response:
+                if response.status == 304:
+                    return None, response
+                text = await response.text()
+                if response.status < 400:
+                    data = await response.json(content_type=None) if text else None
+                    return data, response
+                throttled = response.status == 403 and _THROTTLED in text
+                if not throttled or attempt == self.retries:
+                    raise CanvasError(response.status, method, url, text[:200])
+            delay = 2**attempt
+            self.logger.warning(f"Canvas throttled {method} {url}; retrying in {delay}s")
+            await asyncio.sleep(delay)
+
+    async def get(self, path: str, params: Params | None = None) -> Any:
+        data, _ = await self.request("GET", path, params=params)
+        return data
+
+    async def get_page(
+        self, path: str, params: Params | None = None, etag: str | None = None
+    ) -> tuple[list | None, str | None, str | None]:
+        """
+        One page of a list endpoint: its items, its ``ETag`` and the URL of
+        the next page (``None`` on the last one). Given the ``etag`` of an
+        earlier response, an unchanged page costs Canvas a 304 and returns
+        ``(None, etag, None)``.
+        """
+        headers = {"If-None-Match": etag} if etag else None
+        data, response = await self.request("GET", path, params=params, headers=headers)
+        if response.status == 304:
+            return None, etag, None
+        link = response.links.get("next")
+        return (
+            data or [],
+            response.headers.get("ETag"),
+            str(link["url"]) if link else None,
+        )
+
+    async def paginate(
+        self, path: str, params: Params | None = None
+    ) -> AsyncIterator[dict]:
+        """
+        Yield the items of a paginated list endpoint, requesting the next
+        page only once the current one has been consumed.
+        """
+        params = list(params.items() if isinstance(params, dict) else params or [])
+        params.append(("per_page", _PAGE_SIZE))
+        url: str | None = path
+        while url is not None:
+            items, _, url = await self.get_page(url, params)
+            for item in items:
+                yield item
+            # The next link already carries the query string.
+            params = None
+
+    def get_courses(self, params: Params | None = None) -> AsyncIterator[dict]:
+        """The courses of the token's user (``GET /courses``)."""
+        return self.paginate("courses", params)
+
+    async def get_course(self, course_id: int) -> dict:
+        return await self.get(f"courses/{course_id}")
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
@@ -0,0 +1,121 @@
+import os
+import json
+import hashlib
+import logging
+import pathlib
+
+import discord
+from discord import app_commands
+
+__all__ = ["CommandSyncer", "tree_fingerprint"]
+
+_DEFAULT_STATE_PATH = pathlib.Path.home() / ".local" / "state" / "discord-ta-bot"
+
+
+def _fingerprint_path() -> pathlib.Path:
+    return (
+        pathlib.Path.home()
+        / os.getenv("STATE_BASE_PATH", _DEFAULT_STATE_PATH)
+        / "command_tree.json"
+    )
+
+
+def tree_fingerprint(
+    tree: app_commands.CommandTree, guild: discord.abc.Snowflake | None = None
+) -> str:
+    """
+    SHA-256 of the payload ``tree.sync(guild=guild)`` would upload: the
+    commands' API representation, order-independent.
+    """
+    payload = sorted(
+        (command.to_dict(tree) for command in tree.get_commands(guild=guild)),
+        key=lambda c: (c.get("type", 1), c["name"]),
+    )
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class CommandSyncer:
+    """
+    Syncs a command tree only when it differs from what was last uploaded.
+
+    The fingerprint (see :func:`tree_fingerprint`) of every synced scope —
+    global or one guild — is stored per application in a small JSON file,
+    so restarts with an unchanged tree make no sync request at all.
+
+    Parameters
+    ----------
+    tree : app_commands.CommandTree
+        The bot's command tree.
+    application_id : int
+        Fingerprints are kept per application, so a different bot token
+        always syncs.
+    path : pathlib.Path | None
+        Fingerprint file, by default ``command_tree.json`` in the state
+        directory.
+    """
+
+    def __init__(
+        self,
+        tree: app_commands.CommandTree,
+        application_id: int,
+        path: pathlib.Path | None = None,
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.tree = tree
+        self.application_id = application_id
+        self.path = path or _fingerprint_path()
+
+    def _load(self) -> dict[str, str]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable {self.path}: {e}")
+            return {}
+
+    def _save(self, fingerprints: dict[str, str]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        partial = self.path.with_suffix(".tmp")
+        with open(partial, "w", encoding="utf-8") as f:
+            json.dump(fingerprints, f, indent=2, sort_keys=True)
+        os.replace(partial, self.path)
+
+    async def sync(
+        self, guild_ids: list[int] | None = None, force: bool = False
+    ) -> dict[str, bool]:
+        """
+        Sync the global commands, or with ``guild_ids`` (development guilds)
+        copy them to each of those guilds and sync the guilds instead, which
+        takes effect immediately and leaves the global commands untouched.
+
+        Scopes whose fingerprint is unchanged are skipped unless ``force``.
+        Returns whether each scope (``"global"`` or a guild id) was synced.
+        """
+        fingerprints = self._load()
+        if guild_ids:
+            scopes = []
+            for guild_id in guild_ids:
+                guild = discord.Object(id=guild_id)
+                self.tree.copy_global_to(guild=guild)
+                scopes.append((str(guild_id), guild))
+        else:
+            scopes = [("global", None)]
+
+        synced = {}
+        for scope, guild in scopes:
+            key = f"{self.application_id}:{scope}"
+            fingerprint = tree_fingerprint(self.tree, guild=guild)
+            if not force and fingerprints.get(key) == fingerprint:
+                self.logger.info(f"Command tree unchanged for {scope}; not syncing")
+                synced[scope] = False
+                continue
+            commands = await self.tree.sync(guild=guild)
+            self.logger.info(f"Synced {len(commands)} command(s) to {scope}")
+            fingerprints[key] = fingerprint
+            # Save after every scope so a failure later keeps earlier work.
+            self._save(fingerprints)
+            synced[scope] = True
+        return synced
@@ -0,0 +1,74 @@
+import asyncio
+import inspect
+from typing import Awaitable, Callable, Iterable, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+__all__ = ["gather_bounded", "run_worker_pool"]
+
+
+async def gather_bounded(aws: Iterable[Awaitable[T]], limit: int) -> list[T]:
+    """
+    Await ``aws`` with at most ``limit`` of them in flight at once.
+
+    Results are returned in the same order as ``aws``, regardless of the
+    order in which they complete. A ``limit`` below 1 is treated as 1, i.e.
+    sequential execution. The first exception raised is propagated, as with
+    ``asyncio.gather``, but only after every other awaitable has been
+    cancelled and has stopped, so nothing keeps running after a failure;
+    coroutines that never got to run are closed.
+    """
+    aws = list(aws)
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def run(aw: Awaitable[T]) -> T:
+        async with semaphore:
+            return await aw
+
+    tasks = [asyncio.ensure_future(run(aw)) for aw in aws]
+    try:
+        return list(await asyncio.gather(*tasks))
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    finally:
+        # Closing a finished coroutine is a no-op; unstarted ones would warn.
+        for aw in aws:
+            if inspect.iscoroutine(aw):
+                aw.close()
+
+
+async def run_worker_pool(
+    items: Iterable[T],
+    worker: Callable[[T], Awaitable[R]],
+    limit: int,
+) -> list[tuple[T, R | BaseException]]:
+    """
+    Process ``items`` with ``limit`` long-lived workers pulling from a queue.
+
+    Unlike :func:`gather_bounded` no coroutine is created until a worker is
+    free, so memory stays flat for very large inputs. A failing item does
+    not stop the pool: its exception is returned in place of a result.
+    Returns ``(item, result_or_exception)`` pairs in input order.
+    """
+    queue: asyncio.Queue[tuple[int, T]] = asyncio.Queue()
+    for pair in enumerate(items):
+        queue.put_nowait(pair)
+    results: list[tuple[T, R | BaseException] | None] = [None] * queue.qsize()
+
+    async def work() -> None:
+        while True:
+            try:
+                index, item = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                results[index] = (item, await worker(item))
+            except Exception as e:
+                results[index] = (item, e)
+
+    await asyncio.gather(*(work() for _ in range(max(1, min(limit, len(results))))))
+    return results
@@ -0,0 +1,183 @@
+import re
+import time
+import asyncio
+import bisect
+import logging
+from collections import OrderedDict
+from typing import Awaitable, Callable, Iterable
+
+__all__ = ["CourseCache", "CourseIndex"]
+
+_WORD = re.compile(r"\S+")
+# Seconds before a failed load is retried.
+_RETRY_AFTER = 30.0
+
+
+class CourseIndex:
+    """
+    Case-insensitive search over a fixed list of Canvas courses.
+
+    Every word start of a course's name and its id are kept in one sorted
+    list, so prefix matches ("inf-2", "2900", "program" for "Intro to
+    programming") are a binary search. Queries that match no word start
+    fall back to a substring scan over the precomputed lowercase text,
+    stopping as soon as ``limit`` courses are found.
+
+    Parameters
+    ----------
+    courses : Iterable[dict]
+        Course objects as returned by the Canvas API; each needs an ``id``.
+        Their order is kept for empty queries and within equal matches.
+    """
+
+    def __init__(self, courses: Iterable[dict]):
+        self.courses = list(courses)
+        self._text: list[str] = []
+        keys: list[tuple[str, int]] = []
+        for position, course in enumerate(self.courses):
+            name = (course.get("name") or "").lower()
+            course_id = str(course["id"])
+            self._text.append(f"{name} {course_id}")
+            keys.extend((name[m.start() :], position) for m in _WORD.finditer(name))
+            keys.append((course_id, position))
+        keys.sort()
+        self._keys = [key for key, _ in keys]
+        self._positions = [position for _, position in keys]
+
+    def __len__(self) -> int:
+        return len(self.courses)
+
+    def search(self, text: str, limit: int = 25) -> list[dict]:
+        """Up to ``limit`` courses matching ``text``, prefix matches first."""
+        text = text.strip().lower()
+        if not text:
+            return self.courses[:limit]
+
+        found: dict[int, None] = {}
+        for i in range(bisect.bisect_left(self._keys, text), len(self._keys)):
+            if len(found) >= limit or not self._keys[i].startswith(text):
+                break
+            found.setdefault(self._positions[i])
+        if len(found) < limit:
+            for position, haystack in enumerate(self._text):
+                if text in haystack:
+                    found.setdefault(position)
+                    if len(found) >= limit:
+                        break
+        return [self.courses[position] for position in found]
+
+
+class _Entry:
+    __slots__ = ("index", "refresh_at", "task")
+
+    def __init__(self):
+        self.index: CourseIndex | None = None
+        self.refresh_at = 0.0
+        self.task: asyncio.Task | None = None
+
+
+class CourseCache:
+    """
+    In-memory course lists per Canvas token, searchable without I/O.
+
+    :meth:`search` only ever reads memory. When a token's list is older
+    than ``ttl`` (or missing) it is reloaded in the background and the old
+    list keeps being served until the new one is ready, so lookups never
+    wait for Canvas. A failed reload is retried after 30 seconds.
+
+    Memory is bounded: each token keeps at most ``max_courses`` courses
+    (the first ones ``load`` returns) and only the ``max_tokens`` most
+    recently used tokens are cached.
+
+    Parameters
+    ----------
+    load : Callable[[str], Awaitable[list[dict]]]
+        Fetches the courses for a token, in the order they should be
+        offered.
+    ttl : float
+        Seconds a course list is served before it is refreshed.
+    max_courses : int
+        Maximum number of courses kept per token.
+    max_tokens : int
+        Maximum number of tokens with a cached course list.
+    """
+
+    def __init__(
+        self,
+        load: Callable[[str], Awaitable[list[dict]]],
+        ttl: float = 900.0,
+        max_courses: int = 5000,
+        max_tokens: int = 16,
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.load = load
+        self.ttl = ttl
+        self.max_courses = max_courses
+        self.max_tokens = max_tokens
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+
+    def _entry(self, token: str) -> _Entry:
+        entry = self._entries.get(token)
+        if entry is None:
+            entry = self._entries[token] = _Entry()
+            while len(self._entries) > self.max_tokens:
+                _, evicted = self._entries.popitem(last=False)
+                if evicted.task is not None:
+                    evicted.task.cancel()
+        self._entries.move_to_end(token)
+        return entry
+
+    async def _load(self, token: str, entry: _Entry) -> None:
+        started = time.perf_counter()
+        try:
+            courses = await self.load(token)
+        except Exception as e:
+            self.logger.warning(f"Loading Canvas courses failed: {e!r}")
+            entry.refresh_at = time.monotonic() + _RETRY_AFTER
+            return
+        entry.index = CourseIndex(courses[: self.max_courses])
+        entry.refresh_at = time.monotonic() + self.ttl
+        self.logger.info(
+            f"Cached {len(entry.index)} Canvas course(s) "
+            f"in {time.perf_counter() - started:.2f}s"
+        )
+
+    def refresh(self, token: str) -> asyncio.Task:
+        """Start reloading ``token``'s courses unless a reload is running."""
+        entry = self._entry(token)
+        if entry.task is None or entry.task.done():
+            entry.task = asyncio.create_task(self._load(token, entry))
+        return entry.task
+
+    def search(self, token: str, text: str, limit: int = 25) -> list[dict]:
+        """
+        Courses of ``token`` matching ``text`` (see :meth:`CourseIndex.search`)
+        from memory; empty until the first load has finished.
+        """
+        entry = self._entry(token)
+        if time.monotonic() >= entry.refresh_at:
+            self.refresh(token)
+        return entry.index.search(text, limit) if entry.index is not None else []
+
+    async def wait_loaded(self, token: str, timeout: float) -> bool:
+        """Wait up to ``timeout`` seconds for ``token``'s first load."""
+        entry = self._entry(token)
+        running = entry.task is not None and not entry.task.done()
+        if entry.index is None and (running or time.monotonic() >= entry.refresh_at):
+            try:
+                await asyncio.wait_for(asyncio.shield(self.refresh(token)), timeout)
+            except TimeoutError:
+                pass
+        return entry.index is not None
+
+    def invalidate(self, token: str | None = None) -> None:
+        """Reload ``token``'s courses (or every token's) on the next search."""
+        entries = self._entries.values() if token is None else [self._entry(token)]
+        for entry in entries:
+            entry.refresh_at = 0.0
+
+    def close(self) -> None:
+        for entry in self._entries.values():
+            if entry.task is not None:
+                entry.task.cancel()
+        self._entries.clear()
@@ -0,0 +1,354 @@
+import re
+import time
+import asyncio
+import logging
+import contextlib
+from typing import AsyncIterator
+
+import discord
+
+__all__ = ["GROUP_ROLE_PATTERN", "GuildIndex", "GuildIndexRegistry"]
+
+GROUP_ROLE_PATTERN = re.compile(r"^(\d{4})_group_(\d+)$")
+
+
+class GuildIndex:
+    """
+    Lookup tables for one guild's roles, channels and role membership.
+
+    ``discord.utils.get`` over ``guild.roles`` is a linear scan and
+    ``Role.members`` scans every cached member, so the semester commands
+    were O(groups × members). The index answers the same questions with
+    dict lookups and is kept current incrementally from gateway events by
+    :class:`GuildIndexRegistry`.
+
+    Names are not unique in Discord; like ``discord.utils.get`` the index
+    resolves a name to the highest role or first channel carrying it, and
+    falls back to the next one when that is removed.
+
+    Parameters
+    ----------
+    guild : discord.Guild
+        The guild to index. Members are read from its cache unless
+        ``members`` is given (e.g. from ``guild.chunk(cache=False)``).
+    """
+
+    def __init__(
+        self, guild: discord.Guild, members: list[discord.Member] | None = None
+    ):
+        self.guild = guild
+        self._roles_by_name: dict[str, list[discord.Role]] = {}
+        self._group_roles: dict[tuple[int, int], discord.Role] = {}
+        self._group_role_ids: dict[int, discord.Role] = {}
+        self._categories: dict[str, list[discord.CategoryChannel]] = {}
+        self._channels: dict[
+            tuple[int | None, str, str], list[discord.abc.GuildChannel]
+        ] = {}
+        # Ids of the channels in each category, for capacity checks.
+        self._category_channels: dict[int, set[int]] = {}
+        self._role_members: dict[int, set[int]] = {}
+        # Ids of the group roles each member holds.
+        self._member_groups: dict[int, set[int]] = {}
+        self._members: dict[int, discord.Member] = {}
+
+        for role in guild.roles:
+            self.add_role(role)
+        for channel in guild.channels:
+            self.add_channel(channel)
+        self.load_members(guild.members if members is None else members)
+
+    # -- roles ---------------------------------------------------------------
+
+    def add_role(self, role: discord.Role) -> None:
+        roles = self._roles_by_name.setdefault(role.name, [])
+        roles.append(role)
+        roles.sort(key=lambda r: r.position, reverse=True)
+        match = GROUP_ROLE_PATTERN.match(role.name)
+        if match:
+            self._group_roles[(int(match[1]), int(match[2]))] = role
+            self._group_role_ids[role.id] = role
+            for member_id in self._role_members.get(role.id, ()):
+                self._member_groups.setdefault(member_id, set()).add(role.id)
+
+    def remove_role(self, role: discord.Role) -> None:
+        roles = self._roles_by_name.get(role.name, [])
+        roles[:] = [r for r in roles if r.id != role.id]
+        if not roles:
+            self._roles_by_name.pop(role.name, None)
+        match = GROUP_ROLE_PATTERN.match(role.name)
+        if match and self._group_roles.get((int(match[1]), int(match[2]))) == role:
+            del self._group_roles[(int(match[1]), int(match[2]))]
+        if self._group_role_ids.pop(role.id, None) is not None:
+            for member_id in self._role_members.get(role.id, ()):
+                self._member_groups.get(member_id, set()).discard(role.id)
+        self._role_members.pop(role.id, None)
+
+    def update_role(self, before: discord.Role, after: discord.Role) -> None:
+        """Re-index a renamed or moved role, keeping its members."""
+        members = self._role_members.get(before.id)
+        self.remove_role(before)
+        if members is not None:
+            self._role_members[after.id] = members
+        self.add_role(after)
+
+    def role(self, name: str) -> discord.Role | None:
+        roles = self._roles_by_name.get(name)
+        return roles[0] if roles else None
+
+    def group_role(self, year: int, n: int) -> discord.Role | None:
+        return self._group_roles.get((year, n))
+
+    def year_groups(self, year: int) -> list[discord.Role]:
+        """All ``<year>_group_<n>`` roles, ordered by ``n``."""
+        return [
+            role
+            for (role_year, _), role in sorted(self._group_roles.items())
+            if role_year == year
+        ]
+
+    # -- channels ------------------------------------------------------------
+
+    @staticmethod
+    def _channel_key(channel: discord.abc.GuildChannel) -> tuple[int | None, str, str]:
+        return (channel.category_id, str(channel.type), channel.name)
+
+    def add_channel(self, channel: discord.abc.GuildChannel) -> None:
+        if isinstance(channel, discord.CategoryChannel):
+            self._categories.setdefault(channel.name, []).append(channel)
+            return
+        self._channels.setdefault(self._channel_key(channel), []).append(channel)
+        if channel.category_id is not None:
+            self._category_channels.setdefault(channel.category_id, set()).add(
+                channel.id
+            )
+
+    def remove_channel(self, channel: discord.abc.GuildChannel) -> None:
+        if isinstance(channel, discord.CategoryChannel):
+            categories = self._categories.get(channel.name, [])
+            categories[:] = [c for c in categories if c.id != channel.id]
+            if not categories:
+                self._categories.pop(channel.name, None)
+            self._category_channels.pop(channel.id, None)
+            return
+        key = self._channel_key(channel)
+        channels = self._channels.get(key, [])
+        # A remaining channel of the same name takes the removed one's place.
+        channels[:] = [c for c in channels if c.id != channel.id]
+        if not channels:
+            self._channels.pop(key, None)
+        if channel.category_id in self._category_channels:
+            self._category_channels[channel.category_id].discard(channel.id)
+
+    def category(self, name: str) -> discord.CategoryChannel | None:
+        categories = self._categories.get(name)
+        return categories[0] if categories else None
+
+    def channel_count(self, category: discord.CategoryChannel) -> int:
+        """Number of channels inside ``category``."""
+        return len(self._category_channels.get(category.id, ()))
+
+    def text_channel(
+        self, category: discord.CategoryChannel | None, name: str
+    ) -> discord.TextChannel | None:
+        """Text channel ``name`` inside ``category`` (``None``: no category)."""
+        category_id = category.id if category else None
+        channels = self._channels.get((category_id, str(discord.ChannelType.text), name))
+        return channels[0] if channels else None
+
+    def voice_channel(
+        self, category: discord.CategoryChannel | None, name: str
+    ) -> discord.VoiceChannel | None:
+        """Voice channel ``name`` inside ``category`` (``None``: no category)."""
+        category_id = category.id if category else None
+        channels = self._channels.get((category_id, str(discord.ChannelType.voice), name))
+        return channels[0] if channels else None
+
+    # -- members -------------------------------------------------------------
+
+    def load_members(self, members: list[discord.Member]) -> None:
+        """Replace the membership tables with ``members``."""
+        self._members = {}
+        self._role_members = {}
+        self._member_groups = {}
+        for member in members:
+            self.add_member(member)
+
+    def add_member(self, member: discord.Member) -> None:
+        self._members[member.id] = member
+        groups = set()
+        for role in member.roles:
+            self._role_members.setdefault(role.id, set()).add(member.id)
+            if role.id in self._group_role_ids:
+                groups.add(role.id)
+        self._member_groups[member.id] = groups
+
+    def remove_member(self, member: discord.Member) -> None:
+        self._members.pop(member.id, None)
+        self._member_groups.pop(member.id, None)
+        for role in member.roles:
+            self._role_members.get(role.id, set()).discard(member.id)
+
+    def update_member(self, before: discord.Member, after: discord.Member) -> None:
+        self._members[after.id] = after
+        old = {role.id for role in before.roles}
+        new = {role.id for role in after.roles}
+        groups = self._member_groups.setdefault(after.id, set())
+        for role_id in old - new:
+            self._role_members.get(role_id, set()).discard(after.id)
+            groups.discard(role_id)
+        for role_id in new - old:
+            self._role_members.setdefault(role_id, set()).add(after.id)
+            if role_id in self._group_role_ids:
+                groups.add(role_id)
+
+    def members_of(self, role: discord.Role) -> list[discord.Member]:
+        """Members holding ``role``, without scanning the member cache."""
+        return [
+            self._members[member_id]
+            for member_id in self._role_members.get(role.id, ())
+            if member_id in self._members
+        ]
+
+    def groups_of(self, member: discord.Member) -> list[discord.Role]:
+        """The ``<year>_group_<n>`` roles ``member`` holds, lowest first."""
+        if member.id not in self._member_groups:
+            # Not in the indexed membership (e.g. lean mode outside a chunk).
+            return [r for r in member.roles if r.id in self._group_role_ids]
+        roles = [
+            self._group_role_ids[role_id]
+            for role_id in self._member_groups.get(member.id, ())
+            if role_id in self._group_role_ids
+        ]
+        return sorted(roles, key=lambda role: role.position)
+
+
+class GuildIndexRegistry:
+    """
+    Holds one :class:`GuildIndex` per guild and keeps them current.
+
+    Indexes are built lazily on first use and updated from the bot's role,
+    channel and member gateway events once :meth:`attach` has been called.
+
+    When the bot does not cache members (lean intents), indexes start without
+    membership; :meth:`members_loaded` fetches it for the duration of a
+    member-heavy operation.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._indexes: dict[int, GuildIndex] = {}
+        self._member_users: dict[int, int] = {}
+        self._member_locks: dict[int, asyncio.Lock] = {}
+        self._members_ready: set[int] = set()
+
+    def get(self, guild: discord.Guild) -> GuildIndex:
+        index = self._indexes.get(guild.id)
+        if index is None or index.guild is not guild:
+            index = GuildIndex(guild)
+            self._indexes[guild.id] = index
+            self.logger.debug(f"Built index for guild {guild.id}")
+        return index
+
+    def drop(self, guild_id: int) -> None:
+        self._indexes.pop(guild_id, None)
+
+    @contextlib.asynccontextmanager
+    async def members_loaded(self, guild: discord.Guild) -> AsyncIterator[GuildIndex]:
+        """
+        Yield ``guild``'s index with its full membership.
+
+        If the member cache already holds every member it is used as is.
+        Otherwise the members are requested from the gateway with
+        ``guild.chunk(cache=False)``, kept only in the index while the block
+        runs (concurrent blocks for one guild share them) and released when
+        the last block exits.
+        """
+        index = self.get(guild)
+        if guild.chunked:
+            yield index
+            return
+
+        self._member_users[guild.id] = self._member_users.get(guild.id, 0) + 1
+        lock = self._member_locks.setdefault(guild.id, asyncio.Lock())
+        try:
+            async with lock:
+                if guild.id not in self._members_ready:
+                    started = time.perf_counter()
+                    members = await guild.chunk(cache=False)
+                    index.load_members(members)
+                    self._members_ready.add(guild.id)
+                    self.logger.info(
+                        f"Chunked {len(members)} member(s) of guild {guild.id} in "
+                        f"{time.perf_counter() - started:.2f}s"
+                    )
+            yield index
+        finally:
+            self._member_users[guild.id] -= 1
+            if not self._member_users[guild.id]:
+                del self._member_users[guild.id]
+                del self._member_locks[guild.id]
+                self._members_ready.discard(guild.id)
+                index.load_members(guild.members)
+
+    def attach(self, bot) -> None:
+        """Register the event listeners that keep the indexes up to date."""
+        bot.add_listener(self.on_guild_role_create)
+        bot.add_listener(self.on_guild_role_delete)
+        bot.add_listener(self.on_guild_role_update)
+        bot.add_listener(self.on_guild_channel_create)
+        bot.add_listener(self.on_guild_channel_delete)
+        bot.add_listener(self.on_guild_channel_update)
+        bot.add_listener(self.on_member_join)
+        bot.add_listener(self.on_member_remove)
+        bot.add_listener(self.on_member_update)
+        bot.add_listener(self.on_guild_remove)
+
+    def _existing(self, guild: discord.Guild) -> GuildIndex | None:
+        # Events for guilds nobody has looked up yet need no bookkeeping.
+        return self._indexes.get(guild.id)
+
+    async def on_guild_role_create(self, role: discord.Role) -> None:
+        if index := self._existing(role.guild):
+            index.add_role(role)
+
+    async def on_guild_role_delete(self, role: discord.Role) -> None:
+        if index := self._existing(role.guild):
+            index.remove_role(role)
+
+    async def on_guild_role_update(
+        self, before: discord.Role, after: discord.Role
+    ) -> None:
+        if index := self._existing(after.guild):
+            index.update_role(before, after)
+
+    async def on_guild_channel_create(self, channel: discord.abc.GuildChannel) -> None:
+        if index := self._existing(channel.guild):
+            index.add_channel(channel)
+
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel) -> None:
+        if index := self._existing(channel.guild):
+            index.remove_channel(channel)
+
+    async def on_guild_channel_update(
+        self, before: discord.abc.GuildChannel, after: discord.abc.GuildChannel
+    ) -> None:
+        if index := self._existing(after.guild):
+            index.remove_channel(before)
+            index.add_channel(after)
+
+    async def on_member_join(self, member: discord.Member) -> None:
+        if index := self._existing(member.guild):
+            index.add_member(member)
+
+    async def on_member_remove(self, member: discord.Member) -> None:
+        if index := self._existing(member.guild):
+            index.remove_member(member)
+
+    async def on_member_update(
+        self, before: discord.Member, after: discord.Member
+    ) -> None:
+        if index := self._existing(after.guild):
+            index.update_member(before, after)
+
+    async def on_guild_remove(self, guild: discord.Guild) -> None:
+        self.drop(guild.id)
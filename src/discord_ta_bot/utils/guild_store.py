@@ -0,0 +1,257 @@
+import os
+import time
+import asyncio
+import logging
+import pathlib
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+from ..objects import (
+    Guild,
+    decode_guild,
+    encode_guild,
+    read_snapshot,
+    write_snapshot,
+)
+
+T = TypeVar("T")
+
+__all__ = ["GuildStore", "guild_store_path"]
+
+_DEFAULT_STATE_PATH = pathlib.Path.home() / ".local" / "state" / "discord-ta-bot"
+# Seconds writes are held back so that bursts are written in one transaction.
+DEFAULT_FLUSH_DELAY = float(os.getenv("GUILD_STORE_FLUSH_DELAY", 0.5))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS guilds (
+    id INTEGER PRIMARY KEY,
+    data TEXT NOT NULL,
+    updated REAL NOT NULL
+)
+"""
+
+
+def guild_store_path() -> pathlib.Path:
+    """Location of the guild settings database."""
+    return (
+        pathlib.Path.home()
+        / os.getenv("STATE_BASE_PATH", _DEFAULT_STATE_PATH)
+        / "guilds.sqlite3"
+    )
+
+
+class GuildStore:
+    """
+    Persistent guild settings (:class:`~discord_ta_bot.objects.Guild`) in a
+    local SQLite database.
+
+    The database runs in WAL mode on a single worker thread, so the event
+    loop never waits on disk. Reads go through an in-memory cache: a guild
+    is read from disk at most once (concurrent misses share one read), and
+    guilds that do not exist are cached too. Writes update the cache at
+    once and are written in the background: everything written within
+    ``flush_delay`` seconds goes to disk in one transaction, and repeated
+    writes of the same guild are coalesced into one. :meth:`flush` waits
+    until every earlier write is on disk; :meth:`close` flushes and may be
+    called more than once.
+
+    Rows hold the compact encoding of
+    :func:`~discord_ta_bot.objects.snapshot.encode_guild`. Guilds are
+    immutable, so cached ones are shared safely; store a changed copy
+    (``guild.replace(...)``) with :meth:`put`. :meth:`export_snapshot` and
+    :meth:`import_snapshot` move every guild to and from a snapshot file.
+
+    Parameters
+    ----------
+    path : pathlib.Path | None
+        Database file, by default ``guilds.sqlite3`` in the state directory.
+    flush_delay : float
+        Seconds writes are collected before being written.
+    """
+
+    def __init__(
+        self,
+        path: pathlib.Path | None = None,
+        flush_delay: float = DEFAULT_FLUSH_DELAY,
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.path = path or guild_store_path()
+        self.flush_delay = flush_delay
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix="guild-store")
+        self._connection: sqlite3.Connection | None = None
+        self._cache: dict[int, Guild | None] = {}
+        self._loading: dict[int, asyncio.Future] = {}
+        # Pending writes: serialized guild, or None for a deletion.
+        self._dirty: dict[int, str | None] = {}
+        self._flusher: asyncio.Task | None = None
+        self._wake = asyncio.Event()
+        self._complete = False
+        self._closed = False
+
+    # -- worker thread -------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            # WAL with synchronous=NORMAL stays consistent across crashes and
+            # only risks the last transactions on power loss.
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(_SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    def _read(self, guild_id: int) -> str | None:
+        row = (
+            self._connect()
+            .execute("SELECT data FROM guilds WHERE id = ?", (guild_id,))
+            .fetchone()
+        )
+        return row[0] if row else None
+
+    def _read_all(self) -> list[tuple[int, str]]:
+        return self._connect().execute("SELECT id, data FROM guilds").fetchall()
+
+    def _write(self, batch: dict[int, str | None]) -> None:
+        connection = self._connect()
+        now = time.time()
+        with connection:
+            connection.execute("BEGIN")
+            connection.executemany(
+                "INSERT INTO guilds (id, data, updated) VALUES (?, ?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET data = excluded.data, "
+                "updated = excluded.updated",
+                [(i, data, now) for i, data in batch.items() if data is not None],
+            )
+            connection.executemany(
+                "DELETE FROM guilds WHERE id = ?",
+                [(i,) for i, data in batch.items() if data is None],
+            )
+
+    def _close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    async def _run(self, function: Callable[..., T], *args) -> T:
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, function, *args
+        )
+
+    # -- reads ---------------------------------------------------------------
+
+    async def get(self, guild_id: int) -> Guild | None:
+        """The settings of ``guild_id``, or ``None`` if none are stored."""
+        if guild_id in self._cache:
+            return self._cache[guild_id]
+        if guild_id in self._loading:
+            return await asyncio.shield(self._loading[guild_id])
+
+        future = asyncio.get_running_loop().create_future()
+        self._loading[guild_id] = future
+        try:
+            data = await self._run(self._read, guild_id)
+            guild = decode_guild(data) if data is not None else None
+        except BaseException as e:
+            future.set_exception(e)
+            # Nobody else may be waiting; don't warn about an unread error.
+            future.exception()
+            raise
+        finally:
+            del self._loading[guild_id]
+        # A write while the read was in flight wins.
+        guild = self._cache.setdefault(guild_id, guild)
+        future.set_result(guild)
+        return guild
+
+    async def get_or_create(self, guild_id: int, name: str | None = None) -> Guild:
+        """The settings of ``guild_id``, created (unsaved) if none are stored."""
+        guild = await self.get(guild_id)
+        return guild if guild is not None else Guild(guild_id, name)
+
+    async def all(self) -> list[Guild]:
+        """Every stored guild, including writes not yet flushed."""
+        if not self._complete:
+            rows = await self._run(self._read_all)
+            for guild_id, data in rows:
+                if guild_id not in self._cache:
+                    self._cache[guild_id] = decode_guild(data)
+            self._complete = True
+        return [guild for guild in self._cache.values() if guild is not None]
+
+    # -- writes --------------------------------------------------------------
+
+    def _schedule(self, guild_id: int, data: str | None) -> None:
+        self._dirty[guild_id] = data
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        try:
+            await asyncio.wait_for(self._wake.wait(), self.flush_delay)
+        except TimeoutError:
+            pass
+        self._wake.clear()
+        try:
+            await self._flush()
+        except Exception:
+            # Logged by _flush; retried by the next write or flush.
+            pass
+
+    async def _flush(self) -> None:
+        while self._dirty:
+            batch, self._dirty = self._dirty, {}
+            try:
+                await self._run(self._write, batch)
+            except Exception:
+                # Keep the batch, minus anything written again since.
+                self._dirty = batch | self._dirty
+                self.logger.exception(f"Writing {len(batch)} guild(s) failed")
+                raise
+            self.logger.debug(f"Wrote {len(batch)} guild(s) to {self.path}")
+
+    async def put(self, guild: Guild) -> None:
+        """Store ``guild``; written to disk in the background."""
+        self._cache[guild.id] = guild
+        self._schedule(guild.id, encode_guild(guild))
+
+    async def update(self, guild_id: int, **fields) -> Guild:
+        """Set attributes of ``guild_id``'s settings (created if missing)."""
+        guild = (await self.get_or_create(guild_id)).replace(**fields)
+        await self.put(guild)
+        return guild
+
+    async def delete(self, guild_id: int) -> None:
+        self._cache[guild_id] = None
+        self._schedule(guild_id, None)
+
+    async def flush(self) -> None:
+        """Write every pending change now and wait until it is on disk."""
+        if self._flusher is not None and not self._flusher.done():
+            self._wake.set()
+            await asyncio.shield(self._flusher)
+        await self._flush()
+
+    async def export_snapshot(self, path: pathlib.Path) -> int:
+        """Write every guild to the snapshot file ``path``; returns the count."""
+        guilds = await self.all()
+        return await asyncio.to_thread(write_snapshot, path, guilds)
+
+    async def import_snapshot(self, path: pathlib.Path) -> int:
+        """Store every guild of the snapshot file ``path``; returns the count."""
+        guilds = await asyncio.to_thread(lambda: list(read_snapshot(path)))
+        for guild in guilds:
+            await self.put(guild)
+        return len(guilds)
+
+    async def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            await self.flush()
+        finally:
+            await self._run(self._close)
+            self._executor.shutdown()
@@ -0,0 +1,252 @@
+import os
+import time
+import enum
+import asyncio
+import logging
+import contextlib
+from collections import deque
+from typing import Awaitable, Callable, Iterator
+
+__all__ = ["Job", "JobConflict", "JobManager", "JobState"]
+
+# Number of finished jobs kept for /jobs.
+DEFAULT_JOB_HISTORY = int(os.getenv("JOB_HISTORY", 50))
+
+
+class JobState(enum.StrEnum):
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class JobConflict(Exception):
+    """Raised when a job is started while one with the same key is running."""
+
+    def __init__(self, job: "Job"):
+        self.job = job
+        super().__init__(f"Job #{job.id} (`{job.name}`) is already running.")
+
+
+class Job:
+    """
+    A long-running command run in the background by :class:`JobManager`.
+
+    The work reports progress by setting :attr:`total` and calling
+    :meth:`advance`; the rate of completed steps gives the ETA. Its return
+    value is kept as :attr:`result`, a failure as :attr:`error`.
+    """
+
+    __slots__ = (
+        "id",
+        "name",
+        "guild_id",
+        "user_id",
+        "key",
+        "state",
+        "total",
+        "done",
+        "failed",
+        "result",
+        "error",
+        "created",
+        "started",
+        "finished",
+        "task",
+    )
+
+    def __init__(
+        self,
+        job_id: int,
+        name: str,
+        guild_id: int | None,
+        user_id: int | None,
+        key: str | None,
+    ):
+        self.id = job_id
+        self.name = name
+        self.guild_id = guild_id
+        self.user_id = user_id
+        self.key = key
+        self.state = JobState.RUNNING
+        self.total: int | None = None
+        self.done = 0
+        self.failed = 0
+        self.result: str | None = None
+        self.error: str | None = None
+        self.created = time.time()
+        self.started = time.perf_counter()
+        self.finished: float | None = None
+        self.task: asyncio.Task | None = None
+
+    def advance(self, steps: int = 1, failed: bool = False) -> None:
+        """Count ``steps`` finished steps, as failed ones if ``failed``."""
+        self.done += steps
+        if failed:
+            self.failed += steps
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def eta(self) -> float | None:
+        """Seconds until the remaining steps are done at the rate so far."""
+        if self.state != JobState.RUNNING or not self.total or not self.done:
+            return None
+        return self.elapsed / self.done * max(0, self.total - self.done)
+
+    def describe(self) -> str:
+        """One line with the job's state, progress and timing."""
+        line = f"#{self.id} `{self.name}` {self.state}"
+        if self.total:
+            line += f", {self.done}/{self.total} step(s)"
+            if self.failed:
+                line += f" ({self.failed} failed)"
+        elif self.done:
+            line += f", {self.done} step(s)"
+        line += f", {self.elapsed:.0f}s"
+        if self.eta is not None:
+            line += f", ETA ~{self.eta:.0f}s"
+        if self.user_id is not None:
+            line += f", by <@{self.user_id}>"
+        return line
+
+
+class JobManager:
+    """
+    Runs long-running commands as tracked background tasks.
+
+    Each job gets an id, progress counters and an ETA, can be cancelled and
+    outlives the interaction that started it. Finished jobs are kept in a
+    history of the newest ``history`` jobs. Jobs started with the same
+    ``key`` never overlap: starting one while another runs raises
+    :class:`JobConflict`. A job working on several keys (e.g. a rollover
+    across guilds) can hold each with :meth:`claim` while it works on it.
+
+    Parameters
+    ----------
+    history : int
+        Number of finished jobs kept.
+    """
+
+    def __init__(self, history: int = DEFAULT_JOB_HISTORY):
+        self.logger = logging.getLogger(__name__)
+        self.running: dict[int, Job] = {}
+        self.history: deque[Job] = deque(maxlen=history)
+        self._claims: dict[str, Job] = {}
+        self._next_id = 1
+
+    def start(
+        self,
+        name: str,
+        work: Callable[[Job], Awaitable[str]],
+        guild_id: int | None = None,
+        user_id: int | None = None,
+        key: str | None = None,
+        on_done: Callable[[Job], Awaitable[None]] | None = None,
+    ) -> Job:
+        """
+        Run ``work(job)`` in the background and return the job at once.
+        ``on_done(job)`` is awaited when it finished, failed or was
+        cancelled. Raises :class:`JobConflict` if a job with ``key`` runs.
+        """
+        if key is not None:
+            conflict = self.find(key)
+            if conflict is not None:
+                raise JobConflict(conflict)
+        job = Job(self._next_id, name, guild_id, user_id, key)
+        self._next_id += 1
+        self.running[job.id] = job
+        job.task = asyncio.create_task(self._run(job, work, on_done))
+        self.logger.info(f"Started job {job.id} ({name}) in {guild_id} for {user_id}")
+        return job
+
+    async def _run(
+        self,
+        job: Job,
+        work: Callable[[Job], Awaitable[str]],
+        on_done: Callable[[Job], Awaitable[None]] | None,
+    ) -> None:
+        try:
+            job.result = await work(job)
+            job.state = JobState.SUCCEEDED
+        except asyncio.CancelledError:
+            job.state = JobState.CANCELLED
+        except Exception as e:
+            job.state = JobState.FAILED
+            job.error = str(e) or repr(e)
+            self.logger.exception(f"Job {job.id} ({job.name}) failed")
+        finally:
+            job.finished = time.perf_counter()
+            del self.running[job.id]
+            self.history.append(job)
+            self.logger.info(
+                f"Job {job.id} ({job.name}) {job.state} after {job.elapsed:.2f}s"
+            )
+        if on_done is not None:
+            try:
+                await on_done(job)
+            except Exception:
+                self.logger.exception(f"Reporting job {job.id} ({job.name}) failed")
+
+    def find(self, key: str) -> Job | None:
+        """The running job started with or claiming ``key``, if any."""
+        if key in self._claims:
+            return self._claims[key]
+        return next((job for job in self.running.values() if job.key == key), None)
+
+    @contextlib.contextmanager
+    def claim(self, key: str, job: Job) -> Iterator[None]:
+        """
+        Hold ``key`` for ``job`` while the block runs, as if ``job`` had been
+        started with it. Raises :class:`JobConflict` if another job holds it.
+        """
+        conflict = self.find(key)
+        if conflict is not None and conflict is not job:
+            raise JobConflict(conflict)
+        if conflict is job:
+            yield
+            return
+        self._claims[key] = job
+        try:
+            yield
+        finally:
+            del self._claims[key]
+
+    def get(self, job_id: int) -> Job | None:
+        """Running or retained job ``job_id``."""
+        if job_id in self.running:
+            return self.running[job_id]
+        return next((job for job in self.history if job.id == job_id), None)
+
+    def list(self, guild_id: int | None = None) -> list[Job]:
+        """Running jobs, then finished ones, newest first; of ``guild_id`` if given."""
+        jobs = sorted(self.running.values(), key=lambda job: -job.id) + sorted(
+            self.history, key=lambda job: -job.id
+        )
+        if guild_id is None:
+            return jobs
+        return [job for job in jobs if job.guild_id == guild_id]
+
+    def cancel(self, job_id: int) -> bool:
+        """Request cancellation of running job ``job_id``; False if not running."""
+        job = self.running.get(job_id)
+        if job is None:
+            return False
+        job.task.cancel()
+        return True
+
+    async def join(self) -> None:
+        """Wait until every running job has finished."""
+        while self.running:
+            await asyncio.gather(
+                *(job.task for job in list(self.running.values())),
+                return_exceptions=True,
+            )
+
+    async def close(self) -> None:
+        """Cancel every running job and wait for it to stop."""
+        for job in self.running.values():
+            job.task.cancel()
+        await self.join()
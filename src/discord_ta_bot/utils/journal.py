@@ -0,0 +1,165 @@
+import os
+import json
+import time
+import asyncio
+import pathlib
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+__all__ = ["TransitionJournal", "journal_path"]
+
+_DEFAULT_STATE_PATH = pathlib.Path.home() / ".local" / "state" / "discord-ta-bot"
+# Journal files are read and written on this thread, never on the event loop.
+_WRITER = ThreadPoolExecutor(1, thread_name_prefix="journal")
+
+
+def journal_path(guild_id: int) -> pathlib.Path:
+    """Location of the transition journal for ``guild_id``."""
+    return (
+        pathlib.Path.home()
+        / os.getenv("STATE_BASE_PATH", _DEFAULT_STATE_PATH)
+        / "journal"
+        / f"{guild_id}.jsonl"
+    )
+
+
+class TransitionJournal:
+    """
+    Append-only record of the steps a semester transition has completed.
+
+    Every line of the journal file is a JSON object: a ``begin`` record with
+    the transition name and its parameters, one ``step`` record per completed
+    step, and an ``end`` record once the transition finished. A journal whose
+    last ``begin`` has no ``end`` belongs to an interrupted transition, which
+    can be resumed by re-running it and skipping every step already recorded.
+
+    Records are written on a background thread, so the event loop never
+    waits on disk: records made while a write is in progress are appended
+    together in the next one. A crash or reboot loses at most the steps
+    recorded since the last write; :meth:`flush` waits until every record
+    is on disk. An existing journal file is read on the same thread by
+    :meth:`open` (or :meth:`for_guild`); the constructor starts empty.
+
+    Parameters
+    ----------
+    path : pathlib.Path | None
+        Journal file. ``None`` keeps the journal in memory only.
+    """
+
+    def __init__(self, path: pathlib.Path | None = None):
+        self.path = path
+        self.logger = logging.getLogger(__name__)
+        self.active: dict | None = None
+        self._done: set[str] = set()
+        # Lines waiting for the writer thread, and whether to truncate first.
+        self._pending: list[str] = []
+        self._truncate = False
+        self._lock = threading.Lock()
+        self._writer: Future | None = None
+
+    @classmethod
+    async def open(cls, path: pathlib.Path) -> "TransitionJournal":
+        """The journal in ``path``, with its records loaded if it exists."""
+        journal = cls(path)
+        await asyncio.wrap_future(_WRITER.submit(journal._load))
+        return journal
+
+    @classmethod
+    async def for_guild(cls, guild_id: int) -> "TransitionJournal":
+        return await cls.open(journal_path(guild_id))
+
+    def _load(self) -> None:
+        """Replay the journal file (on the writer thread)."""
+        if not self.path.exists():
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn final line from a crash mid-write; ignore it.
+                    self.logger.warning(f"Skipping corrupt journal line in {self.path}")
+                    continue
+                if record["op"] == "begin":
+                    self.active = record
+                    self._done = set()
+                elif record["op"] == "step" and self.active is not None:
+                    self._done.add(record["step"])
+                elif record["op"] == "end":
+                    self.active = None
+                    self._done = set()
+
+    def _append(self, record: dict) -> None:
+        if self.path is None:
+            return
+        record["at"] = time.time()
+        with self._lock:
+            self._pending.append(json.dumps(record) + "\n")
+            if self._writer is None:
+                self._writer = _WRITER.submit(self._write)
+
+    def _write(self) -> None:
+        """Append pending lines until none are left (on the writer thread)."""
+        while True:
+            with self._lock:
+                lines, self._pending = self._pending, []
+                truncate, self._truncate = self._truncate, False
+                if not lines and not truncate:
+                    self._writer = None
+                    return
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, "w" if truncate else "a", encoding="utf-8") as f:
+                    f.writelines(lines)
+                    f.flush()
+            except BaseException:
+                with self._lock:
+                    self._pending[:0] = lines
+                    self._truncate = self._truncate or truncate
+                    self._writer = None
+                self.logger.exception(f"Writing journal {self.path} failed")
+                raise
+
+    async def flush(self) -> None:
+        """Wait until every record made so far is on disk."""
+        while self._writer is not None:
+            await asyncio.wrap_future(self._writer)
+
+    def matches(self, transition: str, **params) -> bool:
+        """Whether the unfinished transition is ``transition`` with ``params``."""
+        return (
+            self.active is not None
+            and self.active["transition"] == transition
+            and self.active["params"] == params
+        )
+
+    def begin(self, transition: str, **params) -> None:
+        """
+        Start journaling ``transition``. Any unfinished transition is
+        discarded and the file is started afresh.
+        """
+        with self._lock:
+            self._pending.clear()
+            self._truncate = True
+        self.active = {"op": "begin", "transition": transition, "params": params}
+        self._done = set()
+        self._append(dict(self.active))
+
+    def is_done(self, step: str) -> bool:
+        return step in self._done
+
+    def record(self, step: str, **detail) -> None:
+        """Mark ``step`` as completed."""
+        self._done.add(step)
+        self._append({"op": "step", "step": step, **detail})
+
+    def completed(self) -> int:
+        """Number of steps completed by the unfinished transition."""
+        return len(self._done)
+
+    def complete(self) -> None:
+        """Mark the active transition as finished."""
+        self._append({"op": "end"})
+        self.active = None
+        self._done = set()
@@ -0,0 +1,120 @@
+import queue
+import logging
+import threading
+from collections import Counter
+from logging.handlers import QueueHandler, QueueListener
+
+__all__ = ["BoundedQueueHandler", "QueueLogging"]
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    :class:`~logging.handlers.QueueHandler` that never blocks the caller.
+
+    Records are put on a bounded queue without waiting; when it is full the
+    record is dropped and counted in :attr:`dropped` (per level name) so the
+    listener can report the loss.
+
+    Parameters
+    ----------
+    maxsize : int
+        Maximum number of records waiting to be written.
+    """
+
+    def __init__(self, maxsize: int):
+        super().__init__(queue.Queue(maxsize))
+        self.dropped: Counter = Counter()
+        self._lock_dropped = threading.Lock()
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock_dropped:
+                self.dropped[record.levelname] += 1
+
+    def take_dropped(self) -> Counter:
+        """Return and reset the records dropped since the last call."""
+        with self._lock_dropped:
+            dropped, self.dropped = self.dropped, Counter()
+        return dropped
+
+
+class _ReportingListener(QueueListener):
+    """Listener that writes a warning whenever records were dropped."""
+
+    def __init__(self, handler: BoundedQueueHandler, *handlers):
+        super().__init__(handler.queue, *handlers, respect_handler_level=True)
+        self.queue_handler = handler
+        self.total_dropped = 0
+
+    def enqueue_sentinel(self) -> None:
+        # Wait for room rather than fail when stopped with a full queue.
+        self.queue.put(self._sentinel)
+
+    def handle(self, record: logging.LogRecord) -> None:
+        dropped = self.queue_handler.take_dropped()
+        if dropped:
+            self.total_dropped += sum(dropped.values())
+            counts = ", ".join(f"{n} {level}" for level, n in sorted(dropped.items()))
+            super().handle(
+                logging.makeLogRecord(
+                    {
+                        "name": __name__,
+                        "levelno": logging.WARNING,
+                        "levelname": "WARNING",
+                        "msg": f"Log queue overflowed; dropped {counts} record(s)",
+                    }
+                )
+            )
+        super().handle(record)
+
+
+class QueueLogging:
+    """
+    Moves log file I/O off the event loop.
+
+    :meth:`start` attaches a :class:`BoundedQueueHandler` to ``logger`` in
+    place of ``handlers`` and starts a background thread that owns the
+    handlers and writes (and rotates) the files. Logging calls on the loop
+    only format the message and enqueue it.
+
+    Parameters
+    ----------
+    maxsize : int
+        Capacity of the record queue; see :class:`BoundedQueueHandler`.
+    """
+
+    def __init__(self, maxsize: int):
+        self.handler = BoundedQueueHandler(maxsize)
+        self._listener: _ReportingListener | None = None
+        self._logger: logging.Logger | None = None
+        self._reported = 0
+
+    @property
+    def dropped(self) -> int:
+        """Total records lost to a full queue so far."""
+        reported = self._listener.total_dropped if self._listener else self._reported
+        return reported + sum(self.handler.dropped.values())
+
+    def pending(self) -> int:
+        return self.handler.queue.qsize()
+
+    def start(self, logger: logging.Logger, *handlers: logging.Handler) -> None:
+        if self._listener is not None:
+            return
+        self._listener = _ReportingListener(self.handler, *handlers)
+        self._listener.start()
+        self._logger = logger
+        logger.addHandler(self.handler)
+
+    def stop(self) -> None:
+        """Detach the queue handler and write out every queued record."""
+        if self._listener is None:
+            return
+        self._logger.removeHandler(self.handler)
+        self._listener.stop()
+        for handler in self._listener.handlers:
+            handler.close()
+        self._reported = self._listener.total_dropped
+        self._listener = None
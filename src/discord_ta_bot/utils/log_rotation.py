@@ -0,0 +1,216 @@
+import os
+import re
+import gzip
+import time
+import queue
+import shutil
+import logging
+import pathlib
+import datetime
+import threading
+from logging.handlers import BaseRotatingHandler
+
+__all__ = ["CompressingRotatingFileHandler", "rotated_files"]
+
+_INTERVALS = {"S": 1, "M": 60, "H": 60 * 60, "D": 24 * 60 * 60}
+_STAMP_FORMAT = "%Y%m%d-%H%M%S"
+
+
+_logger = logging.getLogger(__name__)
+
+
+def _rotated_pattern(path: pathlib.Path) -> re.Pattern:
+    return re.compile(rf"^{re.escape(path.name)}\.(\d{{8}}-\d{{6}})(?:-(\d+))?(\.gz)?$")
+
+
+def _legacy_pattern(path: pathlib.Path) -> re.Pattern:
+    # Backups named by logging.handlers.RotatingFileHandler (<name>.1 newest).
+    return re.compile(rf"^{re.escape(path.name)}\.(\d+)$")
+
+
+def rotated_files(path: str | os.PathLike, legacy: bool = True) -> list[pathlib.Path]:
+    """
+    Rotated siblings of log file ``path`` written by
+    :class:`CompressingRotatingFileHandler`, newest first. With ``legacy``
+    the ``<name>.<n>`` backups of ``RotatingFileHandler`` follow as the
+    oldest ones.
+    """
+    path = pathlib.Path(path)
+    pattern = _rotated_pattern(path)
+    legacy_pattern = _legacy_pattern(path)
+    found = []
+    try:
+        entries = list(path.parent.iterdir())
+    except FileNotFoundError:
+        return []
+    for entry in entries:
+        if match := pattern.match(entry.name):
+            found.append((match[1], int(match[2] or 0), entry))
+        elif legacy and (match := legacy_pattern.match(entry.name)):
+            found.append(("", -int(match[1]), entry))
+    return [entry for *_, entry in sorted(found, reverse=True)]
+
+
+class _Compressor:
+    """Single daemon thread gzipping rotated files for every handler."""
+
+    def __init__(self):
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def submit(self, path: pathlib.Path, handler: "CompressingRotatingFileHandler") -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="log-compressor", daemon=True
+                )
+                self._thread.start()
+        self._queue.put((path, handler))
+
+    def _run(self) -> None:
+        while True:
+            path, handler = self._queue.get()
+            try:
+                self.compress(path)
+                handler.prune()
+            except Exception:
+                # Records are only queued or appended from here; a failing
+                # handler reports on stderr through handleError.
+                _logger.exception(f"Could not compress {path}")
+            finally:
+                self._queue.task_done()
+
+    @staticmethod
+    def compress(path: pathlib.Path) -> None:
+        if not path.exists():
+            return
+        target = path.with_name(path.name + ".gz")
+        partial = path.with_name(path.name + ".gz.tmp")
+        with open(path, "rb") as src, gzip.open(partial, "wb") as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        os.replace(partial, target)
+        path.unlink()
+
+
+_compressor = _Compressor()
+
+
+class CompressingRotatingFileHandler(BaseRotatingHandler):
+    """
+    File handler rotating by size and/or time, gzipping rotated files.
+
+    Rotated files are renamed to ``<name>.<YYYYmmdd-HHMMSS>`` and compressed
+    to ``<name>.<YYYYmmdd-HHMMSS>.gz`` by a background thread, so rotation
+    itself is only a rename. Unique timestamped names mean a slow
+    compression never races with the next rollover. Only the newest
+    ``backup_count`` rotated files are kept, counting the ``<name>.<n>``
+    backups left by ``RotatingFileHandler`` as the oldest. As with
+    ``RotatingFileHandler``, a ``backup_count`` of 0 keeps no rotated files:
+    rollover starts the log afresh.
+
+    Parameters
+    ----------
+    filename : str | os.PathLike
+        Active log file.
+    max_bytes : int
+        Rotate before the file would exceed this size; 0 disables.
+    backup_count : int
+        Number of rotated files to keep; 0 discards the log on rollover.
+    when : str | None
+        Rotate every ``interval`` seconds (``"S"``), minutes (``"M"``),
+        hours (``"H"``) or days (``"D"``), or at local ``"midnight"``;
+        ``None`` disables time-based rotation.
+    interval : int
+        Multiplier for ``when``.
+    compress : bool
+        Gzip rotated files.
+    """
+
+    def __init__(
+        self,
+        filename: str | os.PathLike,
+        max_bytes: int = 0,
+        backup_count: int = 0,
+        when: str | None = None,
+        interval: int = 1,
+        compress: bool = True,
+        encoding: str | None = None,
+    ):
+        super().__init__(filename, "a", encoding=encoding, delay=False)
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.when = when.upper() if when else None
+        if self.when and self.when != "MIDNIGHT" and self.when not in _INTERVALS:
+            raise ValueError(f"Invalid rotation interval unit {when!r}")
+        self.interval = max(1, interval)
+        self.compress = compress
+        self.rollover_at = self._next_rollover(time.time())
+        self._recover()
+
+    @property
+    def path(self) -> pathlib.Path:
+        return pathlib.Path(self.baseFilename)
+
+    def _next_rollover(self, now: float) -> float | None:
+        if self.when is None:
+            return None
+        if self.when == "MIDNIGHT":
+            today = datetime.datetime.fromtimestamp(now).date()
+            midnight = datetime.datetime.combine(
+                today + datetime.timedelta(days=self.interval), datetime.time()
+            )
+            return midnight.timestamp()
+        return now + self.interval * _INTERVALS[self.when]
+
+    def _recover(self) -> None:
+        """Finish compressions a previous process did not get to."""
+        for partial in self.path.parent.glob(f"{self.path.name}.*.gz.tmp"):
+            partial.unlink(missing_ok=True)
+        if not self.compress:
+            return
+        for rotated in rotated_files(self.path, legacy=False):
+            if rotated.suffix != ".gz":
+                _compressor.submit(rotated, self)
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self.rollover_at is not None and time.time() >= self.rollover_at:
+            return True
+        if self.max_bytes > 0:
+            if self.stream is None:
+                self.stream = self._open()
+            message = f"{self.format(record)}\n"
+            if self.stream.tell() + len(message) >= self.max_bytes:
+                return True
+        return False
+
+    def _rotation_target(self) -> pathlib.Path:
+        stamp = time.strftime(_STAMP_FORMAT)
+        target = self.path.with_name(f"{self.path.name}.{stamp}")
+        n = 0
+        while target.exists() or target.with_name(target.name + ".gz").exists():
+            n += 1
+            target = self.path.with_name(f"{self.path.name}.{stamp}-{n}")
+        return target
+
+    def doRollover(self) -> None:
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        if self.backup_count <= 0:
+            self.path.unlink(missing_ok=True)
+            self.prune()
+        elif self.path.exists() and self.path.stat().st_size > 0:
+            target = self._rotation_target()
+            os.replace(self.path, target)
+            if self.compress:
+                _compressor.submit(target, self)
+            else:
+                self.prune()
+        self.stream = self._open()
+        self.rollover_at = self._next_rollover(time.time())
+
+    def prune(self) -> None:
+        """Delete rotated files beyond ``backup_count``."""
+        for old in rotated_files(self.path)[max(0, self.backup_count) :]:
+            old.unlink(missing_ok=True)
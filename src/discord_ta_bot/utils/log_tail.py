@@ -0,0 +1,150 @@
+import os
+import gzip
+import logging
+import pathlib
+import itertools
+from collections import deque
+from typing import Callable, Iterable, Iterator
+
+from .log_rotation import rotated_files
+
+__all__ = ["LogQuery", "reverse_lines", "tail_log"]
+
+_BLOCK_SIZE = 64 * 1024
+_LEVELS = {
+    name: level
+    for name, level in logging.getLevelNamesMapping().items()
+    if name not in ("NOTSET", "WARN", "FATAL")
+}
+
+
+def reverse_lines(path: str | os.PathLike, block_size: int = _BLOCK_SIZE) -> Iterator[str]:
+    """
+    Lines of ``path`` from last to first, read in blocks from the end of the
+    file so only as much of it is read as the caller consumes. Empty lines
+    are skipped.
+    """
+    with open(path, "rb") as f:
+        position = f.seek(0, os.SEEK_END)
+        remainder = b""
+        while position > 0:
+            size = min(block_size, position)
+            position -= size
+            f.seek(position)
+            lines = (f.read(size) + remainder).split(b"\n")
+            # The first piece may be the tail of a line in an earlier block.
+            remainder = lines.pop(0)
+            for line in reversed(lines):
+                if line:
+                    yield line.decode("utf-8", errors="replace")
+        if remainder:
+            yield remainder.decode("utf-8", errors="replace")
+
+
+def _is_header(line: str) -> bool:
+    return line.split(" ", 1)[0] in _LEVELS
+
+
+def _records(lines: Iterable[str]) -> Iterator[str]:
+    """Group lines, in file order, into records (header plus continuations)."""
+    record: list[str] = []
+    for line in lines:
+        if _is_header(line) and record:
+            yield "\n".join(record)
+            record = []
+        record.append(line)
+    if record:
+        yield "\n".join(record)
+
+
+def _reverse_records(lines: Iterable[str]) -> Iterator[str]:
+    """Group reversed lines into records, yielding the newest record first."""
+    continuation: list[str] = []
+    for line in lines:
+        continuation.append(line)
+        if _is_header(line):
+            yield "\n".join(reversed(continuation))
+            continuation = []
+    if continuation:
+        yield "\n".join(reversed(continuation))
+
+
+class LogQuery:
+    """
+    Filter for log records written with a ``LOGFILE_FORMAT`` starting with
+    ``%(levelname)s %(name)s`` (the default in ``env_example``).
+
+    Parameters
+    ----------
+    level : str | None
+        Minimum level name, e.g. ``"WARNING"``.
+    logger : str | None
+        Logger name; matches the logger and its children.
+    text : str | None
+        Substring the record must contain, e.g. a guild id.
+    """
+
+    def __init__(
+        self,
+        level: str | None = None,
+        logger: str | None = None,
+        text: str | None = None,
+    ):
+        self.level = _LEVELS[level.upper()] if level else None
+        self.logger = logger
+        self.text = text
+
+    def __call__(self, record: str) -> bool:
+        header = record.split("\n", 1)[0].split(" ", 2)
+        if self.level is not None and _LEVELS.get(header[0], 0) < self.level:
+            return False
+        if self.logger is not None:
+            name = header[1] if len(header) > 1 else ""
+            if name != self.logger and not name.startswith(f"{self.logger}."):
+                return False
+        if self.text is not None and self.text not in record:
+            return False
+        return True
+
+
+def _newest_matches(
+    path: pathlib.Path, limit: int, predicate: Callable[[str], bool]
+) -> list[str]:
+    """Up to ``limit`` matching records of one file, newest first."""
+    if path.suffix == ".gz":
+        # gzip streams cannot be read backwards; keep a bounded window.
+        with gzip.open(path, "rt", encoding="utf-8", errors="replace") as f:
+            lines = (line.rstrip("\n") for line in f)
+            matches = deque(
+                (r for r in _records(line for line in lines if line) if predicate(r)),
+                maxlen=limit,
+            )
+        return list(reversed(matches))
+    records = _reverse_records(reverse_lines(path))
+    return list(itertools.islice(filter(predicate, records), limit))
+
+
+def tail_log(
+    path: str | os.PathLike,
+    limit: int,
+    predicate: Callable[[str], bool] | None = None,
+) -> list[str]:
+    """
+    The last ``limit`` records of log file ``path`` matching ``predicate``,
+    oldest first, continuing into its rotated files (see
+    :func:`~discord_ta_bot.utils.log_rotation.rotated_files`) when the
+    active file holds fewer.
+    """
+    path = pathlib.Path(path)
+    predicate = predicate or LogQuery()
+    found: list[str] = []
+    for file in [path, *rotated_files(path)]:
+        remaining = limit - len(found)
+        if remaining <= 0:
+            break
+        try:
+            found += _newest_matches(file, remaining, predicate)
+        except (FileNotFoundError, EOFError, gzip.BadGzipFile):
+            # Rotated or compressed while we were looking; skip it.
+            continue
+    return found[::-1]
@@ -0,0 +1,505 @@
+import os
+import sys
+import math
+import time
+import bisect
+import logging
+import contextvars
+from typing import Callable
+
+import aiohttp
+
+import discord
+from discord import app_commands
+
+from .scheduler import route_key
+
+__all__ = [
+    "process_memory",
+    "CounterMetric",
+    "Gauge",
+    "Histogram",
+    "MetricsRegistry",
+    "MeteredCommandTree",
+]
+
+# Port of the local Prometheus endpoint; unset or empty disables it.
+DEFAULT_METRICS_PORT = os.getenv("METRICS_PORT") or None
+DEFAULT_METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+# Slash commands range from instant replies to semester transitions that
+# run for minutes, so the buckets span both.
+COMMAND_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+REQUEST_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+_STARTED_KEY = "metrics_started"
+# Qualified name of the app command the current task is running for.
+_current_command: contextvars.ContextVar[str | None] = contextvars.ContextVar(
+    "current_command", default=None
+)
+
+
+def process_memory() -> tuple[int | None, int | None]:
+    """
+    Current and peak resident set size of this process in bytes; either is
+    ``None`` where the platform does not report it.
+    """
+    current = peak = None
+    try:
+        with open("/proc/self/statm") as f:
+            current = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+
+        # ru_maxrss is in KiB on Linux and bytes on macOS.
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak *= 1 if sys.platform == "darwin" else 1024
+    except ImportError:
+        pass
+    return current, peak
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> list[tuple[str, str, float]]:
+        raise NotImplementedError
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        lines += [
+            f"{name}{labels} {_format_value(value)}"
+            for name, labels, value in self.samples()
+        ]
+        return lines
+
+
+class CounterMetric(_Metric):
+    """
+    Monotonically increasing value per label set. With ``function`` the
+    (unlabelled) total is read from it at scrape time instead.
+    """
+
+    type = "counter"
+
+    def __init__(
+        self,
+        name,
+        documentation,
+        labelnames=(),
+        function: Callable[[], float] | None = None,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.function = function
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        if self.function is not None:
+            return [(self.name, "", self.function())]
+        return [
+            (self.name, _format_labels(self.labelnames, key), value)
+            for key, value in sorted(self._values.items())
+        ]
+
+
+class Gauge(_Metric):
+    """
+    Value that can go up and down. With ``function`` the value is read from
+    it at scrape time: a number (or ``None`` to omit the sample) for an
+    unlabelled gauge, otherwise a dict mapping label value tuples to numbers.
+    """
+
+    type = "gauge"
+
+    def __init__(
+        self,
+        name,
+        documentation,
+        labelnames=(),
+        function: Callable[[], float | dict | None] | None = None,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.function = function
+        self._values: dict[tuple, float] = {}
+
+    def set(self, value: float, **labels) -> None:
+        self._values[self._key(labels)] = value
+
+    def samples(self):
+        if self.function is not None:
+            value = self.function()
+            if self.labelnames:
+                return [
+                    (self.name, _format_labels(self.labelnames, key), v)
+                    for key, v in sorted((value or {}).items())
+                ]
+            return [] if value is None else [(self.name, "", value)]
+        return [
+            (self.name, _format_labels(self.labelnames, key), value)
+            for key, value in sorted(self._values.items())
+        ]
+
+
+class Histogram(_Metric):
+    """Cumulative bucket counts, sum and count of observations per label set."""
+
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=REQUEST_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values: dict[tuple, list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        counts = self._values.get(key)
+        if counts is None:
+            # One slot per bucket plus +Inf, then the sum.
+            counts = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def count(self, **labels) -> int:
+        counts = self._values.get(self._key(labels))
+        return sum(counts[:-1]) if counts else 0
+
+    def samples(self):
+        samples = []
+        for key, counts in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                samples.append(
+                    (
+                        f"{self.name}_bucket",
+                        _format_labels(self.labelnames, key, le),
+                        cumulative,
+                    )
+                )
+            labels = _format_labels(self.labelnames, key)
+            samples.append((f"{self.name}_sum", labels, counts[-1]))
+            samples.append((f"{self.name}_count", labels, cumulative))
+        return samples
+
+
+class MetricsRegistry:
+    """
+    In-process metrics for the bot, exposed in the Prometheus text format.
+
+    The registry holds the bot's standard metrics (see the attributes set in
+    ``__init__``); further metrics can be added with :meth:`counter`,
+    :meth:`gauge` and :meth:`histogram`. REST calls are recorded through the
+    handlers :meth:`instrument` adds to the HTTP client's trace config, app
+    commands through :class:`MeteredCommandTree`. Rendering is cheap and
+    nothing is sent anywhere unless :meth:`serve` is called.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._metrics: dict[str, _Metric] = {}
+        # aiohttp.web.AppRunner of the endpoint while it is served.
+        self._runner = None
+
+        self.commands = self.histogram(
+            "discord_app_command_duration_seconds",
+            "Time from dispatch to completion of app commands.",
+            ("command", "outcome"),
+            buckets=COMMAND_BUCKETS,
+        )
+        self.requests = self.counter(
+            "discord_rest_requests_total",
+            "REST requests sent to Discord.",
+            ("route", "status"),
+        )
+        self.request_duration = self.histogram(
+            "discord_rest_request_duration_seconds",
+            "Round-trip time of REST requests to Discord.",
+            ("route",),
+            buckets=REQUEST_BUCKETS,
+        )
+        self.command_requests = self.counter(
+            "discord_app_command_rest_requests_total",
+            "REST requests sent on behalf of app commands.",
+            ("command",),
+        )
+        self.rate_limited = self.counter(
+            "discord_rest_rate_limited_total",
+            "REST responses with status 429.",
+            ("route", "scope"),
+        )
+        self.retry_after = self.counter(
+            "discord_rest_retry_after_seconds_total",
+            "Sum of Retry-After durations Discord asked for.",
+            ("route",),
+        )
+
+    def _register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(
+        self, name: str, documentation: str, labelnames=(), function=None
+    ) -> CounterMetric:
+        return self._register(CounterMetric(name, documentation, labelnames, function))
+
+    def gauge(
+        self, name: str, documentation: str, labelnames=(), function=None
+    ) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames, function))
+
+    def histogram(
+        self, name: str, documentation: str, labelnames=(), buckets=REQUEST_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def get(self, name: str) -> _Metric | None:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines += metric.render()
+        return "\n".join(lines) + "\n"
+
+    # -- bot integration -------------------------------------------------------
+
+    def instrument(self, config: aiohttp.TraceConfig) -> aiohttp.TraceConfig:
+        """Add handlers recording every REST request to ``config``."""
+        config.on_request_start.append(self._on_request_start)
+        config.on_request_end.append(self._on_request_end)
+        return config
+
+    async def _on_request_start(self, session, context, params) -> None:
+        context.metrics_started = time.perf_counter()
+
+    async def _on_request_end(self, session, context, params) -> None:
+        route, _ = route_key(params.method, params.url.path)
+        status = params.response.status
+        self.requests.inc(route=route, status=status)
+        if command := _current_command.get():
+            self.command_requests.inc(command=command)
+        if hasattr(context, "metrics_started"):
+            self.request_duration.observe(
+                time.perf_counter() - context.metrics_started, route=route
+            )
+        if status == 429:
+            headers = params.response.headers
+            scope = "global" if headers.get("X-RateLimit-Global") else "route"
+            self.rate_limited.inc(route=route, scope=scope)
+            try:
+                self.retry_after.inc(float(headers.get("Retry-After", 0)), route=route)
+            except ValueError:
+                pass
+
+    def observe_command(
+        self, interaction: discord.Interaction, command, outcome: str
+    ) -> None:
+        """Record the duration of ``command`` if its start was recorded."""
+        started = interaction.extras.pop(_STARTED_KEY, None)
+        if started is None:
+            return
+        name = getattr(command, "qualified_name", None) or "unknown"
+        self.commands.observe(
+            time.perf_counter() - started, command=name, outcome=outcome
+        )
+
+    async def on_app_command_completion(
+        self, interaction: discord.Interaction, command
+    ) -> None:
+        self.observe_command(interaction, command, "ok")
+
+    def track_bot(self, bot) -> None:
+        """
+        Record ``bot``'s completed app commands and register metrics reading
+        its gateway and scheduler state.
+        """
+        bot.add_listener(self.on_app_command_completion)
+
+        def gateway_latency() -> float | None:
+            latency = bot.latency
+            return None if math.isnan(latency) or math.isinf(latency) else latency
+
+        self.gauge(
+            "discord_gateway_latency_seconds",
+            "Time between the last gateway heartbeat and its acknowledgement.",
+            function=gateway_latency,
+        )
+
+        def shards() -> dict[int, object]:
+            # A bot without sharding runs as the only shard, shard 0.
+            return getattr(bot, "shards", None) or {bot.shard_id or 0: None}
+
+        def shard_latency() -> dict[tuple, float]:
+            latencies = {}
+            for shard_id, shard in shards().items():
+                latency = shard.latency if shard is not None else bot.latency
+                if not (math.isnan(latency) or math.isinf(latency)):
+                    latencies[(str(shard_id),)] = latency
+            return latencies
+
+        def shard_up() -> dict[tuple, int]:
+            return {
+                (str(shard_id),): int(
+                    not (shard.is_closed() if shard is not None else bot.is_closed())
+                )
+                for shard_id, shard in shards().items()
+            }
+
+        self.gauge(
+            "discord_shard_latency_seconds",
+            "Gateway heartbeat latency per shard in this process.",
+            ("shard",),
+            function=shard_latency,
+        )
+        self.gauge(
+            "discord_shard_up",
+            "1 if the shard's gateway connection is open.",
+            ("shard",),
+            function=shard_up,
+        )
+        self.gauge(
+            "process_resident_memory_bytes",
+            "Resident memory size in bytes.",
+            function=lambda: process_memory()[0],
+        )
+        self.gauge(
+            "discord_cached_members",
+            "Members held in the member cache across all guilds.",
+            function=lambda: sum(len(g.members) for g in bot.guilds),
+        )
+        self.gauge(
+            "discord_guilds",
+            "Guilds the bot is a member of.",
+            function=lambda: len(bot.guilds),
+        )
+        scheduler = bot.scheduler
+        self.gauge(
+            "discord_scheduler_pending",
+            "Mutations waiting in the scheduler queues.",
+            function=scheduler.pending,
+        )
+        self.counter(
+            "discord_scheduler_wait_seconds_total",
+            "Total time mutations spent queued for rate limits.",
+            function=lambda: scheduler.stats["wait_seconds"],
+        )
+        self.counter(
+            "discord_scheduler_dispatched_total",
+            "Mutations dispatched by the scheduler.",
+            function=lambda: scheduler.stats["dispatched"],
+        )
+        self.gauge(
+            "discord_scheduler_latency_seconds",
+            "Moving average of REST round-trip time used for estimates.",
+            function=lambda: scheduler.latency,
+        )
+
+    # -- HTTP endpoint ---------------------------------------------------------
+
+    async def serve(
+        self,
+        host: str = DEFAULT_METRICS_HOST,
+        port: int | str | None = None,
+        offset: int = 0,
+    ) -> None:
+        """
+        Serve :meth:`render` at ``http://<host>:<port + offset>/metrics``.
+        Without a ``port`` the ``METRICS_PORT`` environment variable is used,
+        and if that is unset or empty the endpoint stays disabled. Cluster
+        workers pass their index as ``offset`` to serve on consecutive ports.
+        """
+        port = port if port is not None else DEFAULT_METRICS_PORT
+        if not port or self._runner is not None:
+            return
+        port = int(port) + offset
+        # The server side of aiohttp is only needed when metrics are served.
+        from aiohttp import web
+
+        async def metrics(request: web.Request) -> web.Response:
+            return web.Response(
+                text=self.render(),
+                headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+            )
+
+        app = web.Application()
+        app.router.add_get("/metrics", metrics)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        self.logger.info(f"Serving metrics on http://{host}:{port}/metrics")
+
+    async def close(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+class MeteredCommandTree(app_commands.CommandTree):
+    """
+    Command tree that times every app command into the client's
+    :class:`MetricsRegistry` (``client.metrics``) and attributes the REST
+    requests made while it runs to it.
+    """
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.type is not discord.InteractionType.application_command:
+            return True
+        interaction.extras[_STARTED_KEY] = time.perf_counter()
+        if interaction.command is not None:
+            # Runs in the task that invokes the command, so REST requests
+            # the command makes (directly or via the scheduler) see it.
+            _current_command.set(interaction.command.qualified_name)
+        return True
+
+    async def on_error(
+        self, interaction: discord.Interaction, error: app_commands.AppCommandError
+    ) -> None:
+        metrics = getattr(self.client, "metrics", None)
+        if metrics is not None:
+            metrics.observe_command(interaction, interaction.command, "error")
+        await super().on_error(interaction, error)
@@ -0,0 +1,151 @@
+import math
+from collections import Counter
+from typing import Any, Awaitable, Callable
+
+from .concurrency import run_worker_pool
+from .journal import TransitionJournal
+
+__all__ = ["Mutation", "Plan"]
+
+
+class Mutation:
+    """
+    A single REST call a plan intends to make.
+
+    Parameters
+    ----------
+    key : str
+        Stable identifier of the step, used as its journal entry and to look
+        up its result from later steps (see :attr:`Plan.results`).
+    kind : str
+        Human readable category used for call counts, e.g. ``"role create"``.
+    route : str
+        :class:`~discord_ta_bot.utils.scheduler.Routes` template the call uses.
+    description : str
+        One-line description shown in dry runs.
+    action : Callable[[], Awaitable[Any]]
+        Performs the call. Its return value is stored under ``key``.
+    """
+
+    __slots__ = ("key", "kind", "route", "description", "action")
+
+    def __init__(
+        self,
+        key: str,
+        kind: str,
+        route: str,
+        description: str,
+        action: Callable[[], Awaitable[Any]],
+    ):
+        self.key = key
+        self.kind = kind
+        self.route = route
+        self.description = description
+        self.action = action
+
+
+class Plan:
+    """
+    Ordered set of mutations needed to bring a guild to a desired state.
+
+    Mutations are grouped into named phases. Phases run one after another;
+    the mutations inside a phase are independent and run concurrently.
+    Planners only add a mutation when the current state differs from the
+    desired one, so an empty plan means there is nothing to do.
+    """
+
+    def __init__(self, title: str):
+        self.title = title
+        self.phases: dict[str, list[Mutation]] = {}
+        self.warnings: list[str] = []
+        self.results: dict[str, Any] = {}
+        self.calls: Counter = Counter()
+
+    def add(
+        self,
+        phase: str,
+        key: str,
+        kind: str,
+        route: str,
+        description: str,
+        action: Callable[[], Awaitable[Any]],
+    ) -> None:
+        self.phases.setdefault(phase, []).append(
+            Mutation(key, kind, route, description, action)
+        )
+
+    def mutations(self) -> list[Mutation]:
+        return [m for mutations in self.phases.values() for m in mutations]
+
+    def call_count(self) -> int:
+        return sum(len(mutations) for mutations in self.phases.values())
+
+    def pending_count(self, journal: TransitionJournal) -> int:
+        """Number of mutations ``journal`` does not show as done."""
+        return sum(not journal.is_done(m.key) for m in self.mutations())
+
+    def estimate(self, scheduler, guild_id: int, concurrency: int) -> float:
+        """
+        Estimated seconds to execute the plan: per phase, the slower of the
+        rate-limit bound reported by ``scheduler`` and the latency bound of
+        ``concurrency`` requests in flight.
+        """
+        seconds = 0.0
+        for mutations in self.phases.values():
+            routes = Counter(m.route for m in mutations)
+            rate_bound = scheduler.estimate(routes, guild_id)
+            latency_bound = math.ceil(len(mutations) / max(1, concurrency)) * scheduler.latency
+            seconds += max(rate_bound, latency_bound)
+        return seconds
+
+    def render(self, limit: int = 10) -> str:
+        """Describe the plan, listing up to ``limit`` mutations per phase."""
+        if not self.call_count():
+            return f"{self.title}: nothing to do."
+        lines = [f"{self.title}: {self.call_count()} API call(s)"]
+        for phase, mutations in self.phases.items():
+            lines.append(f"**{phase}** ({len(mutations)})")
+            lines += [f"- {m.description}" for m in mutations[:limit]]
+            if len(mutations) > limit:
+                lines.append(f"- … and {len(mutations) - limit} more")
+        return "\n".join(lines)
+
+    async def execute(
+        self,
+        concurrency: int,
+        journal: TransitionJournal | None = None,
+        on_error: Callable[[Mutation, Exception], str | None] | None = None,
+        on_step: Callable[[Mutation], None] | None = None,
+    ) -> None:
+        """
+        Run every mutation not already recorded in ``journal`` on a pool of
+        ``concurrency`` workers, recording each one as it completes and
+        tallying it in :attr:`calls`.
+
+        A failing mutation does not stop the rest of its phase. Afterwards
+        each failure is passed to ``on_error``, which may re-raise it to
+        abort the plan or return a warning to add to :attr:`warnings`.
+        Without ``on_error`` the first failure is raised. ``on_step`` is
+        called as each mutation finishes, failed or not.
+        """
+        journal = journal or TransitionJournal()
+
+        async def run(mutation: Mutation) -> None:
+            try:
+                self.results[mutation.key] = await mutation.action()
+            finally:
+                if on_step is not None:
+                    on_step(mutation)
+            self.calls[mutation.kind] += 1
+            journal.record(mutation.key)
+
+        for mutations in self.phases.values():
+            pending = [m for m in mutations if not journal.is_done(m.key)]
+            for mutation, result in await run_worker_pool(pending, run, concurrency):
+                if not isinstance(result, BaseException):
+                    continue
+                if on_error is None:
+                    raise result
+                warning = on_error(mutation, result)
+                if warning:
+                    self.warnings.append(warning)
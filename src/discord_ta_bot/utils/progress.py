@@ -0,0 +1,196 @@
+import io
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+import discord
+
+from .jobs import Job, JobConflict, JobManager, JobState
+from .scheduler import MutationScheduler, Priority, Routes
+
+__all__ = ["ProgressMessage", "run_as_job", "send_report"]
+
+# Seconds between edits; Discord allows about five webhook edits per 5s.
+DEFAULT_PROGRESS_INTERVAL = 3.0
+# Longer reports are sent as a file.
+_MAX_INLINE_REPORT = 1900
+
+
+class ProgressMessage:
+    """
+    An ephemeral followup that shows the progress of a long-running command.
+
+    Used as an async context manager around the work: on entry the message
+    is sent with ``render()``; while the work runs it is edited with the
+    current ``render()`` every ``interval`` seconds if the text changed,
+    until the interaction expires, and once more on exit so the message
+    ends with the final counts. Sends and edits go through the scheduler
+    ahead of bulk mutations, and a failed edit is logged rather than
+    interrupting the work.
+
+    Parameters
+    ----------
+    scheduler : MutationScheduler
+        The bot's scheduler.
+    interaction : discord.Interaction
+        A deferred interaction to follow up on.
+    render : Callable[[], str]
+        Returns the current progress text.
+    interval : float
+        Seconds between edits.
+    """
+
+    def __init__(
+        self,
+        scheduler: MutationScheduler,
+        interaction: discord.Interaction,
+        render: Callable[[], str],
+        interval: float = DEFAULT_PROGRESS_INTERVAL,
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.scheduler = scheduler
+        self.interaction = interaction
+        self.render = render
+        self.interval = interval
+        self.message: discord.WebhookMessage | None = None
+        self._shown = ""
+        self._task: asyncio.Task | None = None
+
+    async def _edit(self) -> None:
+        """Show the current ``render()`` if it changed."""
+        content = self.render()
+        if content == self._shown or self.message is None:
+            return
+        try:
+            await self.scheduler.submit(
+                lambda: self.message.edit(content=content),
+                route=Routes.FOLLOWUP_EDIT,
+                guild_id=self.interaction.guild_id,
+                major=self.interaction.token,
+                priority=Priority.INTERACTIVE,
+            )
+            self._shown = content
+        except discord.HTTPException as e:
+            self.logger.warning(f"Could not update progress message: {e}")
+
+    async def _update(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            if self.interaction.is_expired():
+                return
+            await self._edit()
+
+    async def __aenter__(self) -> "ProgressMessage":
+        self._shown = self.render()
+        self.message = await self.scheduler.submit(
+            lambda: self.interaction.followup.send(
+                self._shown, ephemeral=True, wait=True
+            ),
+            route=Routes.FOLLOWUP,
+            guild_id=self.interaction.guild_id,
+            major=self.interaction.token,
+            priority=Priority.INTERACTIVE,
+        )
+        self._task = asyncio.create_task(self._update())
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        if not self.interaction.is_expired():
+            await self._edit()
+
+
+async def send_report(
+    scheduler: MutationScheduler,
+    interaction: discord.Interaction,
+    text: str,
+    filename: str,
+) -> None:
+    """
+    Ephemeral followup of ``text``, as ``filename`` under its first line if
+    it is too long. Once the interaction has expired (e.g. a job finishing
+    after 15 minutes) the report is sent to the user as a direct message.
+    """
+    header, _, _ = text.partition("\n")
+    long = len(text) > _MAX_INLINE_REPORT
+    options = lambda: (
+        {"file": discord.File(io.BytesIO(text.encode()), filename=filename)}
+        if long
+        else {}
+    )
+    if interaction.is_expired():
+        factory = lambda: interaction.user.send(header if long else text, **options())
+        route, guild_id, major = Routes.MESSAGE_CREATE, None, None
+    else:
+        factory = lambda: interaction.followup.send(
+            header if long else text, ephemeral=True, **options()
+        )
+        route, guild_id = Routes.FOLLOWUP, interaction.guild_id
+        major = interaction.token
+    await scheduler.submit(
+        factory,
+        route=route,
+        guild_id=guild_id,
+        major=major,
+        priority=Priority.INTERACTIVE,
+    )
+
+
+async def run_as_job(
+    jobs: JobManager,
+    scheduler: MutationScheduler,
+    interaction: discord.Interaction,
+    name: str,
+    work: Callable[[Job], Awaitable[str]],
+    filename: str,
+    key: str | None = None,
+    announce: bool = True,
+) -> Job | None:
+    """
+    Run ``work`` for a deferred ``interaction`` as a background job (see
+    :class:`~discord_ta_bot.utils.jobs.JobManager`) and send its report with
+    :func:`send_report` when it ends. Unless ``announce`` is false the user
+    is told the job id first. If a job with ``key`` is already running the
+    user is told so instead and ``None`` is returned.
+    """
+
+    async def report(job: Job) -> None:
+        if job.state == JobState.SUCCEEDED:
+            text = job.result
+        elif job.state == JobState.CANCELLED:
+            steps = f" ({job.done}/{job.total} step(s) done)" if job.total else ""
+            text = f"Job #{job.id} `{name}` was cancelled after {job.elapsed:.0f}s{steps}."
+        else:
+            text = f"Job #{job.id} `{name}` failed after {job.elapsed:.0f}s: {job.error}"
+        await send_report(scheduler, interaction, text, filename)
+
+    try:
+        job = jobs.start(
+            name,
+            work,
+            guild_id=interaction.guild_id,
+            user_id=interaction.user.id,
+            key=key,
+            on_done=report,
+        )
+    except JobConflict as e:
+        await send_report(
+            scheduler,
+            interaction,
+            f"{e} Wait for it to finish or stop it with `/jobs cancel {e.job.id}`.",
+            filename,
+        )
+        return None
+    if announce:
+        await send_report(
+            scheduler,
+            interaction,
+            f"Started job #{job.id} `{name}`. Follow it with `/jobs status "
+            f"{job.id}`; the report is sent when it finishes.",
+            filename,
+        )
+    return job
@@ -0,0 +1,520 @@
+import os
+import re
+import time
+import enum
+import asyncio
+import logging
+import contextvars
+from collections import OrderedDict, deque
+from typing import Awaitable, Callable, TypeVar
+
+import aiohttp
+
+T = TypeVar("T")
+
+__all__ = ["Priority", "Routes", "RateWindow", "RouteBucket", "MutationScheduler", "route_key"]
+
+# Discord allows 50 requests per second per bot across all routes.
+DEFAULT_GLOBAL_RATE = float(os.getenv("SCHEDULER_GLOBAL_RATE", 50))
+# Share of the global rate a single guild may use, so one guild's bulk work
+# cannot starve the others.
+DEFAULT_GUILD_RATE = float(os.getenv("SCHEDULER_GUILD_RATE", 25))
+# Assumed REST round-trip time until one has been measured.
+_DEFAULT_LATENCY = 0.25
+# How long an unlearned route waits for the headers of its probe request
+# before letting the next request through anyway.
+_PROBE_TIMEOUT = 1.0
+
+_ID_NAMES = {
+    "guilds": "{guild_id}",
+    "channels": "{channel_id}",
+    "roles": "{role_id}",
+    "members": "{user_id}",
+    "users": "{user_id}",
+    "messages": "{message_id}",
+    "permissions": "{overwrite_id}",
+    "webhooks": "{webhook_id}",
+    "interactions": "{interaction_id}",
+}
+# Top-level resources whose id is a major parameter of the routes below them.
+_MAJOR_PARAMETERS = ("guilds", "channels")
+_API_PREFIX = re.compile(r"^/api(/v\d+)?")
+
+
+class Priority(enum.IntEnum):
+    """Dispatch order of queued mutations; lower values go first."""
+
+    INTERACTIVE = 0
+    NORMAL = 1
+    BULK = 2
+
+
+class Routes:
+    """Route templates for the REST mutations the cogs submit."""
+
+    ROLE_CREATE = "POST /guilds/{guild_id}/roles"
+    ROLE_EDIT = "PATCH /guilds/{guild_id}/roles/{role_id}"
+    ROLE_DELETE = "DELETE /guilds/{guild_id}/roles/{role_id}"
+    ROLE_POSITIONS = "PATCH /guilds/{guild_id}/roles"
+    CHANNEL_CREATE = "POST /guilds/{guild_id}/channels"
+    CHANNEL_EDIT = "PATCH /channels/{channel_id}"
+    CHANNEL_DELETE = "DELETE /channels/{channel_id}"
+    CHANNEL_PERMISSIONS = "PUT /channels/{channel_id}/permissions/{overwrite_id}"
+    MEMBER_EDIT = "PATCH /guilds/{guild_id}/members/{user_id}"
+    ONBOARDING_EDIT = "PUT /guilds/{guild_id}/onboarding"
+    MESSAGE_CREATE = "POST /channels/{channel_id}/messages"
+    FOLLOWUP = "POST /webhooks/{webhook_id}/{token}"
+    FOLLOWUP_EDIT = "PATCH /webhooks/{webhook_id}/{token}/messages/{message_id}"
+
+
+def route_key(method: str, path: str) -> tuple[str, int | str | None]:
+    """
+    Normalise a request to ``("<METHOD> <template>", major)``.
+
+    Snowflakes are replaced by named placeholders (``/guilds/1/roles/2``
+    becomes ``/guilds/{guild_id}/roles/{role_id}``) so requests to the same
+    endpoint share a key. ``major`` is the top-level resource Discord keeps
+    separate rate limits for: the guild id of guild routes, the channel id of
+    channel routes and the token of webhook and interaction routes.
+    """
+    segments = _API_PREFIX.sub("", path).strip("/").split("/")
+    template: list[str] = []
+    major = None
+    for i, segment in enumerate(segments):
+        previous = segments[i - 1] if i else ""
+        if segment.isdigit():
+            template.append(_ID_NAMES.get(previous, "{id}"))
+            if i == 1 and previous in _MAJOR_PARAMETERS:
+                major = int(segment)
+        elif template and template[-1] in ("{webhook_id}", "{interaction_id}"):
+            template.append("{token}")
+            if i == 2:
+                major = segment
+        else:
+            template.append(segment)
+    return f"{method.upper()} /{'/'.join(template)}", major
+
+
+class RateWindow:
+    """
+    Sliding window allowing at most ``limit`` requests in any ``period``
+    seconds.
+
+    Unlike a token bucket, which allows a full burst on top of its refill
+    rate, a sliding window never lets more than ``limit`` requests through
+    within any interval of ``period`` seconds, so it also holds against
+    Discord's fixed windows whatever their alignment.
+    """
+
+    def __init__(self, limit: float, period: float = 1.0):
+        # Rounded down, so shares of a rate never add up to more than it.
+        self.limit = max(1, int(limit))
+        self.period = period
+        self.sent: deque[float] = deque()
+        self.blocked_until = 0.0
+
+    @property
+    def rate(self) -> float:
+        return self.limit / self.period
+
+    def delay(self, now: float) -> float:
+        """Seconds until another request may be sent (0 if one may now)."""
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        while self.sent and now - self.sent[0] >= self.period:
+            self.sent.popleft()
+        if len(self.sent) < self.limit:
+            return 0.0
+        return self.sent[0] + self.period - now
+
+    def take(self, now: float) -> None:
+        self.sent.append(now)
+
+    def block(self, seconds: float, now: float) -> None:
+        self.blocked_until = max(self.blocked_until, now + seconds)
+
+
+class RouteBucket:
+    """
+    Discord's fixed-window rate limit of one ``(route, major)`` pair, tracked
+    from the ``X-RateLimit-*`` headers.
+
+    Each dispatch uses up one of the window's :attr:`remaining` requests and
+    counts as in flight until it has finished; once none remain, requests
+    wait until the window resets. Every response sets :attr:`remaining` to
+    what Discord reports minus the requests still in flight, so concurrent
+    requests cannot overrun the window.
+
+    Buckets created without a limit are *unlearned*: they let a single probe
+    request through and wait for its headers (see :meth:`learn`) before
+    allowing more.
+    """
+
+    def __init__(self, limit: int | None = None, window: float | None = None):
+        self.limit = limit
+        self.window = window
+        self.remaining = limit if limit is not None else 1
+        self.reset_at: float | None = None
+        # Whether reset_at is a local guess rather than reported by Discord.
+        self.reset_guessed = False
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self.probe_sent: float | None = None
+
+    @property
+    def learned(self) -> bool:
+        return self.limit is not None
+
+    def _roll(self, now: float) -> None:
+        if self.reset_at is not None and now >= self.reset_at:
+            self.remaining = self.limit
+            self.reset_at = None
+            self.reset_guessed = False
+
+    def delay(self, now: float) -> float:
+        """Seconds until a request may be sent (0 if one may now)."""
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if not self.learned:
+            if self.probe_sent is None or now - self.probe_sent > _PROBE_TIMEOUT:
+                return 0.0
+            return _PROBE_TIMEOUT - (now - self.probe_sent)
+        self._roll(now)
+        if self.remaining > 0:
+            return 0.0
+        if self.reset_at is None:
+            return _PROBE_TIMEOUT
+        return self.reset_at - now
+
+    def take(self, now: float) -> None:
+        self.in_flight += 1
+        if not self.learned:
+            self.probe_sent = now
+            return
+        self._roll(now)
+        if self.reset_at is None and self.window is not None:
+            # Until a response reports the reset, assume the window started
+            # now and allow for the round trip.
+            self.reset_at = now + self.window + _PROBE_TIMEOUT
+            self.reset_guessed = True
+        self.remaining -= 1
+
+    def release(self) -> None:
+        """Mark a request taken from this bucket as finished."""
+        self.in_flight = max(0, self.in_flight - 1)
+
+    def learn(
+        self, limit: int, remaining: int, reset_after: float, now: float
+    ) -> None:
+        """Adopt the window reported by Discord's ``X-RateLimit-*`` headers."""
+        reset_at = now + reset_after
+        tolerance = self.window / 2 if self.window else _PROBE_TIMEOUT
+        known = self.reset_at is not None and not self.reset_guessed
+        if known and reset_at < self.reset_at - tolerance:
+            # A late response from a window that has already reset.
+            return
+        if self.window is None or remaining == limit - 1:
+            # First request of a window: reset_after is the full window length.
+            self.window = max(reset_after, 0.001)
+        # The responding request is still counted in flight until it returns.
+        others = max(0, self.in_flight - 1)
+        if not self.learned or (known and reset_at > self.reset_at + tolerance):
+            # Discord's window reset before ours: its count replaces ours.
+            self.remaining = remaining - others
+        else:
+            self.remaining = min(self.remaining, remaining - others)
+        self.limit = limit
+        self.reset_at = reset_at
+        self.reset_guessed = False
+        self.probe_sent = None
+
+    def block(self, seconds: float, now: float) -> None:
+        self.blocked_until = max(self.blocked_until, now + seconds)
+        self.probe_sent = None
+
+
+class _Job:
+    __slots__ = (
+        "factory",
+        "route",
+        "guild_id",
+        "major",
+        "priority",
+        "future",
+        "enqueued",
+        "context",
+        "bucket",
+    )
+
+    def __init__(self, factory, route, guild_id, major, priority, future):
+        self.factory = factory
+        self.route = route
+        self.guild_id = guild_id
+        self.major = major
+        self.priority = priority
+        self.future = future
+        self.enqueued = time.monotonic()
+        self.bucket: RouteBucket | None = None
+        # Run the call in the submitter's context so context variables (e.g.
+        # the command being metered) carry over to the request.
+        self.context = contextvars.copy_context()
+
+
+class MutationScheduler:
+    """
+    Bot-wide scheduler for Discord REST mutations.
+
+    Cogs hand their mutations to :meth:`submit` instead of awaiting them
+    directly. A request is only sent once the global window, its guild's
+    window and its ``(route, major)`` bucket all allow it, so concurrent bulk
+    commands are paced up front rather than stalling on 429s. Route buckets
+    follow Discord's fixed windows: they count the requests still in flight
+    and hold back once a window's remaining requests are used up.
+
+    Queued jobs are served strictly by :class:`Priority` class and
+    round-robin across guilds within a class, so one guild's bulk work never
+    delays another guild's interactive replies. Route limits are learned
+    from the rate-limit headers of every response the bot receives, via the
+    aiohttp trace returned by :meth:`trace_config`.
+
+    Parameters
+    ----------
+    global_rate : float
+        Requests per second allowed across all guilds.
+    guild_rate : float
+        Requests per second allowed for a single guild.
+    """
+
+    def __init__(
+        self,
+        global_rate: float = DEFAULT_GLOBAL_RATE,
+        guild_rate: float = DEFAULT_GUILD_RATE,
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.guild_rate = guild_rate
+        self.global_bucket = RateWindow(global_rate)
+        self.guild_buckets: dict[int | None, RateWindow] = {}
+        self.route_buckets: dict[tuple[str, int | str | None], RouteBucket] = {}
+        self.route_limits: dict[str, tuple[int, float]] = {}
+        # Exponentially weighted mean REST round-trip time in seconds.
+        self.latency = _DEFAULT_LATENCY
+        self.stats = {
+            "submitted": 0,
+            "dispatched": 0,
+            "wait_seconds": 0.0,
+            "rate_limited": 0,
+        }
+        self._queues: dict[Priority, OrderedDict[int | None, deque[_Job]]] = {
+            priority: OrderedDict() for priority in Priority
+        }
+        self._wakeup = asyncio.Event()
+        self._dispatcher: asyncio.Task | None = None
+        self._running: set[asyncio.Task] = set()
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """aiohttp trace feeding every response's headers to :meth:`observe`."""
+        config = aiohttp.TraceConfig()
+        config.on_request_start.append(self._on_request_start)
+        config.on_request_end.append(self._on_request_end)
+        return config
+
+    def start(self) -> None:
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+    async def close(self) -> None:
+        """Stop dispatching and fail any jobs still queued."""
+        if self._dispatcher:
+            self._dispatcher.cancel()
+            self._dispatcher = None
+        for queues in self._queues.values():
+            for queue in queues.values():
+                for job in queue:
+                    job.future.cancel()
+            queues.clear()
+
+    def pending(self) -> int:
+        return sum(len(q) for queues in self._queues.values() for q in queues.values())
+
+    async def submit(
+        self,
+        factory: Callable[[], Awaitable[T]],
+        *,
+        route: str,
+        guild_id: int | None = None,
+        major: int | str | None = None,
+        priority: Priority = Priority.NORMAL,
+    ) -> T:
+        """
+        Queue ``factory()`` and return its result once it has been sent.
+
+        ``factory`` must create a fresh awaitable each call (e.g.
+        ``lambda: role.edit(hoist=False)``). ``route`` is one of the
+        :class:`Routes` templates; it selects the per-route bucket together
+        with ``major``, the route's major parameter (the channel id of channel
+        routes, the interaction token of followups), which defaults to
+        ``guild_id``. If the dispatcher is not running (e.g. outside the bot)
+        the call is awaited immediately.
+        """
+        if self._dispatcher is None:
+            return await factory()
+        future = asyncio.get_running_loop().create_future()
+        queue = self._queues[priority].setdefault(guild_id, deque())
+        if major is None:
+            major = guild_id
+        queue.append(_Job(factory, route, guild_id, major, priority, future))
+        self.stats["submitted"] += 1
+        self._wakeup.set()
+        return await future
+
+    def observe(self, method: str, path: str, status: int, headers) -> None:
+        """Update bucket state from a response's rate-limit headers."""
+        now = time.monotonic()
+        route, major = route_key(method, path)
+        if status == 429:
+            self.stats["rate_limited"] += 1
+            retry_after = float(headers.get("Retry-After", 1))
+            if headers.get("X-RateLimit-Global"):
+                self.global_bucket.block(retry_after, now)
+            else:
+                self._route_bucket(route, major).block(retry_after, now)
+            self.logger.warning(
+                f"Rate limited on {route} ({major}); retry after {retry_after}s"
+            )
+            self._wakeup.set()
+            return
+
+        limit = headers.get("X-RateLimit-Limit")
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset_after = headers.get("X-RateLimit-Reset-After")
+        if limit is None or remaining is None or reset_after is None:
+            return
+        bucket = self._route_bucket(route, major)
+        bucket.learn(int(limit), int(remaining), float(reset_after), now)
+        self.route_limits[route] = (bucket.limit, bucket.window)
+        # Buckets for the same route keyed by another major (e.g. the next
+        # channel) start from the learned limits too.
+        for (other_route, _), other in self.route_buckets.items():
+            if other_route == route and not other.learned:
+                other.limit, other.window = bucket.limit, bucket.window
+                other.remaining = max(0, bucket.limit - other.in_flight)
+                other.probe_sent = None
+        self._wakeup.set()
+
+    def estimate(self, route_counts: dict[str, int], guild_id: int | None = None) -> float:
+        """
+        Lower bound in seconds for sending ``route_counts`` requests for one
+        guild at the currently learned rates. Routes are assumed to share one
+        bucket, so the bound is conservative for channel routes.
+        """
+        now = time.monotonic()
+        total = sum(route_counts.values())
+        seconds = [
+            total / self.global_bucket.rate,
+            total / self.guild_rate,
+        ]
+        for route, count in route_counts.items():
+            bucket = self.route_buckets.get((route, guild_id))
+            if bucket is None and route in self.route_limits:
+                bucket = RouteBucket(*self.route_limits[route])
+            if bucket is None or not bucket.learned or not bucket.window:
+                continue
+            burst = bucket.remaining if bucket.delay(now) == 0 else 0
+            windows = max(0, count - burst) / bucket.limit
+            seconds.append(windows * bucket.window)
+        return max(seconds)
+
+    async def _on_request_start(self, session, context, params) -> None:
+        context.started = time.monotonic()
+
+    async def _on_request_end(self, session, context, params) -> None:
+        if hasattr(context, "started"):
+            elapsed = time.monotonic() - context.started
+            self.latency = 0.9 * self.latency + 0.1 * elapsed
+        self.observe(
+            params.method, params.url.path, params.response.status, params.response.headers
+        )
+
+    def _route_bucket(self, route: str, major: int | str | None) -> RouteBucket:
+        bucket = self.route_buckets.get((route, major))
+        if bucket is None:
+            bucket = RouteBucket(*self.route_limits.get(route, (None, None)))
+            self.route_buckets[(route, major)] = bucket
+        return bucket
+
+    def _guild_bucket(self, guild_id: int | None) -> RateWindow:
+        bucket = self.guild_buckets.get(guild_id)
+        if bucket is None:
+            bucket = RateWindow(self.guild_rate)
+            self.guild_buckets[guild_id] = bucket
+        return bucket
+
+    def _next_ready(self) -> tuple[_Job | None, float | None]:
+        """
+        Pop the next job whose buckets all allow a request, scanning priority
+        classes in order and guilds round-robin. Otherwise return how long
+        to wait before checking again (``None`` if nothing is queued).
+        """
+        now = time.monotonic()
+        wait = None
+        global_delay = self.global_bucket.delay(now)
+        for priority in Priority:
+            queues = self._queues[priority]
+            for guild_id in list(queues):
+                queue = queues[guild_id]
+                while queue and queue[0].future.cancelled():
+                    queue.popleft()
+                if not queue:
+                    del queues[guild_id]
+                    continue
+                job = queue[0]
+                buckets = (
+                    self._guild_bucket(guild_id),
+                    self._route_bucket(job.route, job.major),
+                )
+                delay = max(global_delay, *(b.delay(now) for b in buckets))
+                if delay > 0:
+                    wait = delay if wait is None else min(wait, delay)
+                    continue
+                queues[guild_id].popleft()
+                if queues[guild_id]:
+                    queues.move_to_end(guild_id)
+                else:
+                    del queues[guild_id]
+                self.global_bucket.take(now)
+                for bucket in buckets:
+                    bucket.take(now)
+                job.bucket = buckets[1]
+                return job, None
+        return None, wait
+
+    async def _dispatch(self) -> None:
+        while True:
+            job, wait = self._next_ready()
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            if job.future.cancelled():
+                job.bucket.release()
+                continue
+            self.stats["dispatched"] += 1
+            self.stats["wait_seconds"] += time.monotonic() - job.enqueued
+            task = asyncio.create_task(self._execute(job), context=job.context)
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _execute(self, job: _Job) -> None:
+        try:
+            result = await job.factory()
+        except BaseException as e:
+            if not job.future.done():
+                job.future.set_exception(e)
+        else:
+            if not job.future.done():
+                job.future.set_result(result)
+        finally:
+            job.bucket.release()
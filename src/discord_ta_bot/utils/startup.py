@@ -0,0 +1,51 @@
+import time
+import contextlib
+from typing import Iterator
+
+__all__ = ["StartupProfile"]
+
+
+class StartupProfile:
+    """
+    Wall-clock breakdown of the bot's startup.
+
+    Phases are recorded in the order they finish; recording the same phase
+    again adds to it. Phases may nest (e.g. each cog inside ``cogs``), in
+    which case their times overlap.
+
+    Parameters
+    ----------
+    started : float | None
+        ``time.perf_counter()`` value startup is measured from, by default
+        the moment the profile is created.
+    """
+
+    def __init__(self, started: float | None = None):
+        self.started = time.perf_counter() if started is None else started
+        self.phases: dict[str, float] = {}
+        self.total: float | None = None
+
+    def record(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the enclosed block (sync or async) as phase ``name``."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def finish(self) -> float:
+        """Stop the clock; returns the total startup time."""
+        if self.total is None:
+            self.total = time.perf_counter() - self.started
+        return self.total
+
+    def render(self) -> str:
+        width = max((len(name) for name in self.phases), default=0)
+        lines = [f"  {name:<{width}}  {seconds:7.3f}s" for name, seconds in self.phases.items()]
+        if self.total is not None:
+            lines.append(f"  {'total':<{width}}  {self.total:7.3f}s")
+        return "\n".join(lines)
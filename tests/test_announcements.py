@@ -0,0 +1,63 @@
+import asyncio
+
+from discord_ta_bot.utils import AnnouncementRelay, AnnouncementState
+
+
+class FakeCanvas:
+    """Answers announcement requests from a list, with ETags."""
+
+    def __init__(self):
+        self.announcements: list[dict] = []
+        self.requests: list[dict] = []
+
+    async def get_page(self, path, params, etag=None):
+        query: dict = {}
+        for name, value in params:
+            query.setdefault(name, []).append(value)
+        self.requests.append(query)
+        courses = set(query["context_codes[]"])
+        items = [
+            item
+            for item in self.announcements
+            if item["context_code"] in courses
+            and query["start_date"][0] <= item["posted_at"] <= query["end_date"][0]
+        ]
+        current = str(len(items))
+        if etag == current:
+            return None, etag, None
+        return items, current, None
+
+
+def test_relay_posts_new_announcements_once(tmp_path):
+    canvas = FakeCanvas()
+    state = AnnouncementState(tmp_path / "announcements.json")
+    posted: list[tuple[int, list[int]]] = []
+
+    async def targets():
+        return {1: [100], 2: [100, 200]}
+
+    async def post(item, channel_ids):
+        posted.append((item["id"], channel_ids))
+
+    relay = AnnouncementRelay(canvas, state, targets, post, batch_size=1)
+
+    async def main():
+        assert await relay.poll() == 0
+        since = state.cursors["1"]["since"]
+        canvas.announcements += [
+            {"id": 11, "context_code": "course_1", "posted_at": since},
+            {"id": 21, "context_code": "course_2", "posted_at": since},
+        ]
+        assert await relay.poll() == 2
+        assert await relay.poll() == 0
+
+    asyncio.run(main())
+    assert sorted(posted) == [(11, [100]), (21, [100, 200])]
+    # Every request is bounded, so Canvas never defaults to a 28-day range.
+    assert all(
+        request["end_date"][0] > request["start_date"][0] for request in canvas.requests
+    )
+    # Unchanged batches are conditional requests answered without a body.
+    assert state.etags
+    reloaded = AnnouncementState(tmp_path / "announcements.json")
+    assert reloaded.cursors["2"]["seen"] == [21]
@@ -0,0 +1,54 @@
+from types import SimpleNamespace
+
+from discord_ta_bot import cluster
+from discord_ta_bot.cluster import ClusterLauncher, shard_ranges
+
+
+def test_shard_ranges_are_contiguous_even_and_complete():
+    for shard_count in range(1, 20):
+        for processes in range(1, 25):
+            ranges = shard_ranges(shard_count, processes)
+            assert len(ranges) == min(processes, shard_count)
+            assert [s for r in ranges for s in r] == list(range(shard_count))
+            sizes = [len(r) for r in ranges]
+            assert max(sizes) - min(sizes) <= 1
+            assert all(sizes)
+
+    assert shard_ranges(10, 3) == [[0, 1, 2, 3], [4, 5, 6], [7, 8, 9]]
+    assert shard_ranges(2, 5) == [[0], [1]]
+
+
+def test_backoff_doubles_up_to_the_maximum_and_resets_when_stable():
+    backoffs, backoff = [], 0.0
+    for _ in range(12):
+        backoff = cluster._next_backoff(backoff, uptime=1.0)
+        backoffs.append(backoff)
+
+    assert backoffs[:4] == [1.0, 2.0, 4.0, 8.0]
+    assert backoffs[-1] == cluster._MAX_BACKOFF
+    assert all(b <= cluster._MAX_BACKOFF for b in backoffs)
+    assert cluster._next_backoff(backoff, uptime=cluster._STABLE_AFTER) == 0.0
+
+
+def test_supervise_restarts_dead_workers_after_the_backoff(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cluster.time, "monotonic", lambda: now[0])
+    launcher = ClusterLauncher("token", processes=1, shard_count=1)
+    worker = cluster._Worker(0, [0])
+    worker.process = SimpleNamespace(is_alive=lambda: False, exitcode=1)
+    worker.started = 95.0
+    worker.backoff = 4.0
+    launcher.workers = [worker]
+    started = []
+    monkeypatch.setattr(launcher, "_start", started.append)
+    monkeypatch.setattr(launcher, "_wait_ready", lambda worker: None)
+
+    launcher._supervise()
+    assert (worker.backoff, worker.restart_at, started) == (8.0, 108.0, [])
+    now[0] = 107.0
+    launcher._supervise()
+    assert started == []
+    now[0] = 108.0
+    launcher._supervise()
+    assert started == [worker]
+    assert worker.restarts == 1
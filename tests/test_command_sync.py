@@ -0,0 +1,86 @@
+import asyncio
+import json
+
+from discord_ta_bot.utils import CommandSyncer, tree_fingerprint
+
+
+class Command:
+    def __init__(self, name: str, description: str = "A command."):
+        self.name = name
+        self.description = description
+
+    def to_dict(self, tree) -> dict:
+        return {"type": 1, "name": self.name, "description": self.description}
+
+
+class Tree:
+    """Stand-in for a CommandTree whose guild scopes copy the global commands."""
+
+    def __init__(self, *commands: Command):
+        self.commands = list(commands)
+        self.guilds: dict[int, list[Command]] = {}
+        self.synced: list[int | None] = []
+
+    def get_commands(self, guild=None) -> list[Command]:
+        return self.commands if guild is None else self.guilds.get(guild.id, [])
+
+    def copy_global_to(self, guild) -> None:
+        self.guilds[guild.id] = list(self.commands)
+
+    async def sync(self, guild=None) -> list[Command]:
+        self.synced.append(guild and guild.id)
+        return self.get_commands(guild)
+
+
+def test_fingerprint_ignores_order_but_not_content():
+    a, b = Command("jobs"), Command("logs")
+
+    assert tree_fingerprint(Tree(a, b)) == tree_fingerprint(Tree(b, a))
+    assert tree_fingerprint(Tree(a, b)) != tree_fingerprint(
+        Tree(a, Command("logs", "Changed."))
+    )
+
+
+def test_unchanged_tree_skips_the_sync(tmp_path):
+    path = tmp_path / "command_tree.json"
+    tree = Tree(Command("jobs"))
+
+    assert asyncio.run(CommandSyncer(tree, 1, path).sync()) == {"global": True}
+    assert asyncio.run(CommandSyncer(tree, 1, path).sync()) == {"global": False}
+    assert tree.synced == [None]
+
+
+def test_changed_tree_or_force_syncs(tmp_path):
+    path = tmp_path / "command_tree.json"
+    tree = Tree(Command("jobs"))
+    asyncio.run(CommandSyncer(tree, 1, path).sync())
+
+    tree.commands.append(Command("logs"))
+    assert asyncio.run(CommandSyncer(tree, 1, path).sync()) == {"global": True}
+    assert asyncio.run(CommandSyncer(tree, 1, path).sync(force=True)) == {
+        "global": True
+    }
+    assert tree.synced == [None, None, None]
+
+
+def test_fingerprints_are_kept_per_application_and_scope(tmp_path):
+    path = tmp_path / "command_tree.json"
+    tree = Tree(Command("jobs"))
+    asyncio.run(CommandSyncer(tree, 1, path).sync())
+
+    # Another application and the guild scopes are synced despite that.
+    assert asyncio.run(CommandSyncer(tree, 2, path).sync()) == {"global": True}
+    assert asyncio.run(CommandSyncer(tree, 1, path).sync(guild_ids=[10, 20])) == {
+        "10": True,
+        "20": True,
+    }
+    assert asyncio.run(CommandSyncer(tree, 1, path).sync(guild_ids=[10])) == {
+        "10": False
+    }
+    assert tree.synced == [None, None, 10, 20]
+    assert sorted(json.loads(path.read_text())) == [
+        "1:10",
+        "1:20",
+        "1:global",
+        "2:global",
+    ]
@@ -0,0 +1,57 @@
+import asyncio
+import warnings
+
+import pytest
+
+from discord_ta_bot.utils import gather_bounded, run_worker_pool
+
+
+def test_gather_bounded_keeps_order_and_limit():
+    running = 0
+    peak = 0
+
+    async def job(n: int) -> int:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01 * (5 - n % 5))
+        running -= 1
+        return n
+
+    results = asyncio.run(gather_bounded((job(n) for n in range(20)), 3))
+    assert results == list(range(20))
+    assert peak == 3
+
+
+def test_gather_bounded_stops_everything_on_failure():
+    finished = []
+
+    async def job(n: int) -> int:
+        if n == 1:
+            raise ValueError("boom")
+        await asyncio.sleep(0.05)
+        finished.append(n)
+        return n
+
+    async def main():
+        with pytest.raises(ValueError):
+            await gather_bounded([job(n) for n in range(10)], 4)
+        # Give detached work a chance to show up.
+        await asyncio.sleep(0.1)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", RuntimeWarning)
+        asyncio.run(main())
+    assert finished == []
+
+
+def test_run_worker_pool_returns_exceptions_in_place():
+    async def work(n: int) -> int:
+        if n % 2:
+            raise ValueError(n)
+        return n * 10
+
+    results = asyncio.run(run_worker_pool(range(5), work, 2))
+    assert [item for item, _ in results] == list(range(5))
+    assert [r for _, r in results if not isinstance(r, Exception)] == [0, 20, 40]
+    assert all(isinstance(r, ValueError) for n, r in results if n % 2)
@@ -0,0 +1,36 @@
+from discord_ta_bot.utils import CourseIndex
+
+COURSES = [
+    {"id": 2900, "name": "INF-2900 Software Engineering"},
+    {"id": 1100, "name": "INF-1100 Intro to programming"},
+    {"id": 1400, "name": "INF-1400 Object-oriented programming"},
+    {"id": 3200, "name": None},
+]
+
+
+def test_search_matches_word_starts_and_ids():
+    index = CourseIndex(COURSES)
+
+    assert [c["id"] for c in index.search("program")] == [1100, 1400]
+    assert [c["id"] for c in index.search("INF-2")] == [2900]
+    assert [c["id"] for c in index.search("3200")] == [3200]
+    assert [c["id"] for c in index.search("  object ")] == [1400]
+
+
+def test_search_falls_back_to_substrings_after_prefixes():
+    index = CourseIndex(COURSES)
+
+    # "gram" starts no word, so only the substring scan finds it.
+    assert [c["id"] for c in index.search("gram")] == [1100, 1400]
+    # Prefix matches come first, substring matches fill up the rest.
+    assert [c["id"] for c in index.search("2")] == [2900, 3200]
+    assert index.search("no such course") == []
+
+
+def test_search_keeps_order_and_limit():
+    index = CourseIndex(COURSES)
+
+    assert len(index) == 4
+    assert index.search("") == COURSES[:25]
+    assert index.search("", limit=2) == COURSES[:2]
+    assert len(index.search("inf", limit=2)) == 2
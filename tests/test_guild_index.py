@@ -0,0 +1,70 @@
+from types import SimpleNamespace
+
+import discord
+
+from discord_ta_bot.utils import GuildIndex
+
+
+def role(role_id: int, name: str, position: int = 1):
+    return SimpleNamespace(id=role_id, name=name, position=position)
+
+
+def category(channel_id: int, name: str) -> discord.CategoryChannel:
+    channel = discord.CategoryChannel.__new__(discord.CategoryChannel)
+    channel.id, channel.name, channel.category_id = channel_id, name, None
+    return channel
+
+
+def text_channel(channel_id: int, name: str, category_id: int | None):
+    return SimpleNamespace(
+        id=channel_id, name=name, category_id=category_id, type=discord.ChannelType.text
+    )
+
+
+def member(member_id: int, *roles):
+    return SimpleNamespace(id=member_id, roles=list(roles))
+
+
+def guild(roles=(), channels=(), members=()):
+    return SimpleNamespace(
+        id=1, roles=list(roles), channels=list(channels), members=list(members)
+    )
+
+
+def test_removing_a_duplicate_channel_keeps_the_survivor():
+    groups = category(10, "group_text_channels")
+    first = text_channel(11, "2026_group_1", groups.id)
+    second = text_channel(12, "2026_group_1", groups.id)
+    index = GuildIndex(guild(channels=[groups, first, second]))
+
+    assert index.text_channel(groups, "2026_group_1") is first
+    assert index.channel_count(groups) == 2
+    index.remove_channel(first)
+    assert index.text_channel(groups, "2026_group_1") is second
+    assert index.channel_count(groups) == 1
+    index.remove_channel(second)
+    assert index.text_channel(groups, "2026_group_1") is None
+
+
+def test_groups_of_follows_membership_updates():
+    students = role(1, "students")
+    group_1 = role(2, "2026_group_1", position=2)
+    group_2 = role(3, "2026_group_2", position=3)
+    alice = member(100, students, group_1)
+    index = GuildIndex(guild(roles=[students, group_1, group_2], members=[alice]))
+
+    assert index.groups_of(alice) == [group_1]
+    moved = member(100, students, group_2)
+    index.update_member(alice, moved)
+    assert index.groups_of(moved) == [group_2]
+    assert index.members_of(group_2) == [moved]
+    assert index.members_of(group_1) == []
+
+    # Renaming a role out of the group pattern drops it from the map.
+    renamed = role(3, "tutors", position=3)
+    index.update_role(group_2, renamed)
+    assert index.groups_of(moved) == []
+    assert index.members_of(renamed) == [moved]
+
+    index.remove_member(moved)
+    assert index.members_of(renamed) == []
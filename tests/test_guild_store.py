@@ -0,0 +1,80 @@
+import asyncio
+import sqlite3
+
+from discord_ta_bot.objects import Guild
+from discord_ta_bot.utils import GuildStore
+
+
+def counting(store: GuildStore, name: str) -> list:
+    """Record the arguments of every call of ``store``'s worker method ``name``."""
+    calls = []
+    original = getattr(store, name)
+
+    def wrapper(*args):
+        calls.append(args)
+        return original(*args)
+
+    setattr(store, name, wrapper)
+    return calls
+
+
+def rows(path) -> dict[int, str]:
+    with sqlite3.connect(path) as connection:
+        return dict(connection.execute("SELECT id, data FROM guilds"))
+
+
+def test_concurrent_gets_share_one_read(tmp_path):
+    async def main():
+        store = GuildStore(tmp_path / "guilds.sqlite3")
+        await store.put(Guild(1, "Course"))
+        await store.close()
+
+        store = GuildStore(tmp_path / "guilds.sqlite3")
+        reads = counting(store, "_read")
+        results = await asyncio.gather(*(store.get(1) for _ in range(5)))
+        assert await store.get(2) is None
+        assert await store.get(2) is None
+        await store.close()
+        return reads, results
+
+    reads, results = asyncio.run(main())
+    assert reads == [(1,), (2,)]
+    assert [guild.name for guild in results] == ["Course"] * 5
+
+
+def test_updates_before_a_flush_are_written_once(tmp_path):
+    path = tmp_path / "guilds.sqlite3"
+
+    async def main():
+        store = GuildStore(path, flush_delay=60)
+        writes = counting(store, "_write")
+        await store.update(1, name="Course")
+        await store.update(1, role_message=42)
+        await store.update(2, name="Other")
+        await store.delete(2)
+        await store.flush()
+        await store.close()
+        return writes
+
+    writes = asyncio.run(main())
+    assert len(writes) == 1
+    assert writes[0][0].keys() == {1, 2}
+    assert list(rows(path)) == [1]
+
+
+def test_close_flushes_pending_writes_and_is_idempotent(tmp_path):
+    path = tmp_path / "guilds.sqlite3"
+
+    async def main():
+        store = GuildStore(path, flush_delay=60)
+        await store.update(1, name="Course", role_message=42)
+        await store.close()
+        await store.close()
+
+        store = GuildStore(path)
+        guild = await store.get(1)
+        await store.close()
+        return guild
+
+    guild = asyncio.run(main())
+    assert (guild.name, guild.role_message) == ("Course", 42)
@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from discord_ta_bot.utils import JobConflict, JobManager, JobState
+
+
+def test_claimed_keys_conflict_with_started_jobs():
+    async def main() -> None:
+        jobs = JobManager()
+        release = asyncio.Event()
+        claimed = asyncio.Event()
+
+        async def rollover(job) -> str:
+            with jobs.claim("semester:1", job):
+                claimed.set()
+                await release.wait()
+            return "done"
+
+        async def start_semester(job) -> str:
+            return "started"
+
+        parent = jobs.start("rollover", rollover, key="rollover")
+        await claimed.wait()
+        with pytest.raises(JobConflict) as conflict:
+            jobs.start("start_semester", start_semester, guild_id=1, key="semester:1")
+        assert conflict.value.job is parent
+
+        release.set()
+        await jobs.join()
+        assert parent.state == JobState.SUCCEEDED
+        assert jobs.find("semester:1") is None
+        child = jobs.start("start_semester", start_semester, key="semester:1")
+        with pytest.raises(JobConflict):
+            with jobs.claim("semester:1", parent):
+                pass
+        await jobs.join()
+        assert child.result == "started"
+
+    asyncio.run(main())
+
+
+def test_cancel_marks_the_job_cancelled():
+    async def main() -> None:
+        jobs = JobManager()
+
+        async def forever(job) -> str:
+            await asyncio.sleep(3600)
+            return ""
+
+        job = jobs.start("forever", forever)
+        await asyncio.sleep(0)
+        assert jobs.cancel(job.id)
+        await jobs.join()
+        assert job.state == JobState.CANCELLED
+        assert jobs.list() == [job]
+
+    asyncio.run(main())
@@ -0,0 +1,46 @@
+import asyncio
+
+from discord_ta_bot.utils import TransitionJournal
+
+
+def test_journal_round_trip(tmp_path):
+    path = tmp_path / "journal" / "1.jsonl"
+
+    async def write() -> None:
+        journal = TransitionJournal(path)
+        journal.begin("end_semester", year=2025)
+        for n in range(50):
+            journal.record(f"step:{n}")
+        await journal.flush()
+
+    asyncio.run(write())
+    journal = asyncio.run(TransitionJournal.open(path))
+    assert journal.matches("end_semester", year=2025)
+    assert journal.completed() == 50
+    assert journal.is_done("step:49")
+
+
+def test_journal_begin_discards_the_previous_transition(tmp_path):
+    path = tmp_path / "1.jsonl"
+
+    async def write() -> None:
+        journal = TransitionJournal(path)
+        journal.begin("start_semester", year=2025, number_of_groups=3)
+        journal.record("role:2025_group_1")
+        journal.begin("end_semester", year=2025)
+        journal.record("archive:2025_group_1")
+        await journal.flush()
+        journal.complete()
+        await journal.flush()
+
+    asyncio.run(write())
+    lines = path.read_text().splitlines()
+    assert len(lines) == 3
+    assert '"end_semester"' in lines[0]
+    assert asyncio.run(TransitionJournal.open(path)).active is None
+
+
+def test_journal_opens_missing_files_empty(tmp_path):
+    journal = asyncio.run(TransitionJournal.open(tmp_path / "missing.jsonl"))
+    assert journal.active is None
+    assert journal.completed() == 0
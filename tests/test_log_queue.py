@@ -0,0 +1,48 @@
+import logging
+import threading
+
+from discord_ta_bot.utils import QueueLogging
+
+
+class BlockingHandler(logging.Handler):
+    """Collects messages; holds the listener on the first until released."""
+
+    def __init__(self):
+        super().__init__()
+        self.messages: list[str] = []
+        self.entered = threading.Event()
+        self.unblock = threading.Event()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.entered.set()
+        self.unblock.wait(5)
+        self.messages.append(f"{record.levelname} {record.getMessage()}")
+
+
+def test_full_queue_drops_records_and_reports_them_once_drained():
+    logger = logging.getLogger("test_log_queue")
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    target = BlockingHandler()
+    queue_logging = QueueLogging(maxsize=3)
+    queue_logging.start(logger, target)
+    try:
+        logger.info("record 0")
+        assert target.entered.wait(5)
+        # The listener is stuck writing record 0: three fit, the rest drop.
+        for n in range(1, 10):
+            (logger.error if n % 2 else logger.info)(f"record {n}")
+        assert queue_logging.dropped == 6
+    finally:
+        target.unblock.set()
+        # Stopping with a full queue waits for room for the sentinel.
+        queue_logging.stop()
+
+    assert target.messages == [
+        "INFO record 0",
+        "WARNING Log queue overflowed; dropped 3 ERROR, 3 INFO record(s)",
+        "ERROR record 1",
+        "INFO record 2",
+        "ERROR record 3",
+    ]
+    assert queue_logging.dropped == 6
@@ -0,0 +1,68 @@
+import logging
+import os
+
+from discord_ta_bot.utils.log_rotation import (
+    CompressingRotatingFileHandler,
+    rotated_files,
+)
+
+
+def touch(path):
+    path.write_text("x\n")
+    return path
+
+
+def test_rotated_files_lists_legacy_backups_as_oldest(tmp_path):
+    log = tmp_path / "Bot.log"
+    names = [
+        "Bot.log.20260101-000000.gz",
+        "Bot.log.20260102-000000",
+        "Bot.log.20260102-000000-1.gz",
+        "Bot.log.1",
+        "Bot.log.2",
+        "Bot.log.bak",
+        "Other.log.1",
+    ]
+    for name in names:
+        touch(tmp_path / name)
+
+    assert [p.name for p in rotated_files(log)] == [
+        "Bot.log.20260102-000000-1.gz",
+        "Bot.log.20260102-000000",
+        "Bot.log.20260101-000000.gz",
+        "Bot.log.1",
+        "Bot.log.2",
+    ]
+    assert [p.name for p in rotated_files(log, legacy=False)][-1] == (
+        "Bot.log.20260101-000000.gz"
+    )
+
+
+def test_prune_removes_legacy_backups_beyond_the_count(tmp_path):
+    log = tmp_path / "Bot.log"
+    for name in ("Bot.log.1", "Bot.log.2", "Bot.log.20260101-000000.gz"):
+        touch(tmp_path / name)
+    handler = CompressingRotatingFileHandler(log, backup_count=2, compress=False)
+    try:
+        handler.prune()
+    finally:
+        handler.close()
+    assert sorted(os.listdir(tmp_path)) == [
+        "Bot.log",
+        "Bot.log.1",
+        "Bot.log.20260101-000000.gz",
+    ]
+
+
+def test_zero_backup_count_discards_the_log_on_rollover(tmp_path):
+    log = tmp_path / "Bot.log"
+    handler = CompressingRotatingFileHandler(log, max_bytes=64, backup_count=0)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    try:
+        for n in range(10):
+            handler.emit(logging.makeLogRecord({"msg": f"record {n:02} " + "." * 20}))
+    finally:
+        handler.close()
+    assert os.listdir(tmp_path) == ["Bot.log"]
+    assert log.stat().st_size < 64
+    assert log.read_text().endswith("record 09 " + "." * 20 + "\n")
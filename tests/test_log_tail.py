@@ -0,0 +1,50 @@
+import gzip
+
+from discord_ta_bot.utils.log_tail import LogQuery, reverse_lines, tail_log
+
+RECORDS = [
+    "INFO discord_ta_bot.cogs.role 2026-01-01 - Created role 2026_group_1 in 11",
+    "WARNING discord_ta_bot.cogs.role 2026-01-01 - Skipped channel in 22",
+    "ERROR discord_ta_bot.utils.jobs 2026-01-01 - Job 3 failed in 11\n"
+    "Traceback (most recent call last):\n"
+    "ValueError: boom",
+    "INFO discord 2026-01-01 - Shard connected",
+]
+
+
+def write(path, records):
+    path.write_text("".join(f"{record}\n" for record in records))
+    return path
+
+
+def test_reverse_lines_crosses_block_boundaries(tmp_path):
+    lines = [f"line {n}" for n in range(100)]
+    path = write(tmp_path / "Bot.log", lines + [""])
+
+    assert list(reverse_lines(path, block_size=7)) == lines[::-1]
+
+
+def test_log_query_filters_level_logger_and_text():
+    assert [LogQuery(level="warning")(r) for r in RECORDS] == [False, True, True, False]
+    assert [LogQuery(logger="discord_ta_bot.cogs")(r) for r in RECORDS] == [
+        True,
+        True,
+        False,
+        False,
+    ]
+    # "discord" matches its children but not other loggers sharing the prefix.
+    assert LogQuery(logger="discord")(RECORDS[3])
+    assert not LogQuery(logger="discord_ta")(RECORDS[0])
+    assert [LogQuery(text="in 11")(r) for r in RECORDS] == [True, False, True, False]
+    assert LogQuery(text="ValueError")(RECORDS[2])
+
+
+def test_tail_log_keeps_tracebacks_and_continues_into_rotated_files(tmp_path):
+    log = write(tmp_path / "Bot.log", RECORDS[2:])
+    with gzip.open(tmp_path / "Bot.log.20260101-000000.gz", "wt") as f:
+        f.write("".join(f"{record}\n" for record in RECORDS[:2]))
+
+    assert tail_log(log, 2) == RECORDS[2:]
+    assert tail_log(log, 10) == RECORDS
+    assert tail_log(log, 10, LogQuery(level="WARNING")) == RECORDS[1:3]
+    assert tail_log(log, 1, LogQuery(text="in 11")) == [RECORDS[2]]
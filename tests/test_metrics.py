@@ -0,0 +1,124 @@
+import asyncio
+import collections
+import socket
+from types import SimpleNamespace
+
+import aiohttp
+import discord
+import yarl
+
+from discord_ta_bot.utils import MeteredCommandTree, MetricsRegistry
+from discord_ta_bot.utils import metrics
+
+
+def test_star_export_keeps_collections_counter_unshadowed():
+    namespace: dict = {"Counter": collections.Counter}
+    exec("from discord_ta_bot.utils import *", namespace)
+    assert namespace["Counter"] is collections.Counter
+
+
+def test_render_counter_and_histogram():
+    registry = MetricsRegistry()
+    calls = registry.counter("discord_calls_total", "Calls.", ("route",))
+    calls.inc(route="POST /guilds/{guild_id}/roles")
+    calls.inc(2, route="POST /guilds/{guild_id}/roles")
+    registry.commands.observe(0.3, command="start_semester", outcome="ok")
+
+    text = registry.render()
+    assert "# TYPE discord_calls_total counter" in text
+    assert 'discord_calls_total{route="POST /guilds/{guild_id}/roles"} 3' in text
+    assert (
+        'discord_app_command_duration_seconds_bucket{command="start_semester",'
+        'outcome="ok",le="0.5"} 1'
+    ) in text
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def scrape(port: int) -> str:
+    async with aiohttp.ClientSession() as session:
+        async with session.get(f"http://127.0.0.1:{port}/metrics") as response:
+            return await response.text()
+
+
+def test_serve_is_disabled_without_a_port(monkeypatch):
+    monkeypatch.setattr(metrics, "DEFAULT_METRICS_PORT", None)
+
+    async def main():
+        registry = MetricsRegistry()
+        await registry.serve()
+        await registry.serve(port="")
+        assert registry._runner is None
+
+    asyncio.run(main())
+
+
+def test_serve_adds_the_worker_offset():
+    port = free_port()
+
+    async def main() -> str:
+        registry = MetricsRegistry()
+        await registry.serve(host="127.0.0.1", port=str(port - 1), offset=1)
+        try:
+            return await scrape(port)
+        finally:
+            await registry.close()
+
+    assert "# TYPE discord_app_command_duration_seconds histogram" in asyncio.run(main())
+
+
+def test_command_tree_attributes_requests_to_the_command():
+    registry = MetricsRegistry()
+    client = discord.Client(intents=discord.Intents.none())
+    client.metrics = registry
+    tree = MeteredCommandTree(client)
+    interaction = SimpleNamespace(
+        type=discord.InteractionType.application_command,
+        extras={},
+        command=SimpleNamespace(qualified_name="jobs list"),
+    )
+    params = SimpleNamespace(
+        method="GET",
+        url=yarl.URL("https://discord.com/api/v10/users/@me"),
+        response=SimpleNamespace(status=200, headers={}),
+    )
+
+    async def main():
+        assert await tree.interaction_check(interaction)
+        await registry._on_request_end(None, SimpleNamespace(), params)
+        registry.observe_command(interaction, interaction.command, "ok")
+
+    asyncio.run(main())
+    assert registry.command_requests.get(command="jobs list") == 1
+    assert registry.commands.count(command="jobs list", outcome="ok") == 1
+
+
+def test_track_bot_reads_gateway_and_scheduler_state():
+    registry = MetricsRegistry()
+    listeners = []
+    bot = SimpleNamespace(
+        add_listener=listeners.append,
+        latency=0.25,
+        shard_id=None,
+        is_closed=lambda: False,
+        guilds=[SimpleNamespace(members=[1, 2]), SimpleNamespace(members=[3])],
+        scheduler=SimpleNamespace(
+            pending=lambda: 4,
+            stats={"wait_seconds": 1.5, "dispatched": 7},
+            latency=0.1,
+        ),
+    )
+
+    registry.track_bot(bot)
+
+    assert listeners == [registry.on_app_command_completion]
+    text = registry.render()
+    assert 'discord_shard_up{shard="0"} 1' in text
+    assert 'discord_shard_latency_seconds{shard="0"} 0.25' in text
+    assert "discord_cached_members 3" in text
+    assert "discord_scheduler_pending 4" in text
+    assert "discord_scheduler_dispatched_total 7" in text
@@ -0,0 +1,46 @@
+import asyncio
+
+from discord_ta_bot.utils import MutationScheduler, ProgressMessage
+
+
+class FakeMessage:
+    def __init__(self, content: str):
+        self.edits = [content]
+
+    async def edit(self, content: str) -> None:
+        self.edits.append(content)
+
+
+class FakeFollowup:
+    def __init__(self):
+        self.message: FakeMessage | None = None
+
+    async def send(self, content: str, **kwargs) -> FakeMessage:
+        self.message = FakeMessage(content)
+        return self.message
+
+
+class FakeInteraction:
+    guild_id = 1
+    token = "token"
+
+    def __init__(self):
+        self.followup = FakeFollowup()
+
+    def is_expired(self) -> bool:
+        return False
+
+
+def test_progress_message_shows_the_final_state_on_exit():
+    interaction = FakeInteraction()
+    done = 0
+
+    async def main() -> None:
+        nonlocal done
+        async with ProgressMessage(
+            MutationScheduler(), interaction, lambda: f"{done}/3", interval=60
+        ):
+            done = 3
+
+    asyncio.run(main())
+    assert interaction.followup.message.edits == ["0/3", "3/3"]
@@ -0,0 +1,274 @@
+import asyncio
+import itertools
+from types import SimpleNamespace
+
+import discord
+import pytest
+from discord.abc import _Overwrites
+
+from discord_ta_bot.cogs.role import MAX_CATEGORY_CHANNELS, MAX_GROUPS, Role
+from discord_ta_bot.utils import GuildIndex, Plan
+
+GUILD_ID = 1
+_ids = itertools.count(100)
+
+
+class Stub(SimpleNamespace):
+    """Hashable namespace, usable as an overwrite target like a role."""
+
+    __hash__ = object.__hash__
+
+
+def category(name: str, hidden: bool = True) -> discord.CategoryChannel:
+    channel = discord.CategoryChannel.__new__(discord.CategoryChannel)
+    channel.id, channel.name, channel.category_id = next(_ids), name, None
+    deny = discord.Permissions(view_channel=True).value if hidden else 0
+    channel._overwrites = [
+        _Overwrites({"id": GUILD_ID, "allow": "0", "deny": str(deny), "type": 0})
+    ]
+    return channel
+
+
+def channel(name: str, parent: discord.CategoryChannel, kind: str = "text"):
+    return SimpleNamespace(
+        id=next(_ids),
+        name=name,
+        category=parent,
+        category_id=parent.id,
+        type=getattr(discord.ChannelType, kind),
+    )
+
+
+def role(name: str, position: int = 1, hoist: bool = False):
+    return Stub(id=next(_ids), name=name, position=position, hoist=hoist)
+
+
+def prompt(title: str, options: list[tuple[str, set[int]]]):
+    return SimpleNamespace(
+        title=title,
+        options=[SimpleNamespace(title=t, role_ids=ids) for t, ids in options],
+    )
+
+
+def cog(roles=(), channels=(), prompts=()) -> tuple[Role, SimpleNamespace]:
+    everyone = Stub(id=GUILD_ID, name="@everyone", position=0)
+    guild = SimpleNamespace(
+        id=GUILD_ID,
+        default_role=everyone,
+        roles=[everyone, *roles],
+        channels=list(channels),
+        members=[],
+    )
+
+    async def onboarding():
+        return SimpleNamespace(prompts=list(prompts))
+
+    guild.onboarding = onboarding
+    index = GuildIndex(guild)
+    bot = SimpleNamespace(indexes=SimpleNamespace(get=lambda g: index))
+    return Role(bot), guild
+
+
+def keys(plan: Plan, phase: str) -> list[str]:
+    return [m.key for m in plan.phases.get(phase, [])]
+
+
+def test_archive_categories_fill_up_in_order():
+    full = category("Archived_text_channels_2026")
+    existing = [channel(f"old_{n}", full) for n in range(MAX_CATEGORY_CHANNELS - 2)]
+    role_cog, guild = cog(channels=[full, *existing])
+    plan = Plan("test")
+
+    placement = role_cog._plan_archive_categories(plan, guild, 2026, 5)
+
+    assert placement == ["Archived_text_channels_2026"] * 2 + [
+        "Archived_text_channels_2026_2"
+    ] * 3
+    assert keys(plan, "categories") == ["category:Archived_text_channels_2026_2"]
+
+
+def test_group_channels_overflow_into_numbered_categories():
+    text = category("group_text_channels")
+    role_cog, guild = cog(channels=[text])
+    plan = Plan("test")
+
+    role_cog.plan_group_channels(plan, guild, 2026, MAX_CATEGORY_CHANNELS + 10)
+
+    assert keys(plan, "categories") == [
+        "category:group_text_channels_2",
+        "category:group_voice_channels",
+        "category:group_voice_channels_2",
+    ]
+    assert len(keys(plan, "channels")) == 2 * (MAX_CATEGORY_CHANNELS + 10)
+
+
+def test_group_channels_are_found_in_overflow_categories():
+    first, second = category("group_text_channels"), category("group_text_channels_2")
+    existing = channel("2026_group_51", second)
+    role_cog, guild = cog(channels=[first, second, existing])
+    plan = Plan("test")
+
+    role_cog.plan_group_channels(plan, guild, 2026, 51)
+
+    text_keys = [k for k in keys(plan, "channels") if k.startswith("text:")]
+    assert "text:2026_group_51" not in text_keys
+    assert len(text_keys) == 50
+    assert any("`group_text_channels_2`" in w for w in plan.warnings)
+
+
+def test_group_categories_get_hidden_when_visible():
+    visible = category("group_voice_channels_2", hidden=False)
+    role_cog, guild = cog(
+        channels=[category("group_voice_channels"), visible, category("group_text_channels")]
+    )
+    plan = Plan("test")
+
+    role_cog.plan_group_channels(plan, guild, 2026, 0)
+
+    assert keys(plan, "categories") == ["category_permissions:group_voice_channels_2"]
+
+
+def test_end_semester_scans_and_deletes_every_active_category():
+    groups = [role(f"2026_group_{n}", 1 + n) for n in range(1, 4)]
+    text = [category("group_text_channels"), category("group_text_channels_2")]
+    voice = [category("group_voice_channels"), category("group_voice_channels_2")]
+    channels = [
+        channel("2026_group_1", text[0]),
+        channel("2026_group_2", text[1]),
+        channel("2026_group_1", voice[0], "voice"),
+        channel("2026_group_3", voice[1], "voice"),
+    ]
+    role_cog, guild = cog(roles=groups, channels=[*text, *voice, *channels])
+
+    plan = asyncio.run(role_cog.plan_end_semester(guild, 2026, groups))
+
+    assert sorted(keys(plan, "channels")) == [
+        "archive:2026_group_1",
+        "archive:2026_group_2",
+        "voice_delete:2026_group_1",
+        "voice_delete:2026_group_3",
+    ]
+    assert sorted(keys(plan, "cleanup")) == [
+        "category_delete:group_text_channels",
+        "category_delete:group_text_channels_2",
+        "category_delete:group_voice_channels",
+        "category_delete:group_voice_channels_2",
+    ]
+    assert len(plan.warnings) == 2
+
+
+def test_group_prompt_layout_splits_into_ranges():
+    students = role("students")
+    groups = [role(f"2026_group_{n}", 1 + n) for n in range(1, 121)]
+    role_cog, guild = cog(roles=[students, *groups])
+
+    layout = role_cog._group_prompt_layout(guild, groups)
+
+    assert [title for title, _ in layout] == [
+        "Which group are you in? (groups 1–50)",
+        "Which group are you in? (groups 51–100)",
+        "Which group are you in? (groups 101–120)",
+    ]
+    assert [len(options) for _, options in layout] == [50, 50, 20]
+    assert layout[0][1][0] == ("2026_group_1", {groups[0].id, students.id})
+    assert role_cog._group_prompt_layout(guild, groups[:3])[0][0] == (
+        "Which group are you in?"
+    )
+
+
+def started_semester(groups: int, skip=()) -> tuple[list, list]:
+    """Roles and channels of a guild where ``/start_semester`` ran, minus ``skip``."""
+    roles = [role("students"), role("Alumni", 100)]
+    text, voice = category("group_text_channels"), category("group_voice_channels")
+    channels = [text, voice]
+    for n in range(1, groups + 1):
+        name = f"2026_group_{n}"
+        if f"role:{name}" not in skip:
+            roles.append(role(name, 1 + n, hoist=True))
+        if f"text:{name}" not in skip:
+            channels.append(channel(name, text))
+        if f"voice:{name}" not in skip:
+            channels.append(channel(name, voice, "voice"))
+    return roles, channels
+
+
+def test_start_semester_plans_nothing_when_up_to_date():
+    roles, channels = started_semester(3)
+    role_cog, guild = cog(roles=roles, channels=channels)
+    groups = [r for r in roles if r.name.startswith("2026_group_")]
+    prompts = [prompt(*p) for p in role_cog._group_prompt_layout(guild, groups)]
+    role_cog, guild = cog(roles=roles, channels=channels, prompts=prompts)
+
+    plan = asyncio.run(role_cog.plan_start_semester(guild, 2026, 3))
+
+    assert plan.call_count() == 0
+    assert len(plan.warnings) == 3 * 3
+
+
+def test_start_semester_plans_only_what_is_missing():
+    roles, channels = started_semester(
+        3, skip=("role:2026_group_3", "voice:2026_group_2")
+    )
+    role_cog, guild = cog(roles=roles, channels=channels)
+
+    plan = asyncio.run(role_cog.plan_start_semester(guild, 2026, 3))
+
+    assert keys(plan, "roles") == ["role:2026_group_3"]
+    assert keys(plan, "categories") == []
+    assert keys(plan, "channels") == ["voice:2026_group_2"]
+    assert keys(plan, "onboarding") == ["onboarding"]
+    assert keys(plan, "positions") == ["alumni_position"]
+
+
+def test_transitions_refuse_out_of_range_group_counts():
+    role_cog, guild = cog()
+    guild.me = SimpleNamespace(guild_permissions=discord.Permissions.all())
+
+    for number_of_groups in (None, 0, MAX_GROUPS + 1):
+        with pytest.raises(ValueError, match="number_of_groups"):
+            asyncio.run(
+                role_cog._run_transition(
+                    guild, "start_semester", 2026, number_of_groups, 4, dry_run=True
+                )
+            )
+
+
+def test_member_migration_logs_what_changed(caplog):
+    students, alumni = role("students"), role("Alumni", 100)
+    group = role("2026_group_1", 2)
+    for r in (students, alumni, group):
+        r.is_default = lambda: False
+    edits = {}
+
+    def member(member_id: int, *roles):
+        async def edit(roles, reason):
+            edits[member_id] = roles
+
+        return Stub(id=member_id, name=f"student{member_id}", roles=list(roles), edit=edit)
+
+    # Only needs Alumni; only loses students; needs both.
+    members = [member(1, group), member(2, students), member(3, students, group)]
+    role_cog, guild = cog(roles=[students, alumni, group])
+    guild.members = members
+    role_cog.bot.indexes = SimpleNamespace(get=lambda g, index=GuildIndex(guild): index)
+
+    async def submit(factory, **options):
+        return await factory()
+
+    role_cog.bot.scheduler = SimpleNamespace(submit=submit)
+    plan = Plan("test")
+    role_cog.plan_member_migration(plan, guild, [group], students)
+
+    async def main():
+        for mutation in plan.mutations():
+            await mutation.action()
+
+    with caplog.at_level("INFO", logger="discord_ta_bot.cogs.role"):
+        asyncio.run(main())
+
+    assert edits == {1: [group, alumni], 2: [], 3: [group, alumni]}
+    assert sorted(r.getMessage() for r in caplog.records) == [
+        "Updated roles for student1: alumni added=True, students removed=False",
+        "Updated roles for student2: alumni added=False, students removed=True",
+        "Updated roles for student3: alumni added=True, students removed=True",
+    ]
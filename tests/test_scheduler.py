@@ -0,0 +1,111 @@
+import asyncio
+
+from discord_ta_bot.utils.scheduler import (
+    MutationScheduler,
+    RateWindow,
+    RouteBucket,
+    Routes,
+    route_key,
+)
+
+
+def test_route_key_templates_and_majors():
+    assert route_key("post", "/api/v10/guilds/1/roles") == (Routes.ROLE_CREATE, 1)
+    assert route_key("PATCH", "/api/v10/guilds/1/roles/2") == (Routes.ROLE_EDIT, 1)
+    assert route_key("PATCH", "/api/v10/channels/7") == (Routes.CHANNEL_EDIT, 7)
+    assert route_key("PUT", "/api/v10/channels/7/permissions/3") == (
+        Routes.CHANNEL_PERMISSIONS,
+        7,
+    )
+    assert route_key("POST", "/api/v10/webhooks/5/abc") == (Routes.FOLLOWUP, "abc")
+    assert route_key("PATCH", "/api/v10/webhooks/5/abc/messages/9") == (
+        Routes.FOLLOWUP_EDIT,
+        "abc",
+    )
+    assert route_key("GET", "/api/v10/users/@me") == ("GET /users/@me", None)
+
+
+def test_rate_window_never_exceeds_limit_in_any_period():
+    window = RateWindow(3, 1.0)
+    for now in (0.0, 0.1, 0.2):
+        assert window.delay(now) == 0
+        window.take(now)
+    assert window.delay(0.5) == 0.5
+    assert window.delay(1.0) == 0
+    window.take(1.0)
+    assert window.delay(1.05) > 0
+
+
+def test_route_bucket_probes_until_learned():
+    bucket = RouteBucket()
+    assert bucket.delay(0.0) == 0
+    bucket.take(0.0)
+    assert bucket.delay(0.1) > 0
+    bucket.learn(5, 4, 2.0, now=0.1)
+    bucket.release()
+    assert bucket.learned
+    assert (bucket.limit, bucket.window, bucket.remaining) == (5, 2.0, 4)
+    assert bucket.delay(0.1) == 0
+
+
+def test_route_bucket_counts_in_flight_and_waits_for_reset():
+    bucket = RouteBucket(3, 1.0)
+    for _ in range(3):
+        bucket.take(0.0)
+    # Nothing left in the window until a response reports the reset.
+    assert bucket.delay(0.0) > 0
+    # The first response still sees the other two requests in flight.
+    bucket.learn(3, 2, 1.0, now=0.05)
+    assert bucket.remaining == 0
+    assert abs(bucket.delay(0.05) - 1.0) < 1e-9
+    assert bucket.delay(1.05) == 0
+    assert bucket.remaining == 3
+
+
+def test_route_bucket_ignores_late_responses_of_a_past_window():
+    bucket = RouteBucket(2, 1.0)
+    bucket.take(0.0)
+    bucket.learn(2, 1, 1.0, now=0.0)
+    bucket.release()
+    bucket.take(1.1)
+    bucket.learn(2, 1, 1.0, now=1.1)
+    # A response reporting a reset before the current window's is stale.
+    bucket.learn(2, 0, 0.0, now=1.2)
+    assert bucket.remaining == 1
+
+
+def test_scheduler_keeps_requests_within_the_route_window():
+    async def main() -> tuple[int, int]:
+        scheduler = MutationScheduler(global_rate=100, guild_rate=100)
+        loop = asyncio.get_running_loop()
+        limit, window = 2, 0.2
+        # Discord's fixed window starts with the first request it sees.
+        state = {"started": None, "count": 0, "sent": 0, "rejected": 0}
+
+        async def call() -> None:
+            now = loop.time()
+            if state["started"] is None or now - state["started"] >= window:
+                state["started"], state["count"] = now, 0
+            state["count"] += 1
+            state["sent"] += 1
+            if state["count"] > limit:
+                state["rejected"] += 1
+            await asyncio.sleep(0.02)
+            headers = {
+                "X-RateLimit-Limit": str(limit),
+                "X-RateLimit-Remaining": str(max(0, limit - state["count"])),
+                "X-RateLimit-Reset-After": str(state["started"] + window - loop.time()),
+            }
+            scheduler.observe("PATCH", "/channels/1", 200, headers)
+
+        scheduler.start()
+        await asyncio.gather(
+            *(
+                scheduler.submit(call, route=Routes.CHANNEL_EDIT, guild_id=1, major=1)
+                for _ in range(6)
+            )
+        )
+        await scheduler.close()
+        return state["sent"], state["rejected"]
+
+    assert asyncio.run(main()) == (6, 0)
@@ -0,0 +1,49 @@
+import io
+import json
+
+import pytest
+
+from discord_ta_bot.objects import (
+    Course,
+    Group,
+    Guild,
+    decode_guild,
+    dump_guilds,
+    encode_guild,
+    load_guilds,
+)
+
+
+def guild() -> Guild:
+    return Guild(
+        1,
+        "Course server",
+        canvas_courses=[Course("Algorithms", 42)],
+        github_orgs=["tdt4100"],
+        role_message=7,
+        groups=[Group("group 1", "🍎", 9)],
+        announcement_channel=5,
+    )
+
+
+def test_encode_decode_round_trip():
+    assert decode_guild(encode_guild(guild())) == guild()
+    assert decode_guild(encode_guild(Guild(2))) == Guild(2)
+
+
+def test_decode_accepts_older_rows_and_json_objects():
+    old_row = '[1,"Course server",[[42,"Algorithms"]],["tdt4100"],7,[["group 1","🍎",9]]]'
+    assert decode_guild(old_row) == guild().replace(announcement_channel=None)
+    assert decode_guild(json.dumps(guild().to_json())) == guild()
+
+
+def test_snapshot_round_trip_and_version_check():
+    buffer = io.StringIO()
+    assert dump_guilds([guild(), Guild(2)], buffer) == 2
+    buffer.seek(0)
+    assert list(load_guilds(buffer)) == [guild(), Guild(2)]
+
+    with pytest.raises(ValueError):
+        list(load_guilds(io.StringIO('{"format":"discord-ta-bot/guilds","version":99}\n')))
+    with pytest.raises(ValueError):
+        list(load_guilds(io.StringIO("not a snapshot\n")))